@@ -24,36 +24,51 @@ class KalshiClient:
         key_id: str,
         private_key: rsa.RSAPrivateKey,
         user_id: Optional[str] = None,
+        rate_limiter: Optional[Any] = None,
     ):
         """Initializes the client and logs in the specified user.
         Raises an HttpError if the user could not be authenticated.
+
+        rate_limiter is any object with an acquire(method) -> seconds_waited
+        method (e.g. rate_limiter.RateLimiter from kalshi-starter-code-python).
+        Without one, calls are spaced by a fixed minimum interval.
         """
 
         self.host = host
         self.key_id: key_id
         self.private_key: private_key
         self.user_id = user_id
+        self.rate_limiter = rate_limiter
         self.last_api_call = datetime.now()
+        self.last_throttle = 0.0
 
     """Built in rate-limiter. We STRONGLY encourage you to keep
     some sort of rate limiting, just in case there is a bug in your
     code. Feel free to adjust the threshold"""
-    def rate_limit(self) -> None:
+    def rate_limit(self, method: str = "GET") -> float:
+        if self.rate_limiter is not None:
+            self.last_throttle = self.rate_limiter.acquire(method)
+            self.last_api_call = datetime.now()
+            return self.last_throttle
+
         # Adjust time between each api call
         THRESHOLD_IN_MILLISECONDS = 100
 
-        now = datetime.now()
-        threshold_in_microseconds = 1000 * THRESHOLD_IN_MILLISECONDS
-        threshold_in_seconds = THRESHOLD_IN_MILLISECONDS / 1000
-        if now - self.last_api_call < timedelta(microseconds=threshold_in_microseconds):
-            time.sleep(threshold_in_seconds)
+        # Only sleep for whatever is left of the threshold
+        elapsed = datetime.now() - self.last_api_call
+        remaining = timedelta(milliseconds=THRESHOLD_IN_MILLISECONDS) - elapsed
+        wait = max(0.0, remaining.total_seconds())
+        if wait > 0:
+            time.sleep(wait)
         self.last_api_call = datetime.now()
+        self.last_throttle = wait
+        return wait
 
     def post(self, path: str, body: dict) -> Any:
         """POSTs to an authenticated Kalshi HTTP endpoint.
         Returns the response body. Raises an HttpError on non-2XX results.
         """
-        self.rate_limit()
+        self.rate_limit("POST")
 
         response = requests.post(
             self.host + path, data=body, headers=self.request_headers("POST", path)
@@ -64,7 +79,7 @@ class KalshiClient:
     def get(self, path: str, params: Dict[str, Any] = {}) -> Any:
         """GETs from an authenticated Kalshi HTTP endpoint.
         Returns the response body. Raises an HttpError on non-2XX results."""
-        self.rate_limit()
+        self.rate_limit("GET")
 
         response = requests.get(
             self.host + path, headers=self.request_headers("GET", path), params=params
@@ -73,13 +88,14 @@ class KalshiClient:
         self.raise_if_bad_response(response)
         return response.json()
 
-    def delete(self, path: str, params: Dict[str, Any] = {}) -> Any:
-        """Posts from an authenticated Kalshi HTTP endpoint.
+    def delete(self, path: str, params: Dict[str, Any] = {}, body: Optional[str] = None) -> Any:
+        """Deletes from an authenticated Kalshi HTTP endpoint.
+        body is an optional JSON string (used by batch_cancel_orders).
         Returns the response body. Raises an HttpError on non-2XX results."""
-        self.rate_limit()
+        self.rate_limit("DELETE")
 
         response = requests.delete(
-            self.host + path, headers=self.request_headers("DELETE", path), params=params
+            self.host + path, headers=self.request_headers("DELETE", path), params=params, data=body
         )
         self.raise_if_bad_response(response)
         return response.json()
@@ -153,11 +169,13 @@ class ExchangeClient(KalshiClient):
     def __init__(self,
                     exchange_api_base: str,
                     key_id: str,
-                    private_key: rsa.RSAPrivateKey):
+                    private_key: rsa.RSAPrivateKey,
+                    rate_limiter: Optional[Any] = None):
         super().__init__(
             exchange_api_base,
             key_id,
             private_key,
+            rate_limiter=rate_limiter,
         )
         self.key_id = key_id
         self.private_key = private_key
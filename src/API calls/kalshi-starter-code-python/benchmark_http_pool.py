@@ -0,0 +1,171 @@
+"""
+Per-request latency benchmark: one-shot requests vs the pooled KalshiHttpClient session
+
+Starts a local stand-in for the Kalshi HTTP API (optionally over TLS with a
+throwaway self-signed certificate) and times the same signed GET request made
+with module-level ``requests.get`` (new connection every call) and with the
+client's keep-alive session.
+
+Usage:
+    python benchmark_http_pool.py [--requests 200] [--tls]
+"""
+
+import argparse
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from clients import KalshiHttpClient, Environment
+
+MARKET_PATH = "/trade-api/v2/markets/KXBENCH-50"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers every GET with a small market payload over a keep-alive connection"""
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACK adds ~40 ms to every request on a reused connection
+    disable_nagle_algorithm = True
+    body = json.dumps({"market": {"ticker": "KXBENCH-50", "yes_bid": 40, "yes_ask": 42}}).encode("utf-8")
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_self_signed_cert(directory):
+    """Create a localhost certificate/key pair and return their paths"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption(),
+        ))
+    return cert_path, key_path
+
+
+def start_server(cert_path=None, key_path=None):
+    """Start the stand-in server on a free port and return (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    scheme = "http"
+    if cert_path:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_path, key_path)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}"
+
+
+def time_requests(send, n):
+    """Call send() n times and return per-request latencies in milliseconds"""
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        send()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{name.ljust(28)}mean {statistics.mean(latencies):7.3f} ms   "
+          f"median {statistics.median(latencies):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="requests per variant")
+    parser.add_argument("--tls", action="store_true", help="serve over TLS to include handshake cost")
+    args = parser.parse_args()
+
+    print("HTTP CONNECTION POOL BENCHMARK")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_path, key_path = write_self_signed_cert(tmp) if args.tls else (None, None)
+        server, base_url = start_server(cert_path, key_path)
+        verify = cert_path if cert_path else True
+        print(f"Stand-in server: {base_url} ({args.requests} requests per variant)")
+
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        with KalshiHttpClient("benchmark-key", private_key, Environment.DEMO) as client:
+            client.host = base_url
+            client.session.verify = verify
+            # Keep REQUESTS_CA_BUNDLE and friends from overriding the local cert
+            client.session.trust_env = False
+            # Measure transport cost only; the rate limiter would otherwise dominate
+            client.rate_limit = lambda *args, **kwargs: 0.0
+
+            def one_shot():
+                response = requests.get(
+                    client.host + MARKET_PATH,
+                    headers=client.request_headers("GET", MARKET_PATH),
+                    timeout=client.timeout,
+                    verify=verify,
+                )
+                client.raise_if_bad_response(response)
+                return response.json()
+
+            def pooled():
+                return client.get(MARKET_PATH)
+
+            # Warm up both paths once
+            one_shot()
+            pooled()
+
+            unpooled_latencies = time_requests(one_shot, args.requests)
+            pooled_latencies = time_requests(pooled, args.requests)
+
+        server.shutdown()
+
+    report("requests.get (no pool)", unpooled_latencies)
+    report("KalshiHttpClient (pooled)", pooled_latencies)
+    speedup = statistics.mean(unpooled_latencies) / statistics.mean(pooled_latencies)
+    print(f"\nPooled session is {speedup:.2f}x faster per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Pricing kernel benchmark and parity check
+
+Prices thousands of synthetic threshold markets two ways:
+  - the per-market BettingSystem methods (_adjust_probability_for_threshold,
+    _calculate_expected_value, _calculate_bet_size and the side choice)
+  - pricing.price_markets over all markets in one call
+
+It asserts that probabilities, EVs, sides, prices and bet sizes match exactly,
+and that BettingSystem._price_candidates skips markets quoted as 'N/A' just as
+the per-market path did, then reports markets/sec for each path.
+
+Usage:
+    python benchmark_pricing.py [--markets 5000] [--repeat 5] [--seed 0]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+import pricing
+from betting_system import BettingSystem
+
+
+def synthetic_markets(n, seed):
+    """Random thresholds, books (including empty and edge prices) and sentiment"""
+    rng = np.random.default_rng(seed)
+    yes_bid = rng.integers(0, 100, n)
+    no_bid = rng.integers(0, 100, n)
+    yes_ask = np.where(rng.random(n) < 0.05, 0, np.minimum(100 - no_bid + rng.integers(0, 3, n), 100))
+    no_ask = np.where(rng.random(n) < 0.05, 0, np.minimum(100 - yes_bid + rng.integers(0, 3, n), 100))
+    return {
+        'thresholds': rng.integers(0, 101, n),
+        'yes_bid': yes_bid,
+        'yes_ask': yes_ask,
+        'no_bid': no_bid,
+        'no_ask': no_ask,
+        'base_probability': rng.random(n),
+        'confidence': rng.random(n),
+    }
+
+
+def price_scalar(system, m):
+    """The per-market path, as analyze_markets_for_betting ran it before vectorization"""
+    rows = []
+    for i in range(len(m['thresholds'])):
+        threshold = int(m['thresholds'][i])
+        yes_bid, yes_ask = int(m['yes_bid'][i]), int(m['yes_ask'][i])
+        no_bid, no_ask = int(m['no_bid'][i]), int(m['no_ask'][i])
+        confidence = float(m['confidence'][i])
+        probability = system._adjust_probability_for_threshold(float(m['base_probability'][i]), threshold)
+        yes_ev = system._calculate_expected_value(probability, yes_bid, yes_ask, 'yes')
+        no_ev = system._calculate_expected_value(1 - probability, no_bid, no_ask, 'no')
+        if yes_ev > no_ev and yes_ev > 0:
+            side, price, ev = pricing.SIDE_YES, yes_ask, yes_ev
+        elif no_ev > yes_ev and no_ev > 0:
+            side, price, ev = pricing.SIDE_NO, no_ask, no_ev
+        else:
+            side, price, ev = pricing.SIDE_NONE, 0, 0.0
+        bet_size = system._calculate_bet_size(confidence, ev, price) if side != pricing.SIDE_NONE else 0
+        rows.append((probability, yes_ev, no_ev, side, price, ev, bet_size))
+    return rows
+
+
+def scalar_recommendation(system, candidate):
+    """(side, bet_size) the per-market path recommended, None for no bet; raises on non-numeric asks"""
+    m = candidate['market_data']
+    probability = system._adjust_probability_for_threshold(candidate['base_probability'], candidate['threshold'])
+    yes_ev = system._calculate_expected_value(probability, m['yes_bid'], m['yes_ask'], 'yes')
+    no_ev = system._calculate_expected_value(1 - probability, m['no_bid'], m['no_ask'], 'no')
+    if yes_ev > no_ev and yes_ev > 0:
+        side, price, ev = 'yes', m['yes_ask'], yes_ev
+    elif no_ev > yes_ev and no_ev > 0:
+        side, price, ev = 'no', m['no_ask'], no_ev
+    else:
+        return None
+    bet_size = system._calculate_bet_size(candidate['confidence'], ev, price)
+    return (side, bet_size) if bet_size > 0 else None
+
+
+def check_candidates(system, m, n=200):
+    """_price_candidates vs the per-market path on market dicts, including 'N/A' prices from main.py"""
+    candidates = [{
+        'ticker': f"KXTEST-{i}",
+        'market_data': {name: int(m[name][i]) for name in ('yes_bid', 'yes_ask', 'no_bid', 'no_ask')},
+        'threshold': int(m['thresholds'][i]),
+        'base_probability': float(m['base_probability'][i]),
+        'confidence': float(m['confidence'][i]),
+    } for i in range(n)]
+    candidates[0]['market_data']['yes_ask'] = 'N/A'  # skipped
+    candidates[1]['market_data']['no_ask'] = 'N/A'  # skipped
+    candidates[2]['market_data']['yes_bid'] = 'N/A'  # bids are not used for pricing: still priced
+
+    expected = {}
+    for candidate in candidates:
+        try:
+            recommendation = scalar_recommendation(system, candidate)
+        except TypeError:
+            continue  # the per-market path raised and skipped this market
+        if recommendation:
+            expected[candidate['ticker']] = recommendation
+
+    system.probability_model = 'linear'
+    with contextlib.redirect_stdout(io.StringIO()):
+        recommendations = system._price_candidates(candidates)
+    actual = {r.ticker: (r.side, r.recommended_bet_size) for r in recommendations}
+    assert actual == expected, "_price_candidates recommendations differ from the per-market path"
+    assert 'KXTEST-0' not in actual and 'KXTEST-1' not in actual
+
+
+def check_parity(rows, priced):
+    columns = ('probability', 'yes_ev', 'no_ev', 'side', 'price', 'expected_value', 'bet_size')
+    for index, name in enumerate(columns):
+        scalar = np.array([row[index] for row in rows], dtype=np.float64)
+        vector = priced[name].astype(np.float64)
+        mismatches = np.flatnonzero(scalar != vector)
+        assert not len(mismatches), (
+            f"{name} differs at {len(mismatches)} markets, first {mismatches[0]}: "
+            f"scalar {scalar[mismatches[0]]!r} vs vectorized {vector[mismatches[0]]!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=int, default=5000, help="synthetic markets")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repetitions per path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    markets = synthetic_markets(args.markets, args.seed)
+    system = BettingSystem.__new__(BettingSystem)  # pricing methods use no client state
+
+    rows = price_scalar(system, markets)
+    priced = pricing.price_markets(**markets)
+    check_parity(rows, priced)
+    check_candidates(system, markets)
+
+    print("PRICING KERNEL BENCHMARK")
+    print("=" * 50)
+    print(f"{args.markets} markets: vectorized results match the scalar methods exactly")
+    print("Markets quoted as 'N/A' are skipped, as in the per-market path")
+    print(f"Sides: {int((priced['side'] == pricing.SIDE_YES).sum())} yes, "
+          f"{int((priced['side'] == pricing.SIDE_NO).sum())} no, "
+          f"{int((priced['side'] == pricing.SIDE_NONE).sum())} none\n")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        price_scalar(system, markets)
+    scalar = (time.perf_counter() - start) / args.repeat
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        pricing.price_markets(**markets)
+    vector = (time.perf_counter() - start) / args.repeat
+
+    print(f"{'scalar methods'.ljust(24)}{args.markets / scalar:14,.0f} markets/sec   {scalar * 1e3:8.2f} ms")
+    print(f"{'pricing.price_markets'.ljust(24)}{args.markets / vector:14,.0f} markets/sec   {vector * 1e3:8.2f} ms")
+    print(f"Speedup: {scalar / vector:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+RSA-PSS request signing micro-benchmark
+
+Reports signatures/sec for:
+  - the old per-call path (PSS/MGF1/SHA256 objects rebuilt every signature)
+  - KalshiBaseClient.sign_pss_text with cached padding and hash objects
+  - full request_headers generation
+  - request_headers_async fanned out over a pool of signing worker processes
+
+Use the numbers to size hosts: each REST request and each WebSocket connect
+costs one signature.
+
+Usage:
+    python benchmark_signing.py [--signatures 2000] [--key-size 2048] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import time
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from clients import KalshiBaseClient, Environment
+
+MESSAGE = "1700000000000GET/trade-api/v2/markets/KXBENCH-50"
+PATH = "/trade-api/v2/markets/KXBENCH-50?depth=10"
+
+
+def sign_uncached(private_key, text):
+    """Signing as it was done before the padding objects were cached"""
+    signature = private_key.sign(
+        text.encode('utf-8'),
+        padding.PSS(
+            mgf=padding.MGF1(hashes.SHA256()),
+            salt_length=padding.PSS.DIGEST_LENGTH
+        ),
+        hashes.SHA256()
+    )
+    return base64.b64encode(signature).decode('utf-8')
+
+
+def rate(name, n, elapsed):
+    per_sec = n / elapsed
+    print(f"{name.ljust(36)}{per_sec:10.0f} signatures/sec   {elapsed / n * 1e6:8.1f} us/signature")
+    return per_sec
+
+
+async def sign_concurrently(client, n):
+    await asyncio.gather(*(client.request_headers_async("GET", PATH) for _ in range(n)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--signatures", type=int, default=2000, help="signatures per variant")
+    parser.add_argument("--key-size", type=int, default=2048, help="RSA key size in bits")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="signing worker processes")
+    args = parser.parse_args()
+    n = args.signatures
+
+    print("RSA-PSS SIGNING BENCHMARK")
+    print("=" * 50)
+    print(f"Key size: {args.key_size} bits, {n} signatures per variant, {os.cpu_count()} CPU(s)\n")
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=args.key_size)
+    client = KalshiBaseClient("benchmark-key", private_key, Environment.DEMO)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        sign_uncached(private_key, MESSAGE)
+    rate("uncached padding objects", n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        client.sign_pss_text(MESSAGE)
+    rate("sign_pss_text (cached)", n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        client.request_headers("GET", PATH)
+    rate("request_headers", n, time.perf_counter() - start)
+
+    pooled_client = KalshiBaseClient("benchmark-key", private_key, Environment.DEMO, signing_workers=args.workers)
+    try:
+        # Start the workers outside the timed region
+        asyncio.run(sign_concurrently(pooled_client, args.workers))
+        start = time.perf_counter()
+        asyncio.run(sign_concurrently(pooled_client, n))
+        rate(f"request_headers_async ({args.workers} workers)", n, time.perf_counter() - start)
+    finally:
+        pooled_client.shutdown_signing_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Startup-time benchmark for importing the betting system
+
+Imports betting_system in fresh interpreters and reports the median import
+time. The import must not pull in nltk or train the sentiment classifier
+(that happens on the first analysis); the script exits with status 1 if it
+does, or if the median exceeds the budget.
+
+Usage:
+    python benchmark_startup.py [--runs 5] [--budget-ms 1000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import betting_system
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'seconds': elapsed,
+    'nltk_imported': 'nltk' in sys.modules,
+    'classifier_loaded': betting_system.sentiment_analyzer.classifier is not None,
+}))
+"""
+
+
+def measure_import() -> dict:
+    """Import betting_system in a new interpreter and return the probe's report"""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="maximum median import time")
+    args = parser.parse_args()
+
+    reports = [measure_import() for _ in range(args.runs)]
+    times_ms = [report['seconds'] * 1000 for report in reports]
+    median_ms = statistics.median(times_ms)
+
+    print("STARTUP BENCHMARK")
+    print("=" * 50)
+    print(f"import betting_system: median {median_ms:.0f} ms "
+          f"(min {min(times_ms):.0f}, max {max(times_ms):.0f}) over {args.runs} runs")
+
+    failures = []
+    if any(report['nltk_imported'] for report in reports):
+        failures.append("nltk was imported at startup")
+    if any(report['classifier_loaded'] for report in reports):
+        failures.append("the sentiment classifier was trained or loaded at startup")
+    if median_ms > args.budget_ms:
+        failures.append(f"median import time {median_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"OK: within the {args.budget_ms:.0f} ms budget, sentiment model deferred to first use")
+
+
+if __name__ == "__main__":
+    main()
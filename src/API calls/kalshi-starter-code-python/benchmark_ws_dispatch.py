@@ -0,0 +1,151 @@
+"""
+WebSocket decode + dispatch throughput benchmark
+
+Replays a feed of raw WebSocket frames and reports messages/sec for:
+  - json.loads alone and the fast backend alone (orjson/ujson if installed)
+  - the old path: json.loads and one generic callback receiving every dict
+  - MessageDispatcher routing to per-type handlers with typed records
+
+The feed is a newline-delimited file with one raw frame per line. Without
+--feed a synthetic mix of ticker, orderbook, trade and fill messages is used;
+--write-sample saves that mix so runs can be repeated on the same input.
+
+Usage:
+    python benchmark_ws_dispatch.py [--feed frames.ndjson] [--messages 200000] [--write-sample PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from ws_dispatch import JSON_BACKEND, MessageDispatcher, loads
+
+
+def synthetic_feed(n, markets=50, seed=7):
+    """Raw frames shaped like Kalshi ticker/orderbook/trade/fill messages"""
+    rng = random.Random(seed)
+    tickers = [f"KXBENCH-25OCT18-T{50 + i}" for i in range(markets)]
+    seq = {sid: 0 for sid in range(1, 5)}
+    frames = []
+    for i in range(n):
+        ticker = rng.choice(tickers)
+        roll = rng.random()
+        if roll < 0.55:
+            sid, message = 2, {"type": "orderbook_delta", "msg": {
+                "market_ticker": ticker, "price": rng.randint(1, 99),
+                "delta": rng.randint(-50, 50), "side": rng.choice(("yes", "no"))}}
+        elif roll < 0.85:
+            bid = rng.randint(1, 97)
+            sid, message = 1, {"type": "ticker", "msg": {
+                "market_ticker": ticker, "price": bid + 1, "yes_bid": bid, "yes_ask": bid + 2,
+                "volume": rng.randint(0, 10**6), "open_interest": rng.randint(0, 10**5),
+                "dollar_volume": rng.randint(0, 10**5), "dollar_open_interest": rng.randint(0, 10**4),
+                "ts": 1760800000 + i}}
+        elif roll < 0.99:
+            price = rng.randint(1, 99)
+            sid, message = 3, {"type": "trade", "msg": {
+                "trade_id": f"t{i}", "market_ticker": ticker, "yes_price": price, "no_price": 100 - price,
+                "count": rng.randint(1, 100), "taker_side": rng.choice(("yes", "no")), "ts": 1760800000 + i}}
+        else:
+            price = rng.randint(1, 99)
+            sid, message = 4, {"type": "fill", "msg": {
+                "trade_id": f"t{i}", "order_id": f"o{i}", "market_ticker": ticker, "is_taker": True,
+                "side": "yes", "yes_price": price, "no_price": 100 - price, "count": 1,
+                "action": "buy", "ts": 1760800000 + i}}
+        seq[sid] += 1
+        message["sid"] = sid
+        message["seq"] = seq[sid]
+        frames.append(json.dumps(message))
+    return frames
+
+
+def report(name, n, elapsed):
+    print(f"{name.ljust(44)}{n / elapsed:12,.0f} msgs/sec   {elapsed / n * 1e6:7.2f} us/msg")
+
+
+async def run_generic(frames):
+    """Baseline: stdlib decode and a single callback that branches on type"""
+    seen = {}
+
+    async def on_message(message):
+        msg = message.get("msg", {})
+        seen[message.get("type")] = msg.get("market_ticker")
+
+    for frame in frames:
+        await on_message(json.loads(frame))
+
+
+async def run_dispatcher(frames, typed):
+    dispatcher = MessageDispatcher()
+    latest = {}
+
+    def on_ticker(update):
+        latest[update.market_ticker if typed else update["msg"]["market_ticker"]] = update
+
+    def on_book(message):
+        latest["book"] = message
+
+    async def on_fill(fill):
+        latest["fill"] = fill
+
+    dispatcher.register("ticker", on_ticker, typed=typed)
+    dispatcher.register("orderbook_delta", on_book, typed=typed)
+    dispatcher.register("trade", on_book, typed=typed)
+    dispatcher.register("fill", on_fill, typed=typed)
+    for frame in frames:
+        await dispatcher.dispatch(loads(frame))
+    return dispatcher.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feed", help="newline-delimited file of raw frames to replay")
+    parser.add_argument("--messages", type=int, default=200000, help="synthetic frames when no --feed is given")
+    parser.add_argument("--write-sample", help="write the synthetic feed to this path and exit")
+    args = parser.parse_args()
+
+    if args.feed:
+        with open(args.feed, encoding="utf-8") as f:
+            frames = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        frames = synthetic_feed(args.messages)
+    if args.write_sample:
+        with open(args.write_sample, "w", encoding="utf-8") as f:
+            f.write("\n".join(frames) + "\n")
+        print(f"Wrote {len(frames)} frames to {args.write_sample}")
+        return
+    n = len(frames)
+
+    print("WEBSOCKET DISPATCH BENCHMARK")
+    print("=" * 50)
+    print(f"{n} frames, fast JSON backend: {JSON_BACKEND}\n")
+
+    start = time.perf_counter()
+    for frame in frames:
+        json.loads(frame)
+    report("decode only (json)", n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for frame in frames:
+        loads(frame)
+    report(f"decode only ({JSON_BACKEND})", n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    asyncio.run(run_generic(frames))
+    report("json + generic on_message (old path)", n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    asyncio.run(run_dispatcher(frames, typed=False))
+    report(f"{JSON_BACKEND} + dispatcher, dict messages", n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    counts = asyncio.run(run_dispatcher(frames, typed=True))
+    report(f"{JSON_BACKEND} + dispatcher, typed records", n, time.perf_counter() - start)
+
+    print("\nMessage mix: " + ", ".join(f"{t}={c}" for t, c in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,26 @@ Integrates with market analysis and provides betting functionality with confirma
 Uses the official KalshiClientsBaseV2ApiKey client structure
 """
 
+import copy
+import hashlib
 import json
 import uuid
 import sys
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
+import pricing
+from clients import MAX_BATCH_ORDERS, KalshiHttpClient
+from order_tracker import OrderTracker
+from portfolio import event_ticker_of
+from score_model import ScoreDistribution, find_ladder_arbitrage
+
 # Add the src directory to the path to import sentiment analysis
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from basic_processing_and_sentiment_analysis.sentiment_classifier import sentiment_analyzer
@@ -43,15 +54,33 @@ class BetOrder:
 class BettingSystem:
     """Main betting system class that handles bet recommendations and placement"""
     
-    def __init__(self, client):
+    def __init__(self, client, order_books=None, order_tracker=None, portfolio=None,
+                 probability_model: str = 'score'):
         """
         Initialize the betting system with a Kalshi client
         
         Args:
             client: KalshiHttpClient instance
+            order_books: Optional OrderBookManager kept live by a WebSocket feed;
+                its top of book overrides the REST prices in market_data
+            order_tracker: OrderTracker that follows placed orders (created if not given);
+                feed it WebSocket fills with order_tracker.handle_message
+            portfolio: Optional PortfolioEngine; recommendations and orders that
+                would breach its limits are rejected before any API call
+            probability_model: 'score' fits one score distribution per event and
+                reads every threshold off it; 'linear' shifts each market by 2% per point
         """
         self.client = client
+        self.order_books = order_books
+        self.order_tracker = order_tracker or OrderTracker()
+        self.portfolio = portfolio
+        self.probability_model = probability_model
+        self.arbitrage_opportunities = []
         self.pending_bets = []
+        # Sentiment results keyed by a hash of the scraped texts; markets of one
+        # event share their texts, so the NLP work runs once per event
+        self._sentiment_cache: Dict[str, Dict] = {}
+        self.sentiment_stats = {'computed': 0, 'reused': 0}
     
     def analyze_markets_for_betting(self, market_data: Dict[str, Dict], scraped_data: Dict[str, List[str]] = None) -> List[BetRecommendation]:
         """
@@ -64,21 +93,49 @@ class BettingSystem:
         Returns:
             List of BetRecommendation objects
         """
-        recommendations = []
-        
         if scraped_data is None:
             scraped_data = {}
         
+        # Step 1: sentiment gate per market
+        computed_before = self.sentiment_stats['computed']
+        reused_before = self.sentiment_stats['reused']
+        candidates = []
+        live_data = {}
         for ticker, data in market_data.items():
+            data = live_data[ticker] = self._with_live_prices(ticker, data)
+            
             # Get scraped data for this ticker using intelligent matching
             ticker_scraped_data = self._find_matching_scraped_data(ticker, scraped_data)
             
-            # Use sentiment analysis for betting recommendations
-            recommendation = self._analyze_sentiment_for_market(ticker, data, ticker_scraped_data)
-            if recommendation:
-                recommendations.append(recommendation)
+            candidate = self._sentiment_gate(ticker, data, ticker_scraped_data)
+            if candidate:
+                candidates.append(candidate)
         
-        return recommendations
+        computed = self.sentiment_stats['computed'] - computed_before
+        reused = self.sentiment_stats['reused'] - reused_before
+        print(f"Sentiment computed for {computed} text set(s), reused {reused} time(s)")
+        self.arbitrage_opportunities = self._find_arbitrage(live_data)
+        
+        # Step 2: price every surviving market in one vectorized pass
+        return self._price_candidates(candidates)
+    
+    def _with_live_prices(self, ticker: str, data: Dict) -> Dict:
+        """
+        Overlay the live order book's top of book on a market's REST prices
+        
+        Args:
+            ticker: Market ticker
+            data: Market price data from main.py
+            
+        Returns:
+            Market data with current bid/ask where the live book has them
+        """
+        if self.order_books is None:
+            return data
+        live_prices = self.order_books.market_prices(ticker)
+        if not live_prices:
+            return data
+        return {**data, **{k: v for k, v in live_prices.items() if v is not None}}
     
     def _find_matching_scraped_data(self, ticker: str, scraped_data: Dict[str, List[str]]) -> List[str]:
         """
@@ -121,16 +178,70 @@ class BettingSystem:
         Returns:
             BetRecommendation if profitable bet is found, None otherwise
         """
+        candidate = self._sentiment_gate(ticker, market_data, scraped_data)
+        if candidate is None:
+            return None
+        recommendations = self._price_candidates([candidate])
+        return recommendations[0] if recommendations else None
+    
+    @staticmethod
+    def _texts_key(texts: List[str]) -> str:
+        """Content hash of an ordered list of texts"""
+        digest = hashlib.sha256()
+        for text in texts:
+            encoded = text.encode('utf-8', 'surrogatepass')
+            digest.update(len(encoded).to_bytes(8, 'little'))
+            digest.update(encoded)
+        return digest.hexdigest()
+    
+    def _sentiment_recommendation(self, texts: List[str], market_title: str) -> Dict:
+        """
+        sentiment_analyzer.get_betting_recommendation, memoized by text content
+        
+        Args:
+            texts: Scraped texts to analyze
+            market_title: Title of the market, echoed in the result
+            
+        Returns:
+            A copy of the recommendation, so callers may modify it
+        """
+        key = self._texts_key(texts)
+        cached = self._sentiment_cache.get(key)
+        if cached is None:
+            cached = sentiment_analyzer.get_betting_recommendation(texts=texts, market_title=market_title)
+            self._sentiment_cache[key] = cached
+            self.sentiment_stats['computed'] += 1
+        else:
+            self.sentiment_stats['reused'] += 1
+        
+        result = copy.deepcopy(cached)
+        result['market_title'] = market_title
+        return result
+    
+    def clear_sentiment_cache(self) -> None:
+        """Forget memoized sentiment, e.g. after new data has been scraped"""
+        self._sentiment_cache.clear()
+    
+    def _sentiment_gate(self, ticker: str, market_data: Dict, scraped_data: List[str]) -> Optional[Dict]:
+        """
+        Decide from sentiment whether a market is worth pricing
+        
+        Args:
+            ticker: Market ticker
+            market_data: Market data dictionary
+            scraped_data: List of scraped text data for sentiment analysis
+            
+        Returns:
+            Pricing inputs (ticker, market data, threshold, sentiment probability
+            and confidence) if the market passes, None otherwise
+        """
         if not scraped_data:
             print(f"No scraped data available for {ticker}, skipping sentiment analysis")
             return None
         
         try:
             # Get sentiment-based betting recommendation
-            sentiment_rec = sentiment_analyzer.get_betting_recommendation(
-                texts=scraped_data,
-                market_title=market_data.get('title', ticker)
-            )
+            sentiment_rec = self._sentiment_recommendation(scraped_data, market_data.get('title', ticker))
             
             # Debug: Show sentiment analysis details
             sentiment_data = sentiment_rec['sentiment_data']
@@ -146,11 +257,9 @@ class BettingSystem:
                 # If sentiment is ~50% but market price suggests different probability, there's opportunity
                 sentiment_percentage = sentiment_data['positive_percentage']
                 
-                # Get market prices to calculate implied probability
-                yes_bid = market_data.get('yes_bid', 0)
-                yes_ask = market_data.get('yes_ask', 0)
-                no_bid = market_data.get('no_bid', 0)
-                no_ask = market_data.get('no_ask', 0)
+                # Get market prices to calculate implied probability ('N/A' becomes NaN and fails the check below)
+                yes_ask = pricing.to_price(market_data.get('yes_ask', 0))
+                no_ask = pricing.to_price(market_data.get('no_ask', 0))
                 
                 # Calculate implied probability from market prices
                 if yes_ask > 0 and no_ask > 0:
@@ -215,58 +324,143 @@ class BettingSystem:
                 print(f"Could not extract threshold from ticker {ticker}")
                 return None
             
-            # Calculate our predicted probability based on sentiment
-            base_probability = sentiment_rec['sentiment_data']['positive_percentage']
-            confidence = sentiment_rec['confidence']
-            
-            # Adjust probability based on market threshold
-            adjusted_probability = self._adjust_probability_for_threshold(base_probability, market_threshold)
-            
-            # Get current market prices
-            yes_bid = market_data.get('yes_bid', 0)
-            yes_ask = market_data.get('yes_ask', 0)
-            no_bid = market_data.get('no_bid', 0)
-            no_ask = market_data.get('no_ask', 0)
-            
-            # Calculate expected value for both sides
-            yes_ev = self._calculate_expected_value(adjusted_probability, yes_bid, yes_ask, 'yes')
-            no_ev = self._calculate_expected_value(1 - adjusted_probability, no_bid, no_ask, 'no')
-            
-            # Choose the side with higher expected value
-            if yes_ev > no_ev and yes_ev > 0:
-                side = 'yes'
-                current_price = yes_ask  # Use ask price since we're buying
-                expected_value = yes_ev
-            elif no_ev > yes_ev and no_ev > 0:
-                side = 'no'
-                current_price = no_ask  # Use ask price since we're buying
-                expected_value = no_ev
-            else:
-                print(f"No profitable bet found for {ticker} (Yes EV: {yes_ev:.3f}, No EV: {no_ev:.3f})")
-                return None
-            
-            # Calculate bet size based on confidence and expected value
-            bet_size = self._calculate_bet_size(confidence, expected_value, current_price)
+            return {
+                'ticker': ticker,
+                'market_data': market_data,
+                'threshold': market_threshold,
+                'base_probability': sentiment_rec['sentiment_data']['positive_percentage'],
+                'confidence': sentiment_rec['confidence'],
+            }
+                
+        except Exception as e:
+            print(f"Error analyzing sentiment for {ticker}: {str(e)}")
+            return None
+    
+    def _price_candidates(self, candidates: List[Dict]) -> List[BetRecommendation]:
+        """
+        Price markets that passed the sentiment gate with the vectorized pricing kernel
+        
+        Matches the per-market _adjust_probability_for_threshold,
+        _calculate_expected_value and _calculate_bet_size logic.
+        
+        Args:
+            candidates: Outputs of _sentiment_gate
             
+        Returns:
+            List of BetRecommendation objects for markets with a profitable side
+        """
+        columns = pricing.price_columns([c['market_data'] for c in candidates])
+        
+        # Both asks are needed to compare the sides; skip markets quoted as 'N/A'
+        priceable = np.isfinite(columns['yes_ask']) & np.isfinite(columns['no_ask'])
+        for i in np.flatnonzero(~priceable):
+            market_data = candidates[i]['market_data']
+            print(f"Skipping {candidates[i]['ticker']}: no numeric ask "
+                  f"(Yes ask: {market_data.get('yes_ask')}, No ask: {market_data.get('no_ask')})")
+        candidates = [c for c, ok in zip(candidates, priceable) if ok]
+        if not candidates:
+            return []
+        columns = {name: np.nan_to_num(column[priceable], nan=0.0) for name, column in columns.items()}
+        
+        priced = pricing.price_markets(
+            thresholds=np.array([c['threshold'] for c in candidates], dtype=np.float64),
+            yes_bid=columns['yes_bid'],
+            yes_ask=columns['yes_ask'],
+            no_bid=columns['no_bid'],
+            no_ask=columns['no_ask'],
+            base_probability=np.array([c['base_probability'] for c in candidates], dtype=np.float64),
+            confidence=np.array([c['confidence'] for c in candidates], dtype=np.float64),
+            probability=self._score_probabilities(candidates) if self.probability_model == 'score' else None,
+        )
+        
+        recommendations = []
+        for i, candidate in enumerate(candidates):
+            ticker = candidate['ticker']
+            side = priced['side'][i]
+            if side == pricing.SIDE_NONE:
+                print(f"No profitable bet found for {ticker} (Yes EV: {priced['yes_ev'][i]:.3f}, No EV: {priced['no_ev'][i]:.3f})")
+                continue
+            bet_size = int(priced['bet_size'][i])
             if bet_size <= 0:
                 print(f"Bet size too small for {ticker}")
-                return None
+                continue
             
-            return BetRecommendation(
+            probability = float(priced['probability'][i])
+            expected_value = float(priced['expected_value'][i])
+            current_price = candidate['market_data'].get('yes_ask' if side == pricing.SIDE_YES else 'no_ask', 0)
+            recommendations.append(BetRecommendation(
                 ticker=ticker,
-                side=side,
-                confidence=confidence,
-                reasoning=f"Predicted {adjusted_probability:.1%} probability above {market_threshold}. EV: {expected_value:.3f}",
-                market_title=market_data.get('title', ticker),
+                side='yes' if side == pricing.SIDE_YES else 'no',
+                confidence=candidate['confidence'],
+                reasoning=f"Predicted {probability:.1%} probability above {candidate['threshold']}. EV: {expected_value:.3f}",
+                market_title=candidate['market_data'].get('title', ticker),
                 current_price=current_price,
-                predicted_probability=adjusted_probability,
+                predicted_probability=probability,
                 expected_value=expected_value,
                 recommended_bet_size=bet_size
+            ))
+        
+        return recommendations
+    
+    def _score_probabilities(self, candidates: List[Dict]) -> np.ndarray:
+        """
+        P(YES) for each candidate from one score distribution per event
+        
+        The event's distribution is centred on the confidence-weighted sentiment
+        of its markets, so probabilities are monotone across its thresholds.
+        """
+        events: Dict[str, List[int]] = {}
+        for i, candidate in enumerate(candidates):
+            events.setdefault(event_ticker_of(candidate['ticker']), []).append(i)
+        
+        probabilities = np.empty(len(candidates))
+        for event_ticker, indices in events.items():
+            group = [candidates[i] for i in indices]
+            distribution = ScoreDistribution.from_sentiment(
+                [c['base_probability'] for c in group],
+                weights=[c['confidence'] for c in group],
             )
-                
-        except Exception as e:
-            print(f"Error analyzing sentiment for {ticker}: {str(e)}")
-            return None
+            thresholds = np.array([c['threshold'] for c in group], dtype=np.float64)
+            probabilities[indices] = distribution.prob_above(thresholds)
+            
+            implied = ScoreDistribution.fit_to_market(
+                thresholds,
+                [c['market_data'].get('yes_bid') for c in group],
+                [c['market_data'].get('yes_ask') for c in group],
+            )
+            implied_text = f", market-implied {implied.mu:.1f}" if implied else ""
+            print(f"{event_ticker}: predicted median score {distribution.mu:.1f}{implied_text}")
+        return probabilities
+    
+    def _find_arbitrage(self, market_data: Dict[str, Dict]) -> List[Dict]:
+        """
+        Check every event's threshold ladder for YES/NO pairs priced below 100
+        
+        Returns:
+            Opportunities from score_model.find_ladder_arbitrage, tagged with their event
+        """
+        events: Dict[str, List[Tuple[str, int, Dict]]] = {}
+        for ticker, data in market_data.items():
+            threshold = self._extract_market_threshold(ticker)
+            if threshold is not None:
+                events.setdefault(event_ticker_of(ticker), []).append((ticker, threshold, data))
+        
+        opportunities = []
+        for event_ticker, markets in events.items():
+            if len(markets) < 2:
+                continue
+            found = find_ladder_arbitrage(
+                thresholds=[threshold for _, threshold, _ in markets],
+                yes_ask=[data.get('yes_ask') for _, _, data in markets],
+                no_ask=[data.get('no_ask') for _, _, data in markets],
+                tickers=[ticker for ticker, _, _ in markets],
+            )
+            for opportunity in found:
+                opportunity['event_ticker'] = event_ticker
+                print(f"ARBITRAGE: YES {opportunity['yes_ticker']} + NO {opportunity['no_ticker']} "
+                      f"costs {opportunity['cost']:.0f} cents, pays at least 100")
+            opportunities.extend(found)
+        return opportunities
     
     def _extract_market_threshold(self, ticker: str) -> Optional[int]:
         """
@@ -501,15 +695,9 @@ class BettingSystem:
             print(f"Client Order ID: {bet_order.client_order_id}")
             
             # Place the order using the KalshiHttpClient
-            # Use market order to ensure execution, or limit order slightly above ask for better fill
-            if bet_order.side == 'yes':
-                # For YES bets, use market order or limit slightly above ask
-                order_price = bet_order.price + 1  # Add 1 cent to improve fill probability
-                order_type = "limit"
-            else:
-                # For NO bets, use market order or limit slightly above ask  
-                order_price = bet_order.price + 1  # Add 1 cent to improve fill probability
-                order_type = "limit"
+            # Use a limit order slightly above ask for better fill
+            order_price = self._order_price(bet_order)
+            order_type = "limit"
             
             print(f"Placing {order_type} order at {order_price} cents (original ask: {bet_order.price} cents)")
             
@@ -528,15 +716,26 @@ class BettingSystem:
                 print(f"Mock Order Status: pending")
                 return True
             
+            if self.portfolio is not None:
+                breaches = self.portfolio.check_order(bet_order.ticker, bet_order.side, bet_order.amount, order_price)
+                if breaches:
+                    print(f"Bet rejected by portfolio limits: {'; '.join(breaches)}")
+                    return False
+            
+            self.order_tracker.track(bet_order.client_order_id, bet_order.ticker, bet_order.side,
+                                     bet_order.amount, order_price)
             response = self.client.create_order(
                 ticker=bet_order.ticker,
                 side=bet_order.side,
                 amount=bet_order.amount,
                 price=order_price,
-                order_type=order_type
+                order_type=order_type,
+                client_order_id=bet_order.client_order_id
             )
             
             print(f"API Response: {response}")
+            self.order_tracker.record_response(bet_order.client_order_id, response)
+            self._record_in_portfolio(bet_order, response)
             
             if response:
                 print(f"Bet placed successfully!")
@@ -553,6 +752,7 @@ class BettingSystem:
                 return False
                 
         except Exception as e:
+            self.order_tracker.record_response(bet_order.client_order_id, None)
             print(f"Error placing bet: {str(e)}")
             print(f"Error type: {type(e).__name__}")
             print(f"This could be due to:")
@@ -562,6 +762,175 @@ class BettingSystem:
             print(f"  - Market not accepting orders")
             return False
     
+    def _order_price(self, bet_order: BetOrder) -> int:
+        """Limit price for a bet: 1 cent above the ask to improve fill probability"""
+        return int(bet_order.price + 1)
+    
+    def place_bets_batch(self, bet_orders: List[BetOrder], batch_size: int = MAX_BATCH_ORDERS,
+                         max_workers: int = 4, mock_mode: bool = False) -> Dict[str, Optional[Dict]]:
+        """
+        Place many bets with batch_create_orders instead of one request per bet
+        
+        Orders are split into API-sized batches submitted concurrently (the
+        client's rate limiter still paces the requests). The per-order results
+        are matched back by client_order_id. If a whole batch request fails,
+        its orders are retried one by one with place_bet, reusing their
+        client_order_ids, so an order that did reach the exchange is rejected
+        as a duplicate instead of being placed twice.
+        
+        Args:
+            bet_orders: Confirmed BetOrder objects
+            batch_size: Orders per batch request (Kalshi accepts at most 20)
+            max_workers: Batch requests in flight at once
+            mock_mode: If True, simulate without placing anything
+            
+        Returns:
+            Dictionary mapping client_order_id to the created order, or None if it failed
+        """
+        results: Dict[str, Optional[Dict]] = {}
+        if not bet_orders:
+            return results
+        
+        if mock_mode or not hasattr(self.client, 'batch_create_orders'):
+            for bet_order in bet_orders:
+                placed = self.place_bet(bet_order, mock_mode=mock_mode)
+                results[bet_order.client_order_id] = {'client_order_id': bet_order.client_order_id} if placed else None
+            return results
+        
+        if self.portfolio is not None:
+            # Drop orders that would breach the limits before anything is sent
+            candidates = [BetRecommendation(b.ticker, b.side, 0.0, '', b.market_title, self._order_price(b),
+                                            recommended_bet_size=b.amount) for b in bet_orders]
+            allowed = {id(r) for r in self.portfolio.filter_recommendations(candidates)}
+            kept = []
+            for bet_order, candidate in zip(bet_orders, candidates):
+                if id(candidate) in allowed:
+                    kept.append(bet_order)
+                else:
+                    results[bet_order.client_order_id] = None
+            bet_orders = kept
+            if not bet_orders:
+                return results
+        
+        batch_size = max(1, min(batch_size, MAX_BATCH_ORDERS))
+        batches = [bet_orders[i:i + batch_size] for i in range(0, len(bet_orders), batch_size)]
+        print(f"\nSubmitting {len(bet_orders)} orders in {len(batches)} batch request(s)...")
+        
+        for bet_order in bet_orders:
+            self.order_tracker.track(bet_order.client_order_id, bet_order.ticker, bet_order.side,
+                                     bet_order.amount, self._order_price(bet_order))
+        
+        def submit(batch: List[BetOrder]) -> Dict:
+            orders = [
+                KalshiHttpClient.build_order(
+                    ticker=bet_order.ticker,
+                    side=bet_order.side,
+                    amount=bet_order.amount,
+                    price=self._order_price(bet_order),
+                    client_order_id=bet_order.client_order_id,
+                )
+                for bet_order in batch
+            ]
+            return self.client.batch_create_orders(orders)
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+            futures = [(batch, executor.submit(submit, batch)) for batch in batches]
+            for batch, future in futures:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    print(f"Batch of {len(batch)} orders failed ({type(e).__name__}: {e}); placing them individually")
+                    for bet_order in batch:
+                        placed = self.place_bet(bet_order)
+                        results[bet_order.client_order_id] = {'client_order_id': bet_order.client_order_id} if placed else None
+                    continue
+                self._reconcile_batch(batch, response, results)
+        
+        return results
+    
+    def _reconcile_batch(self, batch: List[BetOrder], response: Dict, results: Dict[str, Optional[Dict]]) -> None:
+        """Record the per-order outcome of one batch_create_orders response"""
+        entries = (response or {}).get('orders') or []
+        by_id = {}
+        for position, entry in enumerate(entries):
+            order = entry.get('order') or {}
+            client_order_id = entry.get('client_order_id') or order.get('client_order_id')
+            if client_order_id is None and position < len(batch):
+                client_order_id = batch[position].client_order_id
+            by_id[client_order_id] = entry
+        
+        for bet_order in batch:
+            entry = by_id.get(bet_order.client_order_id)
+            if entry is None:
+                # Unknown outcome: stays PENDING in the tracker until the next poll
+                print(f"No result returned for {bet_order.ticker} ({bet_order.client_order_id})")
+                results[bet_order.client_order_id] = None
+            elif entry.get('error') or not entry.get('order'):
+                print(f"Order failed for {bet_order.ticker}: {entry.get('error')}")
+                self.order_tracker.record_response(bet_order.client_order_id, None)
+                results[bet_order.client_order_id] = None
+            else:
+                order = entry['order']
+                print(f"Order placed for {bet_order.ticker} {bet_order.side.upper()}: "
+                      f"{order.get('order_id', 'Unknown')} ({order.get('status', 'Unknown')})")
+                self.order_tracker.record_response(bet_order.client_order_id, order)
+                self._record_in_portfolio(bet_order, order)
+                results[bet_order.client_order_id] = order
+    
+    def _record_in_portfolio(self, bet_order: BetOrder, response: Optional[Dict]) -> None:
+        """Reserve a placed order's cost in the portfolio until it fills or is cancelled"""
+        if self.portfolio is None or not response:
+            return
+        order = response.get('order', response)
+        if order.get('status', 'resting') == 'resting':
+            self.portfolio.record_order(order.get('order_id') or bet_order.client_order_id, bet_order.ticker,
+                                        bet_order.side, bet_order.amount, self._order_price(bet_order))
+    
+    def refresh_portfolio(self) -> Dict:
+        """
+        Reload cash, positions and resting orders into the portfolio engine
+        
+        Returns:
+            Portfolio summary (cash, exposure and worst-case loss per event)
+        """
+        if self.portfolio is None:
+            return {}
+        try:
+            self.portfolio.load(self.client)
+        except Exception as e:
+            print(f"Error refreshing portfolio: {str(e)}")
+        return self.portfolio.summary()
+    
+    def refresh_orders(self) -> Dict[str, int]:
+        """
+        Update tracked orders from get_orders/get_fills, fetching only what changed
+        
+        The fills are also applied to the portfolio engine, if any, so cash
+        reserved for resting orders is released as they fill.
+        
+        Returns:
+            Number of orders per state after the refresh
+        """
+        on_fills = self.portfolio.ingest_fills if self.portfolio is not None else None
+        try:
+            self.order_tracker.poll(self.client, on_fills=on_fills)
+        except Exception as e:
+            print(f"Error refreshing orders: {str(e)}")
+        return self.order_tracker.summary()
+    
+    def cancel_stale_orders(self, max_age: float = 300.0) -> int:
+        """
+        Cancel open orders that have not changed for max_age seconds
+        
+        Returns:
+            Number of orders cancelled
+        """
+        try:
+            return len(self.order_tracker.cancel_stale(self.client, max_age))
+        except Exception as e:
+            print(f"Error cancelling stale orders: {str(e)}")
+            return 0
+    
     def process_betting_workflow(self, market_data: Dict[str, Dict], scraped_data: Dict[str, List[str]] = None) -> None:
         """
         Complete betting workflow: analyze markets, get recommendations, confirm, and place bets
@@ -577,6 +946,12 @@ class BettingSystem:
         print("Analyzing markets for betting opportunities using sentiment analysis...")
         recommendations = self.analyze_markets_for_betting(market_data, scraped_data)
         
+        # Drop recommendations that would breach portfolio limits (bets are 1 share, 1 cent over the ask),
+        # checked against the account's current cash and positions
+        if self.portfolio is not None:
+            self.refresh_portfolio()
+            recommendations = self.portfolio.filter_recommendations(recommendations, contracts=1, price_offset=1)
+        
         # Step 2: Display recommendations
         self.display_betting_recommendations(recommendations)
         
@@ -598,11 +973,8 @@ class BettingSystem:
         print(f"\nPLACING {len(confirmed_bets)} CONFIRMED BETS")
         print("=" * 50)
         
-        successful_bets = 0
-        for bet_order in confirmed_bets:
-            # Test real API calls
-            if self.place_bet(bet_order, mock_mode=False):
-                successful_bets += 1
+        results = self.place_bets_batch(confirmed_bets, mock_mode=False)
+        successful_bets = sum(1 for order in results.values() if order)
         
         print(f"\nBETTING SUMMARY")
         print("=" * 30)
@@ -2,10 +2,12 @@
 Client wrapper to provide compatibility between official ExchangeClient and existing market analysis functions
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional
 import sys
 import os
 
+from pagination import iter_items
+
 # Add the official client path to sys.path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'KalshiAPIStarterCodeWithApiKey'))
 from KalshiClientsBaseV2ApiKey import ExchangeClient
@@ -58,7 +60,8 @@ class KalshiClientWrapper:
         """
         return self.client.get_balance()
     
-    def create_order(self, ticker: str, side: str, amount: int, price: float, order_type: str = "limit") -> Dict[str, Any]:
+    def create_order(self, ticker: str, side: str, amount: int, price: float, order_type: str = "limit",
+                     client_order_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Create an order (compatibility method for betting system)
         
@@ -68,6 +71,7 @@ class KalshiClientWrapper:
             amount: Number of shares
             price: Price in cents
             order_type: Order type (not used in official client)
+            client_order_id: Idempotency key (generated if not given)
             
         Returns:
             Order response dictionary
@@ -75,7 +79,7 @@ class KalshiClientWrapper:
         import uuid
         
         # Generate unique client order ID
-        client_order_id = str(uuid.uuid4())
+        client_order_id = client_order_id or str(uuid.uuid4())
         
         # Create order using official client
         return self.client.create_order(
@@ -89,6 +93,30 @@ class KalshiClientWrapper:
             no_price=int(price) if side == "no" else None
         )
     
+    def batch_create_orders(self, orders: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create up to 20 orders in one request
+        
+        Args:
+            orders: Order bodies (see KalshiHttpClient.build_order)
+            
+        Returns:
+            Batch response with one {client_order_id, order, error} entry per order
+        """
+        return self.client.batch_create_orders(orders)
+    
+    def batch_cancel_orders(self, order_ids: List[str]) -> Dict[str, Any]:
+        """
+        Cancel up to 20 resting orders in one request
+        
+        Args:
+            order_ids: Order IDs to cancel
+            
+        Returns:
+            Batch cancel response dictionary
+        """
+        return self.client.batch_cancel_orders(order_ids)
+    
     def get_orders(self, ticker: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """
         Get orders
@@ -126,3 +154,118 @@ class KalshiClientWrapper:
             Positions data dictionary
         """
         return self.client.get_positions(ticker=ticker, **kwargs)
+    
+    def get_trades(self, ticker: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Get one page of public trades
+        
+        Args:
+            ticker: Market ticker to filter by
+            **kwargs: limit, cursor, min_ts, max_ts
+            
+        Returns:
+            Trades data dictionary
+        """
+        return self.client.get_trades(ticker=ticker, **kwargs)
+    
+    def get_market_history(self, series_ticker: str, market_ticker: str, period_interval: int,
+                           end_ts: int, start_ts: int) -> Dict[str, Any]:
+        """
+        Get candlesticks for a market
+        
+        Args:
+            series_ticker: Series the market belongs to
+            market_ticker: Market ticker
+            period_interval: Candle length in minutes (1, 60 or 1440)
+            end_ts: End of the range (unix seconds)
+            start_ts: Start of the range (unix seconds)
+            
+        Returns:
+            Candlestick data dictionary
+        """
+        return self.client.get_market_history(series_ticker, market_ticker, period_interval, end_ts, start_ts)
+    
+    def iter_markets(self, page_size: Optional[int] = None, max_items: Optional[int] = None, **filters) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over every market, following the cursor across pages
+        
+        Args:
+            page_size: Markets requested per page
+            max_items: Stop after this many markets
+            **filters: Filters accepted by get_markets
+            
+        Returns:
+            Iterator of market dictionaries
+        """
+        return iter_items(self.client.get_markets, 'markets', page_size, max_items, **filters)
+    
+    def iter_trades(self, page_size: Optional[int] = None, max_items: Optional[int] = None, **filters) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over every trade, following the cursor across pages
+        
+        Args:
+            page_size: Trades requested per page
+            max_items: Stop after this many trades
+            **filters: Filters accepted by ExchangeClient.get_trades
+            
+        Returns:
+            Iterator of trade dictionaries
+        """
+        return iter_items(self.client.get_trades, 'trades', page_size, max_items, **filters)
+    
+    def iter_orders(self, page_size: Optional[int] = None, max_items: Optional[int] = None, **filters) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over every order, following the cursor across pages
+        
+        Args:
+            page_size: Orders requested per page
+            max_items: Stop after this many orders
+            **filters: Filters accepted by get_orders
+            
+        Returns:
+            Iterator of order dictionaries
+        """
+        return iter_items(self.client.get_orders, 'orders', page_size, max_items, **filters)
+    
+    def iter_fills(self, page_size: Optional[int] = None, max_items: Optional[int] = None, **filters) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over every fill, following the cursor across pages
+        
+        Args:
+            page_size: Fills requested per page
+            max_items: Stop after this many fills
+            **filters: Filters accepted by ExchangeClient.get_fills
+            
+        Returns:
+            Iterator of fill dictionaries
+        """
+        return iter_items(self.client.get_fills, 'fills', page_size, max_items, **filters)
+    
+    def iter_positions(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                       key: str = 'market_positions', **filters) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over positions, following the cursor across pages
+        
+        Args:
+            page_size: Positions requested per page
+            max_items: Stop after this many positions
+            key: 'market_positions' or 'event_positions'
+            **filters: Filters accepted by get_positions
+            
+        Returns:
+            Iterator of position dictionaries
+        """
+        return iter_items(self.client.get_positions, key, page_size, max_items, **filters)
+    
+    def iter_settlements(self, page_size: Optional[int] = None, max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over every portfolio settlement
+        
+        Args:
+            page_size: Settlements requested per page
+            max_items: Stop after this many settlements
+            
+        Returns:
+            Iterator of settlement dictionaries
+        """
+        return iter_items(self.client.get_portfolio_settlements, 'settlements', page_size, max_items)
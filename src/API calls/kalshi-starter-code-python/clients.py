@@ -1,23 +1,55 @@
 import requests
+import asyncio
 import base64
 import time
-from typing import Any, Dict, Optional
-from datetime import datetime, timedelta
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple, Union
+from datetime import datetime
 from enum import Enum
 import json
+import os
 
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
+from urllib3.util.retry import Retry
 
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from cryptography.exceptions import InvalidSignature
 
+import aiohttp
 import websockets
 
+from feed_recorder import FeedRecorder
+from pagination import aiter_items, iter_items
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from ws_dispatch import MessageDispatcher, loads
+
 class Environment(Enum):
     DEMO = "demo"
     PROD = "prod"
 
+# Private key of a signing worker process, loaded once by _init_signing_worker
+_worker_private_key = None
+_worker_padding = None
+
+def _init_signing_worker(private_key_pem: bytes) -> None:
+    """Loads the private key and PSS parameters once per signing worker process."""
+    global _worker_private_key, _worker_padding
+    _worker_private_key = serialization.load_pem_private_key(private_key_pem, password=None)
+    _worker_padding = padding.PSS(
+        mgf=padding.MGF1(hashes.SHA256()),
+        salt_length=padding.PSS.DIGEST_LENGTH
+    )
+
+def _sign_in_worker(text: str) -> str:
+    """Signs text inside a signing worker process."""
+    signature = _worker_private_key.sign(text.encode('utf-8'), _worker_padding, hashes.SHA256())
+    return base64.b64encode(signature).decode('utf-8')
+
 class KalshiBaseClient:
     """Base client class for interacting with the Kalshi API."""
     def __init__(
@@ -25,6 +57,7 @@ class KalshiBaseClient:
         key_id: str,
         private_key: rsa.RSAPrivateKey,
         environment: Environment = Environment.DEMO,
+        signing_workers: int = 0,
     ):
         """Initializes the client with the provided API key and private key.
 
@@ -32,12 +65,23 @@ class KalshiBaseClient:
             key_id (str): Your Kalshi API key ID.
             private_key (rsa.RSAPrivateKey): Your RSA private key.
             environment (Environment): The API environment to use (DEMO or PROD).
+            signing_workers (int): Processes used by request_headers_async to
+                sign off the event loop; 0 signs inline.
         """
         self.key_id = key_id
         self.private_key = private_key
         self.environment = environment
         self.last_api_call = datetime.now()
 
+        # Built once per client instead of once per signature
+        self._pss_padding = padding.PSS(
+            mgf=padding.MGF1(hashes.SHA256()),
+            salt_length=padding.PSS.DIGEST_LENGTH
+        )
+        self._sign_hash = hashes.SHA256()
+        self.signing_workers = signing_workers
+        self._signing_pool: Optional[ProcessPoolExecutor] = None
+
         if self.environment == Environment.DEMO:
             self.HTTP_BASE_URL = "https://demo-api.kalshi.co"
             self.WS_BASE_URL = "wss://demo-api.kalshi.co"
@@ -47,64 +91,187 @@ class KalshiBaseClient:
         else:
             raise ValueError("Invalid environment")
 
-    def request_headers(self, method: str, path: str) -> Dict[str, Any]:
-        """Generates the required authentication headers for API requests."""
-        current_time_milliseconds = int(time.time() * 1000)
-        timestamp_str = str(current_time_milliseconds)
-
-        # Remove query params from path
-        path_parts = path.split('?')
+    def _signing_message(self, method: str, path: str) -> Tuple[str, str]:
+        """Returns the timestamp and the text to sign, ignoring query params."""
+        timestamp_str = str(int(time.time() * 1000))
+        return timestamp_str, timestamp_str + method + path.partition('?')[0]
 
-        msg_string = timestamp_str + method + path_parts[0]
-        signature = self.sign_pss_text(msg_string)
-
-        headers = {
+    def _auth_headers(self, timestamp_str: str, signature: str) -> Dict[str, Any]:
+        return {
             "Content-Type": "application/json",
             "KALSHI-ACCESS-KEY": self.key_id,
             "KALSHI-ACCESS-SIGNATURE": signature,
             "KALSHI-ACCESS-TIMESTAMP": timestamp_str,
         }
-        return headers
+
+    def request_headers(self, method: str, path: str) -> Dict[str, Any]:
+        """Generates the required authentication headers for API requests."""
+        timestamp_str, msg_string = self._signing_message(method, path)
+        return self._auth_headers(timestamp_str, self.sign_pss_text(msg_string))
+
+    async def request_headers_async(self, method: str, path: str) -> Dict[str, Any]:
+        """Generates authentication headers, signing in the worker pool if one is configured."""
+        if not self.signing_workers:
+            return self.request_headers(method, path)
+        timestamp_str, msg_string = self._signing_message(method, path)
+        loop = asyncio.get_running_loop()
+        signature = await loop.run_in_executor(self._get_signing_pool(), _sign_in_worker, msg_string)
+        return self._auth_headers(timestamp_str, signature)
+
+    def _get_signing_pool(self) -> ProcessPoolExecutor:
+        """Starts the signing worker processes on first use."""
+        if self._signing_pool is None:
+            private_key_pem = self.private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+            self._signing_pool = ProcessPoolExecutor(
+                max_workers=self.signing_workers,
+                initializer=_init_signing_worker,
+                initargs=(private_key_pem,),
+            )
+        return self._signing_pool
+
+    def shutdown_signing_pool(self) -> None:
+        """Stops the signing worker processes, if any were started."""
+        if self._signing_pool is not None:
+            self._signing_pool.shutdown(wait=True)
+            self._signing_pool = None
 
     def sign_pss_text(self, text: str) -> str:
         """Signs the text using RSA-PSS and returns the base64 encoded signature."""
         message = text.encode('utf-8')
         try:
-            signature = self.private_key.sign(
-                message,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.DIGEST_LENGTH
-                ),
-                hashes.SHA256()
-            )
+            signature = self.private_key.sign(message, self._pss_padding, self._sign_hash)
             return base64.b64encode(signature).decode('utf-8')
         except InvalidSignature as e:
             raise ValueError("RSA sign PSS failed") from e
 
+# Largest number of orders Kalshi accepts in one batched create or cancel
+MAX_BATCH_ORDERS = 20
+
+# (endpoint, payload format) pairs create_order tries, in order, until one works
+ORDER_ROUTES = [
+    ("/trade-api/v2/portfolio/orders", "standard"),
+    ("/portfolio/orders", "standard"),
+    ("/trade-api/v2/orders", "standard"),
+    ("/trading/orders", "standard"),
+    ("/orders", "standard"),
+    ("/v1/orders", "standard"),
+    ("/api/orders", "standard"),
+    ("/trade-api/v2/portfolio/orders", "explicit_nulls"),
+]
+
+# On-disk state shared with the sentiment model registry, outside the source tree
+CACHE_DIR = os.environ.get("ROTTEN_TO_RICHES_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "rotten_to_riches"))
+
+# Where the working order route is remembered between runs, keyed by API host
+DEFAULT_ORDER_ROUTES_PATH = os.path.join(CACHE_DIR, "order_routes.json")
+
+
 class KalshiHttpClient(KalshiBaseClient):
-    """Client for handling HTTP connections to the Kalshi API."""
+    """Client for handling HTTP connections to the Kalshi API.
+
+    All requests go through one pooled keep-alive ``requests.Session`` so that
+    sweeping an event reuses the same TCP+TLS connections. Use the client as a
+    context manager (or call ``close()``) to release the pool.
+    """
     def __init__(
         self,
         key_id: str,
         private_key: rsa.RSAPrivateKey,
         environment: Environment = Environment.DEMO,
+        pool_connections: int = 4,
+        pool_maxsize: int = 16,
+        max_retries: int = 3,
+        backoff_factor: float = 0.3,
+        timeout: Union[float, Tuple[float, float]] = (3.05, 10.0),
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        recorder: Optional[FeedRecorder] = None,
+        order_routes_path: Optional[str] = DEFAULT_ORDER_ROUTES_PATH,
     ):
+        """Initializes the client and its connection pool.
+
+        Args:
+            key_id (str): Your Kalshi API key ID.
+            private_key (rsa.RSAPrivateKey): Your RSA private key.
+            environment (Environment): The API environment to use (DEMO or PROD).
+            pool_connections (int): Number of host pools to cache.
+            pool_maxsize (int): Maximum kept-alive connections per host.
+            max_retries (int): Retries for connection errors and 429/5xx
+                responses on idempotent methods (POST is never retried).
+            backoff_factor (float): Exponential backoff factor between retries.
+            timeout: Seconds, or a (connect, read) tuple, applied to every request.
+            rate_limiter (RateLimiter): Read/write token buckets; pass the same
+                instance to several clients to share one budget.
+            cache (ResponseCache): Opt-in TTL cache for get_market, get_event,
+                get_series and get_exchange_status. Market entries are
+                invalidated whenever an order is placed.
+            recorder (FeedRecorder): Appends every GET response to a feed log
+                for offline replay.
+            order_routes_path (str): JSON file remembering which order endpoint
+                and payload format worked for each host, so create_order stops
+                probing after the first success. None keeps it in memory only.
+        """
         super().__init__(key_id, private_key, environment)
         self.host = self.HTTP_BASE_URL
         self.exchange_url = "/trade-api/v2/exchange"
         self.markets_url = "/trade-api/v2/markets"
         self.portfolio_url = "/trade-api/v2/portfolio"
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.last_throttle = 0.0
+        self.cache = cache
+        self.recorder = recorder
+        self.events_url = "/trade-api/v2/events"
+        self.series_url = "/trade-api/v2/series"
+        self.session = self._build_session(pool_connections, pool_maxsize, max_retries, backoff_factor)
+        self.order_routes_path = order_routes_path
+        self.order_route = self._load_order_route()
+        self.order_metrics = {'orders': 0, 'failed_attempts': 0, 'attempts_avoided': 0, 'probes': 0}
+
+    @staticmethod
+    def _build_session(
+        pool_connections: int,
+        pool_maxsize: int,
+        max_retries: int,
+        backoff_factor: float,
+    ) -> requests.Session:
+        """Creates a keep-alive session with a sized pool and retry policy."""
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self) -> None:
+        """Closes all pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "KalshiHttpClient":
+        return self
 
-    def rate_limit(self) -> None:
-        """Built-in rate limiter to prevent exceeding API rate limits."""
-        THRESHOLD_IN_MILLISECONDS = 100
-        now = datetime.now()
-        threshold_in_microseconds = 1000 * THRESHOLD_IN_MILLISECONDS
-        threshold_in_seconds = THRESHOLD_IN_MILLISECONDS / 1000
-        if now - self.last_api_call < timedelta(microseconds=threshold_in_microseconds):
-            time.sleep(threshold_in_seconds)
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def rate_limit(self, method: str = "GET") -> float:
+        """Waits for the read or write budget of the method; returns seconds throttled."""
+        self.last_throttle = self.rate_limiter.acquire(method)
         self.last_api_call = datetime.now()
+        return self.last_throttle
 
     def raise_if_bad_response(self, response: requests.Response) -> None:
         """Raises an HTTPError if the response status code indicates an error."""
@@ -113,44 +280,61 @@ class KalshiHttpClient(KalshiBaseClient):
 
     def post(self, path: str, body: dict) -> Any:
         """Performs an authenticated POST request to the Kalshi API."""
-        self.rate_limit()
-        response = requests.post(
+        self.rate_limit("POST")
+        response = self.session.post(
             self.host + path,
             json=body,
-            headers=self.request_headers("POST", path)
+            headers=self.request_headers("POST", path),
+            timeout=self.timeout,
         )
         self.raise_if_bad_response(response)
         return response.json()
 
     def get(self, path: str, params: Dict[str, Any] = {}) -> Any:
         """Performs an authenticated GET request to the Kalshi API."""
-        self.rate_limit()
-        response = requests.get(
+        self.rate_limit("GET")
+        response = self.session.get(
             self.host + path,
             headers=self.request_headers("GET", path),
-            params=params
+            params=params,
+            timeout=self.timeout,
         )
         self.raise_if_bad_response(response)
-        return response.json()
+        data = response.json()
+        if self.recorder is not None:
+            self.recorder.record_snapshot(path, params, data)
+        return data
 
-    def delete(self, path: str, params: Dict[str, Any] = {}) -> Any:
+    def delete(self, path: str, params: Dict[str, Any] = {}, body: Optional[dict] = None) -> Any:
         """Performs an authenticated DELETE request to the Kalshi API."""
-        self.rate_limit()
-        response = requests.delete(
+        self.rate_limit("DELETE")
+        response = self.session.delete(
             self.host + path,
+            json=body,
             headers=self.request_headers("DELETE", path),
-            params=params
+            params=params,
+            timeout=self.timeout,
         )
         self.raise_if_bad_response(response)
         return response.json()
 
+    def cached_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Performs a GET through the response cache when one is configured."""
+        if self.cache is None:
+            return self.get(path, params=params or {})
+        response = self.cache.get(path, params)
+        if ResponseCache.is_miss(response):
+            response = self.get(path, params=params or {})
+            self.cache.set(path, params, response)
+        return response
+
     def get_balance(self) -> Dict[str, Any]:
         """Retrieves the account balance."""
         return self.get(self.portfolio_url + '/balance')
 
     def get_exchange_status(self) -> Dict[str, Any]:
         """Retrieves the exchange status."""
-        return self.get(self.exchange_url + "/status")
+        return self.cached_get(self.exchange_url + "/status")
 
     def get_trades(
         self,
@@ -200,7 +384,31 @@ class KalshiHttpClient(KalshiBaseClient):
 
     def get_market(self, ticker: str) -> Dict[str, Any]:
         """Retrieves a specific market by ticker."""
-        return self.get(f"{self.markets_url}/{ticker}")
+        return self.cached_get(f"{self.markets_url}/{ticker}")
+
+    def get_event(self, event_ticker: str) -> Dict[str, Any]:
+        """Retrieves a specific event by ticker."""
+        return self.cached_get(f"{self.events_url}/{event_ticker}")
+
+    def get_series(self, series_ticker: str) -> Dict[str, Any]:
+        """Retrieves a specific series by ticker."""
+        return self.cached_get(f"{self.series_url}/{series_ticker}")
+
+    def get_market_history(
+        self,
+        series_ticker: str,
+        market_ticker: str,
+        period_interval: int,
+        end_ts: int,
+        start_ts: int,
+    ) -> Dict[str, Any]:
+        """Retrieves candlesticks for a market (period_interval in minutes: 1, 60 or 1440)."""
+        params = {
+            'period_interval': period_interval,
+            'start_ts': start_ts,
+            'end_ts': end_ts,
+        }
+        return self.get(f"{self.series_url}/{series_ticker}/markets/{market_ticker}/candlesticks", params=params)
 
     def get_orderbook(
         self,
@@ -212,135 +420,955 @@ class KalshiHttpClient(KalshiBaseClient):
         if depth is not None:
             params['depth'] = depth
         return self.get(f"{self.markets_url}/{ticker}/orderbook", params=params)
-    
+
+    def get_orders(
+        self,
+        ticker: Optional[str] = None,
+        event_ticker: Optional[str] = None,
+        min_ts: Optional[int] = None,
+        max_ts: Optional[int] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves one page of orders based on provided filters."""
+        params = {
+            'ticker': ticker,
+            'event_ticker': event_ticker,
+            'min_ts': min_ts,
+            'max_ts': max_ts,
+            'status': status,
+            'limit': limit,
+            'cursor': cursor,
+        }
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        return self.get(self.portfolio_url + '/orders', params=params)
+
+    def get_fills(
+        self,
+        ticker: Optional[str] = None,
+        order_id: Optional[str] = None,
+        min_ts: Optional[int] = None,
+        max_ts: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves one page of fills based on provided filters."""
+        params = {
+            'ticker': ticker,
+            'order_id': order_id,
+            'min_ts': min_ts,
+            'max_ts': max_ts,
+            'limit': limit,
+            'cursor': cursor,
+        }
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        return self.get(self.portfolio_url + '/fills', params=params)
+
+    def get_positions(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        settlement_status: Optional[str] = None,
+        ticker: Optional[str] = None,
+        event_ticker: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves one page of market and event positions."""
+        params = {
+            'limit': limit,
+            'cursor': cursor,
+            'settlement_status': settlement_status,
+            'ticker': ticker,
+            'event_ticker': event_ticker,
+        }
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        return self.get(self.portfolio_url + '/positions', params=params)
+
+    def get_portfolio_settlements(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves one page of portfolio settlements."""
+        params = {
+            'limit': limit,
+            'cursor': cursor,
+        }
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        return self.get(self.portfolio_url + '/settlements', params=params)
+
+    def iter_markets(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                     prefetch: bool = True, **filters) -> Iterator[Dict[str, Any]]:
+        """Lazily iterates over every market matching the filters of get_markets."""
+        return iter_items(self.get_markets, 'markets', page_size, max_items, prefetch, **filters)
+
+    def iter_trades(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                    prefetch: bool = True, **filters) -> Iterator[Dict[str, Any]]:
+        """Lazily iterates over every trade matching the filters of get_trades."""
+        return iter_items(self.get_trades, 'trades', page_size, max_items, prefetch, **filters)
+
+    def iter_orders(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                    prefetch: bool = True, **filters) -> Iterator[Dict[str, Any]]:
+        """Lazily iterates over every order matching the filters of get_orders."""
+        return iter_items(self.get_orders, 'orders', page_size, max_items, prefetch, **filters)
+
+    def iter_fills(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                   prefetch: bool = True, **filters) -> Iterator[Dict[str, Any]]:
+        """Lazily iterates over every fill matching the filters of get_fills."""
+        return iter_items(self.get_fills, 'fills', page_size, max_items, prefetch, **filters)
+
+    def iter_positions(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                       prefetch: bool = True, key: str = 'market_positions', **filters) -> Iterator[Dict[str, Any]]:
+        """Lazily iterates over market positions (or event positions with key='event_positions')."""
+        return iter_items(self.get_positions, key, page_size, max_items, prefetch, **filters)
+
+    def iter_settlements(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                         prefetch: bool = True, **filters) -> Iterator[Dict[str, Any]]:
+        """Lazily iterates over every portfolio settlement."""
+        return iter_items(self.get_portfolio_settlements, 'settlements', page_size, max_items, prefetch, **filters)
+
+    @staticmethod
+    def build_order(
+        ticker: str,
+        side: str,
+        amount: int,
+        price: int,
+        order_type: str = "limit",
+        client_order_id: Optional[str] = None,
+        action: str = "buy",
+    ) -> Dict[str, Any]:
+        """Builds the order body used by create_order and batch_create_orders."""
+        order = {
+            "ticker": ticker,
+            "action": action,
+            "side": side,
+            "count": amount,
+            "type": order_type,
+            "client_order_id": client_order_id or str(uuid.uuid4()),
+        }
+        order["yes_price" if side == "yes" else "no_price"] = int(price)
+        return order
+
     def create_order(
         self,
         ticker: str,
         side: str,
         amount: int,
         price: int,
-        order_type: str = "limit"
+        order_type: str = "limit",
+        client_order_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Creates a new order on Kalshi.
         
+        The first call probes ORDER_ROUTES until one works; that route is
+        remembered (see order_routes_path) and later orders go straight to it.
+        
         Args:
             ticker: Market ticker (e.g., "KXTRON-50")
             side: "yes" or "no"
             amount: Number of shares
             price: Price in cents
             order_type: "limit" or "market"
+            client_order_id: Idempotency key; Kalshi rejects a second order
+                with the same id, so retries cannot double-place. Generated
+                if not given.
             
         Returns:
             Order response from API
         """
         # Kalshi API expects specific order format
-        order_data = {
-            "ticker": ticker,
-            "action": "buy",  # Required field
-            "side": side,
-            "count": amount,  # Use 'count' instead of 'amount'
-            "type": order_type,  # Use 'type' instead of 'order_type'
-            "yes_price": price if side == "yes" else None,
-            "no_price": price if side == "no" else None,
-            "client_order_id": f"order_{int(time.time())}"  # Add unique client order ID
-        }
+        order_data = self.build_order(ticker, side, amount, price, order_type, client_order_id)
+        
+        # Placing an order moves the book, so cached market snapshots are stale
+        if self.cache is not None:
+            self.cache.invalidate('markets')
         
+        # Same order with the unused price sent as an explicit null
+        alt_order_data = dict(order_data, yes_price=price if side == "yes" else None,
+                              no_price=price if side == "no" else None)
+        payloads = {"standard": order_data, "explicit_nulls": alt_order_data}
+        self.order_metrics['orders'] += 1
+
+        route = self.order_route
+        if route is not None:
+            endpoint, payload_format = route
+            try:
+                response = self.post(endpoint, payloads[payload_format])
+                if response:
+                    # Attempts the probing loop would have spent before reaching this route
+                    self.order_metrics['attempts_avoided'] += ORDER_ROUTES.index(route)
+                    return response
+            except HTTPError as e:
+                if e.response is None or e.response.status_code not in (404, 405):
+                    # The order itself was rejected; probing other URLs cannot help
+                    self.order_metrics['failed_attempts'] += 1
+                    self.order_metrics['attempts_avoided'] += len(ORDER_ROUTES) - 1
+                    print(f"Order rejected by {endpoint}: {str(e)}")
+                    return None
+                print(f"Known order endpoint {endpoint} is gone ({e.response.status_code}); rediscovering")
+            except Exception as e:
+                self.order_metrics['failed_attempts'] += 1
+                self.order_metrics['attempts_avoided'] += len(ORDER_ROUTES) - 1
+                print(f"Order creation failed: {str(e)}")
+                return None
+            self.order_metrics['failed_attempts'] += 1
+            self._remember_order_route(None)
+
+        # Try the possible Kalshi API endpoints, then an alternative order format
+        for endpoint, payload_format in ORDER_ROUTES:
+            try:
+                print(f"Trying endpoint: {endpoint} ({payload_format} format)")
+                response = self.post(endpoint, payloads[payload_format])
+                if response:
+                    print(f"Success with endpoint: {endpoint}")
+                    self._remember_order_route((endpoint, payload_format))
+                    return response
+            except Exception as e:
+                print(f"Endpoint {endpoint} failed: {str(e)}")
+            self.order_metrics['failed_attempts'] += 1
+
+        print("All order creation attempts failed")
+        print(f"Original order data: {order_data}")
+        return None
+
+    def _load_order_route(self) -> Optional[Tuple[str, str]]:
+        """Order route remembered for this host, if any."""
+        if not self.order_routes_path or not os.path.exists(self.order_routes_path):
+            return None
         try:
-            # Try different possible Kalshi API endpoints
-            endpoints_to_try = [
-                "/trade-api/v2/portfolio/orders",
-                "/portfolio/orders",
-                "/trade-api/v2/orders",
-                "/trading/orders",
-                "/orders",
-                "/v1/orders", 
-                "/api/orders"
-            ]
-            
-            for endpoint in endpoints_to_try:
-                try:
-                    print(f"Trying endpoint: {endpoint}")
-                    response = self.post(endpoint, order_data)
-                    if response:
-                        print(f"Success with endpoint: {endpoint}")
-                        return response
-                except Exception as e:
-                    print(f"Endpoint {endpoint} failed: {str(e)}")
-                    continue
-            
-            # If all endpoints fail, try a different order format
-            print("Trying alternative order format...")
-            alt_order_data = {
-                "ticker": ticker,
-                "action": "buy",
-                "side": side,
-                "count": amount,
-                "type": order_type,
-                "yes_price": price if side == "yes" else None,
-                "no_price": price if side == "no" else None,
-                "client_order_id": f"alt_order_{int(time.time())}"
-            }
-            
-            response = self.post("/trade-api/v2/portfolio/orders", alt_order_data)
-            return response
-            
-        except Exception as e:
-            print(f"All order creation attempts failed: {str(e)}")
-            print(f"Original order data: {order_data}")
+            with open(self.order_routes_path) as f:
+                entry = json.load(f).get(self.host)
+        except (OSError, ValueError):
+            return None
+        if not entry:
             return None
+        route = (entry.get("endpoint"), entry.get("format"))
+        return route if route in ORDER_ROUTES else None
+
+    def _remember_order_route(self, route: Optional[Tuple[str, str]]) -> None:
+        """Sets (or with None, forgets) the order route and persists it per host."""
+        self.order_route = route
+        if not self.order_routes_path:
+            return
+        try:
+            routes = {}
+            if os.path.exists(self.order_routes_path):
+                with open(self.order_routes_path) as f:
+                    routes = json.load(f)
+            if route is None:
+                routes.pop(self.host, None)
+            else:
+                routes[self.host] = {"endpoint": route[0], "format": route[1]}
+            os.makedirs(os.path.dirname(os.path.abspath(self.order_routes_path)), exist_ok=True)
+            tmp_path = self.order_routes_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(routes, f, indent=2)
+            os.replace(tmp_path, self.order_routes_path)
+        except (OSError, ValueError) as e:
+            print(f"Could not persist order endpoint: {str(e)}")
+
+    def resolve_order_endpoint(self) -> Optional[str]:
+        """Finds the order endpoint with read-only GET probes, without placing an order.
+
+        Listing orders and creating them share a URL, so the first endpoint that
+        answers a GET is remembered for create_order. Does nothing if a route is
+        already known.
+
+        Returns:
+            The order endpoint, or None if no candidate answered
+        """
+        if self.order_route is not None:
+            return self.order_route[0]
+        for endpoint, payload_format in ORDER_ROUTES:
+            if payload_format != "standard":
+                continue
+            try:
+                self.order_metrics['probes'] += 1
+                self.get(endpoint, params={"limit": 1})
+            except Exception as e:
+                print(f"Probe of {endpoint} failed: {str(e)}")
+                continue
+            self._remember_order_route((endpoint, payload_format))
+            return endpoint
+        return None
+
+    def order_stats(self) -> Dict[str, Any]:
+        """Order routing counters: orders, failed_attempts, attempts_avoided, probes and the route in use."""
+        stats = dict(self.order_metrics)
+        stats['endpoint'] = self.order_route[0] if self.order_route else None
+        stats['format'] = self.order_route[1] if self.order_route else None
+        return stats
+
+    def batch_create_orders(self, orders: list) -> Dict[str, Any]:
+        """Submits up to MAX_BATCH_ORDERS orders (bodies from build_order) in one request.
+
+        Returns:
+            {"orders": [{"client_order_id", "order", "error"}, ...]}, one entry per order
+        """
+        if self.cache is not None:
+            self.cache.invalidate('markets')
+        return self.post(self.portfolio_url + '/orders/batched', {"orders": orders})
+
+    def batch_cancel_orders(self, order_ids: list) -> Dict[str, Any]:
+        """Cancels up to MAX_BATCH_ORDERS resting orders in one request."""
+        return self.delete(self.portfolio_url + '/orders/batched', body={"ids": order_ids})
+
+class AsyncKalshiHttpClient(KalshiBaseClient):
+    """Asyncio client for handling HTTP connections to the Kalshi API.
+
+    Mirrors the read and order methods of KalshiHttpClient. All coroutines share
+    one aiohttp connection pool; a semaphore bounds how many requests are in
+    flight and an async-aware rate limiter keeps the fan-out within API limits.
+    """
+    def __init__(
+        self,
+        key_id: str,
+        private_key: rsa.RSAPrivateKey,
+        environment: Environment = Environment.DEMO,
+        max_concurrency: int = 10,
+        pool_size: int = 32,
+        timeout: float = 10.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        signing_workers: int = 0,
+        recorder: Optional[FeedRecorder] = None,
+    ):
+        """Initializes the client; the connection pool is created on first use.
+
+        Args:
+            key_id (str): Your Kalshi API key ID.
+            private_key (rsa.RSAPrivateKey): Your RSA private key.
+            environment (Environment): The API environment to use (DEMO or PROD).
+            max_concurrency (int): Maximum requests in flight at once.
+            pool_size (int): Maximum open connections in the shared pool.
+            timeout (float): Total seconds allowed per request.
+            rate_limiter (RateLimiter): Read/write token buckets, shareable with
+                other clients.
+            signing_workers (int): Processes that sign requests off the event
+                loop; 0 signs inline.
+            recorder (FeedRecorder): Appends every GET response to a feed log
+                for offline replay.
+        """
+        super().__init__(key_id, private_key, environment, signing_workers)
+        self.host = self.HTTP_BASE_URL
+        self.exchange_url = "/trade-api/v2/exchange"
+        self.markets_url = "/trade-api/v2/markets"
+        self.portfolio_url = "/trade-api/v2/portfolio"
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_concurrency = max_concurrency
+        # Created with the session, inside the running loop: on Python 3.9 an
+        # asyncio.Semaphore binds to the loop current at construction
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.last_throttle = 0.0
+        self.recorder = recorder
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the shared session, creating the connection pool (and semaphore) if needed."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+
+    async def close(self) -> None:
+        """Closes the shared connection pool and any signing workers."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.shutdown_signing_pool()
+
+    async def __aenter__(self) -> "AsyncKalshiHttpClient":
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def rate_limit(self, method: str = "GET") -> float:
+        """Waits for the read or write budget of the method; returns seconds throttled."""
+        self.last_throttle = await self.rate_limiter.acquire_async(method)
+        self.last_api_call = datetime.now()
+        return self.last_throttle
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[dict] = None,
+    ) -> Any:
+        """Performs an authenticated request, raising ClientResponseError on bad status."""
+        session = self._get_session()
+        async with self.semaphore:
+            await self.rate_limit(method)
+            async with session.request(
+                method,
+                self.host + path,
+                params=params,
+                json=body,
+                headers=await self.request_headers_async(method, path),
+            ) as response:
+                response.raise_for_status()
+                data = await response.json()
+        if self.recorder is not None and method == "GET":
+            self.recorder.record_snapshot(path, params, data)
+        return data
+
+    async def post(self, path: str, body: dict) -> Any:
+        """Performs an authenticated POST request to the Kalshi API."""
+        return await self.request("POST", path, body=body)
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Performs an authenticated GET request to the Kalshi API."""
+        return await self.request("GET", path, params=params)
+
+    async def delete(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Performs an authenticated DELETE request to the Kalshi API."""
+        return await self.request("DELETE", path, params=params)
+
+    async def get_balance(self) -> Dict[str, Any]:
+        """Retrieves the account balance."""
+        return await self.get(self.portfolio_url + '/balance')
+
+    async def get_exchange_status(self) -> Dict[str, Any]:
+        """Retrieves the exchange status."""
+        return await self.get(self.exchange_url + "/status")
+
+    async def get_trades(
+        self,
+        ticker: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        max_ts: Optional[int] = None,
+        min_ts: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves trades based on provided filters."""
+        params = {
+            'ticker': ticker,
+            'limit': limit,
+            'cursor': cursor,
+            'max_ts': max_ts,
+            'min_ts': min_ts,
+        }
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        return await self.get(self.markets_url + '/trades', params=params)
+
+    async def get_markets(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        event_ticker: Optional[str] = None,
+        series_ticker: Optional[str] = None,
+        max_close_ts: Optional[int] = None,
+        min_close_ts: Optional[int] = None,
+        status: Optional[str] = None,
+        tickers: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves markets based on provided filters."""
+        params = {
+            'limit': limit,
+            'cursor': cursor,
+            'event_ticker': event_ticker,
+            'series_ticker': series_ticker,
+            'max_close_ts': max_close_ts,
+            'min_close_ts': min_close_ts,
+            'status': status,
+            'tickers': tickers,
+        }
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        return await self.get(self.markets_url, params=params)
+
+    async def get_market(self, ticker: str) -> Dict[str, Any]:
+        """Retrieves a specific market by ticker."""
+        return await self.get(f"{self.markets_url}/{ticker}")
+
+    async def get_orderbook(
+        self,
+        ticker: str,
+        depth: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves the orderbook for a specific market."""
+        params = {}
+        if depth is not None:
+            params['depth'] = depth
+        return await self.get(f"{self.markets_url}/{ticker}/orderbook", params=params)
+
+    async def get_orders(
+        self,
+        ticker: Optional[str] = None,
+        event_ticker: Optional[str] = None,
+        min_ts: Optional[int] = None,
+        max_ts: Optional[int] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves one page of orders based on provided filters."""
+        params = {
+            'ticker': ticker,
+            'event_ticker': event_ticker,
+            'min_ts': min_ts,
+            'max_ts': max_ts,
+            'status': status,
+            'limit': limit,
+            'cursor': cursor,
+        }
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        return await self.get(self.portfolio_url + '/orders', params=params)
+
+    async def get_fills(
+        self,
+        ticker: Optional[str] = None,
+        order_id: Optional[str] = None,
+        min_ts: Optional[int] = None,
+        max_ts: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves one page of fills based on provided filters."""
+        params = {
+            'ticker': ticker,
+            'order_id': order_id,
+            'min_ts': min_ts,
+            'max_ts': max_ts,
+            'limit': limit,
+            'cursor': cursor,
+        }
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        return await self.get(self.portfolio_url + '/fills', params=params)
+
+    async def get_positions(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        settlement_status: Optional[str] = None,
+        ticker: Optional[str] = None,
+        event_ticker: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves one page of market and event positions."""
+        params = {
+            'limit': limit,
+            'cursor': cursor,
+            'settlement_status': settlement_status,
+            'ticker': ticker,
+            'event_ticker': event_ticker,
+        }
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        return await self.get(self.portfolio_url + '/positions', params=params)
+
+    async def get_portfolio_settlements(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves one page of portfolio settlements."""
+        params = {
+            'limit': limit,
+            'cursor': cursor,
+        }
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        return await self.get(self.portfolio_url + '/settlements', params=params)
+
+    def aiter_markets(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                      prefetch: bool = True, **filters) -> AsyncIterator[Dict[str, Any]]:
+        """Async-iterates over every market matching the filters of get_markets."""
+        return aiter_items(self.get_markets, 'markets', page_size, max_items, prefetch, **filters)
+
+    def aiter_trades(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                     prefetch: bool = True, **filters) -> AsyncIterator[Dict[str, Any]]:
+        """Async-iterates over every trade matching the filters of get_trades."""
+        return aiter_items(self.get_trades, 'trades', page_size, max_items, prefetch, **filters)
+
+    def aiter_orders(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                     prefetch: bool = True, **filters) -> AsyncIterator[Dict[str, Any]]:
+        """Async-iterates over every order matching the filters of get_orders."""
+        return aiter_items(self.get_orders, 'orders', page_size, max_items, prefetch, **filters)
+
+    def aiter_fills(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                    prefetch: bool = True, **filters) -> AsyncIterator[Dict[str, Any]]:
+        """Async-iterates over every fill matching the filters of get_fills."""
+        return aiter_items(self.get_fills, 'fills', page_size, max_items, prefetch, **filters)
+
+    def aiter_positions(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                        prefetch: bool = True, key: str = 'market_positions', **filters) -> AsyncIterator[Dict[str, Any]]:
+        """Async-iterates over market positions (or event positions with key='event_positions')."""
+        return aiter_items(self.get_positions, key, page_size, max_items, prefetch, **filters)
+
+    def aiter_settlements(self, page_size: Optional[int] = None, max_items: Optional[int] = None,
+                          prefetch: bool = True, **filters) -> AsyncIterator[Dict[str, Any]]:
+        """Async-iterates over every portfolio settlement."""
+        return aiter_items(self.get_portfolio_settlements, 'settlements', page_size, max_items, prefetch, **filters)
+
+    async def create_order(
+        self,
+        ticker: str,
+        side: str,
+        amount: int,
+        price: int,
+        order_type: str = "limit",
+        client_order_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Creates a new buy order on Kalshi.
+
+        Args:
+            ticker: Market ticker (e.g., "KXTRON-50")
+            side: "yes" or "no"
+            amount: Number of shares
+            price: Price in cents
+            order_type: "limit" or "market"
+            client_order_id: Idempotency key, generated if not given
+
+        Returns:
+            Order response from API
+        """
+        order_data = KalshiHttpClient.build_order(ticker, side, amount, price, order_type, client_order_id)
+        return await self.post(self.portfolio_url + "/orders", order_data)
+
+    async def batch_create_orders(self, orders: list) -> Dict[str, Any]:
+        """Submits up to MAX_BATCH_ORDERS orders (bodies from build_order) in one request."""
+        return await self.post(self.portfolio_url + "/orders/batched", {"orders": orders})
+
+    async def batch_cancel_orders(self, order_ids: list) -> Dict[str, Any]:
+        """Cancels up to MAX_BATCH_ORDERS resting orders in one request."""
+        return await self.request("DELETE", self.portfolio_url + "/orders/batched", body={"ids": order_ids})
 
 class KalshiWebSocketClient(KalshiBaseClient):
-    """Client for handling WebSocket connections to the Kalshi API."""
+    """Client for handling WebSocket connections to the Kalshi API.
+
+    Subscriptions made through subscribe() are remembered so that a new
+    connection (see ws_supervisor.WebSocketSupervisor) can replay them.
+    Sequence numbers are checked per subscription and a gap triggers
+    on_sequence_gap, which resubscribes to get a fresh snapshot.
+    Frames are decoded with the fastest available JSON backend and, when a
+    MessageDispatcher is given, routed to its per-type handlers. A
+    FeedRecorder, if given, logs every raw frame for later replay.
+    """
+    REPLY_HISTORY = 256  # command replies kept for a late wait_for_ack
+
     def __init__(
         self,
         key_id: str,
         private_key: rsa.RSAPrivateKey,
         environment: Environment = Environment.DEMO,
+        dispatcher: Optional[MessageDispatcher] = None,
+        recorder: Optional[FeedRecorder] = None,
     ):
         super().__init__(key_id, private_key, environment)
         self.ws = None
+        self.dispatcher = dispatcher
+        self.recorder = recorder
         self.url_suffix = "/trade-api/ws/v2"
         self.message_id = 1  # Add counter for message IDs
+        self.subscriptions: Dict[int, Dict[str, Any]] = {}  # message id -> subscribe params
+        self.sids: Dict[int, int] = {}  # server subscription id -> message id
+        self.last_seq: Dict[int, int] = {}  # server subscription id -> last seq seen
+        self.messages_received = 0
+        self.sequence_gaps = 0
+        self.connected_at: Optional[float] = None
+        self.last_connected_at: Optional[float] = None  # kept after the connection closes
+        self.pending: Dict[int, asyncio.Future] = {}  # message id -> future resolved by the reply
+        self.replies: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()  # latest replies, for wait_for_ack
+        self.unsubscribe_on_ack: set = set()  # subscribe ids cancelled before the server acked them
+        self.remove_on_ack: Dict[int, list] = {}  # subscribe id -> markets removed before the server acked it
+        self._deferred: list = []  # (cmd, params) for sids acked after such changes, sent by the handler
 
     async def connect(self):
         """Establishes a WebSocket connection using authentication."""
         host = self.WS_BASE_URL + self.url_suffix
-        auth_headers = self.request_headers("GET", self.url_suffix)
+        # Signed per connection, so reconnects always carry a fresh timestamp
+        auth_headers = await self.request_headers_async("GET", self.url_suffix)
         async with websockets.connect(host, additional_headers=auth_headers) as websocket:
             self.ws = websocket
-            await self.on_open()
-            await self.handler()
+            self.sids.clear()
+            self.last_seq.clear()
+            for future in self.pending.values():
+                future.cancel()  # replies to commands on the old connection will never come
+            self.pending.clear()
+            self.replies.clear()
+            self.unsubscribe_on_ack.clear()
+            self.remove_on_ack.clear()
+            self._deferred.clear()
+            self.connected_at = self.last_connected_at = time.monotonic()
+            try:
+                await self.on_open()
+                await self.handler()
+            finally:
+                self.connected_at = None
 
     async def on_open(self):
         """Callback when WebSocket connection is opened."""
         print("WebSocket connection opened.")
-        await self.subscribe_to_tickers()
-
-    async def subscribe_to_tickers(self):
-        """Subscribe to ticker updates for all markets."""
-        subscription_message = {
-            "id": self.message_id,
-            "cmd": "subscribe",
-            "params": {
-                "channels": ["ticker"]
-            }
-        }
-        await self.ws.send(json.dumps(subscription_message))
+        if self.subscriptions:
+            await self.replay_subscriptions()
+        else:
+            await self.subscribe_to_tickers()
+
+    async def send_command(self, cmd: str, params: Dict[str, Any]) -> int:
+        """Sends a command with the next message id and returns that id.
+
+        The server's reply to the command (subscribed, ok, unsubscribed or error)
+        resolves a future that wait_for_ack can await from another task. The
+        reply is then kept among the last REPLY_HISTORY replies, so an ack that
+        arrives before wait_for_ack is called is not lost.
+        """
+        message_id = self.message_id
         self.message_id += 1
+        self.pending[message_id] = asyncio.get_running_loop().create_future()
+        await self.ws.send(json.dumps({"id": message_id, "cmd": cmd, "params": params}))
+        return message_id
+
+    async def wait_for_ack(self, message_id: int, timeout: float = 10.0) -> Dict[str, Any]:
+        """Waits for the server's reply to a command.
+
+        Must be awaited from a task other than the message handler, since the
+        handler is what delivers the reply.
+
+        Raises:
+            ValueError: If the server answered with an error
+        """
+        reply = self.replies.pop(message_id, None)
+        if reply is None:
+            future = self.pending.get(message_id)
+            if future is None:
+                raise ValueError(f"No pending command with id {message_id}")
+            reply = await asyncio.wait_for(asyncio.shield(future), timeout)
+            self.replies.pop(message_id, None)
+        if reply.get("type") == "error":
+            raise ValueError(f"Command {message_id} failed: {reply.get('msg')}")
+        return reply
+
+    async def subscribe(self, channels: list, market_tickers: Optional[list] = None) -> int:
+        """Subscribes to channels (optionally for specific markets) and remembers it for replay."""
+        params: Dict[str, Any] = {"channels": list(channels)}
+        if market_tickers:
+            params["market_tickers"] = list(market_tickers)
+        message_id = await self.send_command("subscribe", params)
+        self.subscriptions[message_id] = params
+        return message_id
+
+    async def unsubscribe(self, message_id: int) -> Optional[int]:
+        """Cancels a subscription made by subscribe() and forgets it; returns the command id.
+
+        If the server has not acked the subscribe yet there is no sid to
+        unsubscribe, so None is returned and the unsubscribe is sent by the
+        message handler as each sid is acked.
+        """
+        params = self.subscriptions.pop(message_id, None)
+        self.remove_on_ack.pop(message_id, None)
+        sids = self._sids_for(message_id)
+        for sid in sids:
+            self.sids.pop(sid, None)
+            self.last_seq.pop(sid, None)
+        if not sids:
+            if params is not None:
+                self.unsubscribe_on_ack.add(message_id)  # no sid acked yet
+            return None
+        return await self.send_command("unsubscribe", {"sids": sids})
+
+    def _sids_for(self, message_id: int) -> list:
+        """Server subscription ids acknowledged for a subscribe command (one per channel)."""
+        return [sid for sid, mid in self.sids.items() if mid == message_id]
+
+    def _find_subscription(self, channels: list) -> Optional[int]:
+        """Acknowledged, market-scoped subscription covering exactly these channels."""
+        wanted = sorted(channels)
+        for message_id, params in self.subscriptions.items():
+            if ("market_tickers" in params and sorted(params["channels"]) == wanted
+                    and self._sids_for(message_id)):
+                return message_id
+        return None
+
+    async def subscribe_markets(self, market_tickers: list, channels: Optional[list] = None) -> list:
+        """Starts receiving channels for more markets at runtime.
+
+        Markets are added to an existing subscription on the same channels with
+        update_subscription when there is one; otherwise a new subscription is made.
+
+        Args:
+            market_tickers: Markets to add
+            channels: Channels to receive for them (default ["ticker"])
+
+        Returns:
+            Ids of the commands sent, for wait_for_ack
+        """
+        channels = list(channels or ["ticker"])
+        message_id = self._find_subscription(channels)
+        if message_id is None:
+            return [await self.subscribe(channels, market_tickers)]
+
+        params = self.subscriptions[message_id]
+        added = [t for t in market_tickers if t not in params["market_tickers"]]
+        if not added:
+            return []
+        params["market_tickers"].extend(added)
+        return [
+            await self.send_command("update_subscription",
+                                    {"sids": [sid], "market_tickers": added, "action": "add_markets"})
+            for sid in self._sids_for(message_id)
+        ]
+
+    async def unsubscribe_markets(self, market_tickers: list, channels: Optional[list] = None) -> list:
+        """Stops receiving updates for markets at runtime.
+
+        Markets are removed from every market-scoped subscription (or only the
+        ones on the given channels). A subscription left with no markets is
+        cancelled rather than left subscribed to nothing. If a subscription has
+        not been acked yet, delete_markets is sent by the message handler for
+        each sid as it is acked.
+
+        Returns:
+            Ids of the commands sent, for wait_for_ack
+        """
+        removing = set(market_tickers)
+        wanted = sorted(channels) if channels else None
+        command_ids = []
+        for message_id, params in list(self.subscriptions.items()):
+            tickers = params.get("market_tickers")
+            if not tickers or (wanted is not None and sorted(params["channels"]) != wanted):
+                continue
+            removed = [t for t in tickers if t in removing]
+            if not removed:
+                continue
+            params["market_tickers"] = [t for t in tickers if t not in removing]
+            if not params["market_tickers"]:
+                command_id = await self.unsubscribe(message_id)
+                if command_id is not None:
+                    command_ids.append(command_id)
+                continue
+            sids = self._sids_for(message_id)
+            if not sids:
+                self.remove_on_ack.setdefault(message_id, []).extend(removed)
+            for sid in sids:
+                command_ids.append(await self.send_command(
+                    "update_subscription", {"sids": [sid], "market_tickers": removed, "action": "delete_markets"}))
+        return command_ids
+
+    async def subscribe_event(self, event_ticker: str, http_client: "AsyncKalshiHttpClient",
+                              channels: Optional[list] = None) -> list:
+        """Subscribes to every market of one event, resolved through the REST API."""
+        market_tickers = [market["ticker"] async for market in
+                          http_client.aiter_markets(page_size=1000, event_ticker=event_ticker)]
+        if not market_tickers:
+            return []
+        return await self.subscribe_markets(market_tickers, channels)
+
+    async def unsubscribe_event(self, event_ticker: str, channels: Optional[list] = None) -> list:
+        """Stops updates for every subscribed market of one event."""
+        prefix = event_ticker + "-"
+        subscribed = {t for params in self.subscriptions.values() for t in params.get("market_tickers", ())}
+        return await self.unsubscribe_markets([t for t in subscribed if t.startswith(prefix)], channels)
+
+    async def replay_subscriptions(self):
+        """Re-sends every remembered subscription on the current connection."""
+        previous = list(self.subscriptions.values())
+        self.subscriptions.clear()
+        for params in previous:
+            await self.subscribe(params["channels"], params.get("market_tickers"))
+
+    async def resubscribe(self, sid: int):
+        """Drops a server subscription and subscribes again, which re-sends snapshots.
+
+        A subscribe command gets one sid per channel, so every sid of the
+        command is unsubscribed before it is re-sent; otherwise the channels
+        without the gap would be delivered twice.
+        """
+        message_id = self.sids.get(sid)
+        params = self.subscriptions.pop(message_id, None)
+        sids = self._sids_for(message_id) if message_id is not None else [sid]
+        for stale in sids:
+            self.sids.pop(stale, None)
+            self.last_seq.pop(stale, None)
+        await self.send_command("unsubscribe", {"sids": sids})
+        if params is not None:
+            await self.subscribe(params["channels"], params.get("market_tickers"))
+
+    async def subscribe_to_tickers(self, market_tickers: Optional[list] = None):
+        """Subscribe to ticker updates, for the given markets only if any are passed.
+
+        Without market_tickers this receives the whole exchange's ticker traffic.
+        """
+        if market_tickers:
+            await self.subscribe_markets(market_tickers, ["ticker"])
+        else:
+            await self.subscribe(["ticker"])
+
+    def _track(self, data: Dict[str, Any]) -> Optional[Tuple[int, int, int]]:
+        """Records acks and sequence numbers; returns (sid, expected, received) on a gap."""
+        self.messages_received += 1
+        message_type = data.get("type")
+        if message_type in ("subscribed", "ok", "unsubscribed", "error"):
+            if message_type == "subscribed" and data.get("id") in self.subscriptions:
+                sid = data["msg"]["sid"]
+                self.sids[sid] = data.get("id")
+                removed = self.remove_on_ack.get(data.get("id"))
+                if removed:
+                    self._deferred.append(("update_subscription", {
+                        "sids": [sid], "market_tickers": list(removed), "action": "delete_markets"}))
+            elif message_type == "subscribed" and data.get("id") in self.unsubscribe_on_ack:
+                self._deferred.append(("unsubscribe", {"sids": [data["msg"]["sid"]]}))
+            future = self.pending.pop(data.get("id"), None)
+            if future is not None:
+                if not future.done():
+                    future.set_result(data)
+                self.replies[data["id"]] = data
+                while len(self.replies) > self.REPLY_HISTORY:
+                    self.replies.popitem(last=False)
+            return None
+        sid = data.get("sid")
+        seq = data.get("seq")
+        if sid is None or seq is None:
+            return None
+        last = self.last_seq.get(sid)
+        self.last_seq[sid] = seq
+        if last is not None and seq != last + 1:
+            return sid, last + 1, seq
+        return None
 
     async def handler(self):
         """Handle incoming messages."""
         try:
             async for message in self.ws:
-                await self.on_message(message)
+                if self.recorder is not None:
+                    self.recorder.record_message(message)
+                data = loads(message)
+                gap = self._track(data)
+                if self._deferred:
+                    deferred, self._deferred = self._deferred, []
+                    for cmd, params in deferred:
+                        await self.send_command(cmd, params)
+                if gap is not None:
+                    self.sequence_gaps += 1
+                    await self.on_sequence_gap(*gap)
+                    continue
+                await self.on_message(data)
+            await self.on_close(self.ws.close_code, self.ws.close_reason)
         except websockets.ConnectionClosed as e:
             await self.on_close(e.code, e.reason)
         except Exception as e:
             await self.on_error(e)
 
+    async def on_sequence_gap(self, sid: int, expected: int, received: int):
+        """Callback when messages were missed on a subscription; resubscribes for a fresh snapshot."""
+        print(f"Sequence gap on sid {sid}: expected {expected}, got {received}. Resubscribing.")
+        await self.resubscribe(sid)
+
     async def on_message(self, message):
-        """Callback for handling incoming messages."""
-        print("Received message:", message)
+        """Callback for handling incoming (decoded) messages."""
+        if self.dispatcher is not None:
+            await self.dispatcher.dispatch(message)
+        else:
+            print("Received message:", message)
 
     async def on_error(self, error):
         """Callback for handling errors."""
@@ -348,4 +1376,4 @@ class KalshiWebSocketClient(KalshiBaseClient):
 
     async def on_close(self, close_status_code, close_msg):
         """Callback when WebSocket connection is closed."""
-        print("WebSocket connection closed with code:", close_status_code, "and message:", close_msg)
\ No newline at end of file
+        print("WebSocket connection closed with code:", close_status_code, "and message:", close_msg)
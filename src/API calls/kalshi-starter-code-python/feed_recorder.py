@@ -0,0 +1,272 @@
+"""
+Record market data to a compact binary log and replay it for backtests
+
+The log starts with a MAGIC header, followed by frames:
+
+    [u8 frame type][u32 payload length][payload]
+
+DATA frames hold a zlib-compressed block of records:
+
+    [f64 unix timestamp][u8 kind][u32 length][bytes]
+
+A record is either a raw WebSocket frame (KIND_WS) or a JSON-encoded REST
+response with its path and params (KIND_REST). After every few DATA frames
+an INDEX frame lists the offset, record count and time range of the blocks
+written since the previous index. A reader can therefore skip blocks outside
+a time window without decompressing them.
+
+FeedReplayer drives the same handlers the live clients use, either as fast as
+possible or paced at wall-clock speed or any multiple of it.
+"""
+
+import asyncio
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ws_dispatch import loads
+
+MAGIC = b"KFEED01\n"
+
+FRAME_DATA = 1
+FRAME_INDEX = 2
+KIND_WS = 1
+KIND_REST = 2
+
+_FRAME_HEADER = struct.Struct("<BI")
+_RECORD_HEADER = struct.Struct("<dBI")
+_INDEX_ENTRY = struct.Struct("<QIdd")  # block offset, records, first ts, last ts
+
+
+class FeedRecord(NamedTuple):
+    """One recorded message"""
+    ts: float
+    kind: int
+    payload: bytes
+
+    def decode(self) -> Any:
+        """The message as a dict (WebSocket frame or {'path', 'params', 'response'})"""
+        return loads(self.payload)
+
+
+class FeedRecorder:
+    """Appends WebSocket frames and REST responses to a compressed feed log"""
+
+    def __init__(self, path: str, block_size: int = 64 * 1024, index_every: int = 16,
+                 compression_level: int = 6):
+        """
+        Args:
+            path: Log file; appended to if it already exists
+            block_size: Uncompressed bytes buffered before a DATA frame is written
+            index_every: DATA frames between INDEX frames
+            compression_level: zlib level (1 fastest, 9 smallest)
+        """
+        self.path = path
+        self.block_size = block_size
+        self.index_every = index_every
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._buffer = bytearray()
+        self._buffered_records = 0
+        self._first_ts: Optional[float] = None
+        self._last_ts = 0.0
+        self._unindexed: List[Tuple[int, int, float, float]] = []
+        self.records_written = 0
+        self.bytes_in = 0
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            with open(path, "rb") as existing:
+                if existing.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f"{path} is not a feed log")
+        self._file = open(path, "ab")
+        if new_file:
+            self._file.write(MAGIC)
+
+    def record(self, kind: int, payload: bytes, ts: Optional[float] = None) -> None:
+        """Append one record; it reaches disk when its block fills or on flush()"""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            self._buffer += _RECORD_HEADER.pack(ts, kind, len(payload))
+            self._buffer += payload
+            self._buffered_records += 1
+            if self._first_ts is None:
+                self._first_ts = ts
+            self._last_ts = ts
+            self.records_written += 1
+            self.bytes_in += len(payload)
+            if len(self._buffer) >= self.block_size:
+                self._write_block()
+
+    def record_message(self, message, ts: Optional[float] = None) -> None:
+        """Record a raw WebSocket frame (str or bytes) exactly as received"""
+        if isinstance(message, str):
+            message = message.encode("utf-8")
+        self.record(KIND_WS, message, ts)
+
+    def record_snapshot(self, path: str, params: Optional[Dict[str, Any]], response: Any,
+                        ts: Optional[float] = None) -> None:
+        """Record a REST response together with the request that produced it"""
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        payload = json.dumps({"path": path, "params": params, "response": response},
+                             separators=(",", ":")).encode("utf-8")
+        self.record(KIND_REST, payload, ts)
+
+    def _write_block(self) -> None:
+        if not self._buffered_records:
+            return
+        offset = self._file.tell()
+        compressed = zlib.compress(bytes(self._buffer), self.compression_level)
+        self._file.write(_FRAME_HEADER.pack(FRAME_DATA, len(compressed)))
+        self._file.write(compressed)
+        self._unindexed.append((offset, self._buffered_records, self._first_ts, self._last_ts))
+        self._buffer.clear()
+        self._buffered_records = 0
+        self._first_ts = None
+        if len(self._unindexed) >= self.index_every:
+            self._write_index()
+
+    def _write_index(self) -> None:
+        if not self._unindexed:
+            return
+        payload = b"".join(_INDEX_ENTRY.pack(*entry) for entry in self._unindexed)
+        self._file.write(_FRAME_HEADER.pack(FRAME_INDEX, len(payload)))
+        self._file.write(payload)
+        self._unindexed.clear()
+
+    def flush(self) -> None:
+        """Write buffered records and a closing index, then flush the file"""
+        with self._lock:
+            self._write_block()
+            self._write_index()
+            self._file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> "FeedRecorder":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class FeedReplayer:
+    """Reads a feed log and replays it into handlers"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def blocks(self) -> List[Tuple[int, Optional[int], Optional[float], Optional[float]]]:
+        """
+        Every DATA block as (offset, records, first ts, last ts)
+
+        Only frame headers and INDEX frames are read. Blocks written after the
+        last index (e.g. by a recorder that crashed) have None for the counts.
+        """
+        indexed: Dict[int, Tuple[int, float, float]] = {}
+        offsets = []
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a feed log")
+            while True:
+                offset = f.tell()
+                header = f.read(_FRAME_HEADER.size)
+                if len(header) < _FRAME_HEADER.size:
+                    break
+                frame_type, length = _FRAME_HEADER.unpack(header)
+                if frame_type == FRAME_INDEX:
+                    payload = f.read(length)
+                    for entry in _INDEX_ENTRY.iter_unpack(payload):
+                        indexed[entry[0]] = entry[1:]
+                else:
+                    offsets.append(offset)
+                    f.seek(length, os.SEEK_CUR)
+        return [(offset, *indexed.get(offset, (None, None, None))) for offset in offsets]
+
+    def iter_records(
+        self,
+        start_ts: Optional[float] = None,
+        end_ts: Optional[float] = None,
+        kinds: Optional[Tuple[int, ...]] = None,
+    ) -> Iterator[FeedRecord]:
+        """
+        Yield records in recorded order
+
+        Args:
+            start_ts: Skip records before this unix time
+            end_ts: Stop at records after this unix time
+            kinds: Only these record kinds (KIND_WS, KIND_REST)
+        """
+        with open(self.path, "rb") as f:
+            for offset, _, first_ts, last_ts in self.blocks():
+                if last_ts is not None and start_ts is not None and last_ts < start_ts:
+                    continue
+                if first_ts is not None and end_ts is not None and first_ts > end_ts:
+                    return
+                f.seek(offset)
+                _, length = _FRAME_HEADER.unpack(f.read(_FRAME_HEADER.size))
+                compressed = f.read(length)
+                if len(compressed) < length:
+                    return  # truncated final block
+                block = zlib.decompress(compressed)
+                position = 0
+                while position < len(block):
+                    ts, kind, size = _RECORD_HEADER.unpack_from(block, position)
+                    position += _RECORD_HEADER.size
+                    payload = block[position:position + size]
+                    position += size
+                    if start_ts is not None and ts < start_ts:
+                        continue
+                    if end_ts is not None and ts > end_ts:
+                        return
+                    if kinds is None or kind in kinds:
+                        yield FeedRecord(ts, kind, payload)
+
+    async def replay(
+        self,
+        on_message: Optional[Callable] = None,
+        on_snapshot: Optional[Callable] = None,
+        speed: Optional[float] = None,
+        start_ts: Optional[float] = None,
+        end_ts: Optional[float] = None,
+    ) -> int:
+        """
+        Drive handlers with the recorded feed
+
+        Args:
+            on_message: Called with each decoded WebSocket message, e.g. a
+                client's on_message or MessageDispatcher.dispatch
+            on_snapshot: Called with (path, params, response) for each REST record
+            speed: None replays as fast as possible; 1.0 keeps the recorded
+                timing, 10.0 is ten times faster
+            start_ts, end_ts: Replay only this time window
+
+        Returns:
+            Number of records delivered
+        """
+        kinds = tuple(kind for kind, handler in ((KIND_WS, on_message), (KIND_REST, on_snapshot)) if handler)
+        delivered = 0
+        clock_start = None
+        feed_start = None
+        for record in self.iter_records(start_ts, end_ts, kinds):
+            if speed:
+                if clock_start is None:
+                    clock_start, feed_start = time.monotonic(), record.ts
+                delay = (record.ts - feed_start) / speed - (time.monotonic() - clock_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            data = record.decode()
+            if record.kind == KIND_WS:
+                result = on_message(data)
+            else:
+                result = on_snapshot(data["path"], data["params"], data["response"])
+            if asyncio.iscoroutine(result):
+                await result
+            delivered += 1
+        return delivered
@@ -0,0 +1,293 @@
+"""
+Local columnar store for Kalshi candlesticks and trades
+
+History is kept as NumPy column arrays in one .npz file per partition:
+
+    <root>/<series>/<market>/candles_<interval>m.npz
+    <root>/<series>/<market>/trades.npz
+
+Rows are sorted by timestamp. A sync asks the API only for the range after the
+last stored timestamp and rewrites the partition atomically (temp file +
+os.replace). Queries slice by time with a binary search and aggregate with
+vectorized NumPy, so nothing is downloaded again.
+
+Any client with get_market_history and get_trades works: KalshiHttpClient,
+KalshiClientWrapper or the official ExchangeClient.
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from pagination import iter_items
+
+# Kalshi returns at most this many candles per request
+MAX_CANDLES_PER_REQUEST = 5000
+
+CANDLE_COLUMNS = ('end_period_ts', 'price_open', 'price_high', 'price_low', 'price_close',
+                  'yes_bid_close', 'yes_ask_close', 'volume', 'open_interest')
+TRADE_COLUMNS = ('ts', 'yes_price', 'count', 'taker_yes', 'trade_id')
+
+
+def _empty(columns) -> Dict[str, np.ndarray]:
+    arrays = {name: np.empty(0, dtype=np.float64) for name in columns}
+    for name in ('end_period_ts', 'ts', 'volume', 'open_interest', 'count'):
+        if name in arrays:
+            arrays[name] = np.empty(0, dtype=np.int64)
+    if 'taker_yes' in arrays:
+        arrays['taker_yes'] = np.empty(0, dtype=np.bool_)
+    if 'trade_id' in arrays:
+        arrays['trade_id'] = np.empty(0, dtype='U36')
+    return arrays
+
+
+def _price(value: Any) -> float:
+    """Price in cents, NaN when the API has none for the period"""
+    return np.nan if value is None else float(value)
+
+
+def _candle_columns(candles: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Convert candlestick dicts to column arrays"""
+    if not candles:
+        return _empty(CANDLE_COLUMNS)
+    price = [c.get('price') or {} for c in candles]
+    return {
+        'end_period_ts': np.array([c['end_period_ts'] for c in candles], dtype=np.int64),
+        'price_open': np.array([_price(p.get('open')) for p in price]),
+        'price_high': np.array([_price(p.get('high')) for p in price]),
+        'price_low': np.array([_price(p.get('low')) for p in price]),
+        'price_close': np.array([_price(p.get('close')) for p in price]),
+        'yes_bid_close': np.array([_price((c.get('yes_bid') or {}).get('close')) for c in candles]),
+        'yes_ask_close': np.array([_price((c.get('yes_ask') or {}).get('close')) for c in candles]),
+        'volume': np.array([c.get('volume') or 0 for c in candles], dtype=np.int64),
+        'open_interest': np.array([c.get('open_interest') or 0 for c in candles], dtype=np.int64),
+    }
+
+
+def _trade_ts(trade: Dict[str, Any]) -> int:
+    created = trade['created_time']
+    if isinstance(created, (int, float)):
+        return int(created)
+    return int(datetime.fromisoformat(created.replace('Z', '+00:00')).timestamp())
+
+
+def _trade_columns(trades: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Convert trade dicts to column arrays"""
+    if not trades:
+        return _empty(TRADE_COLUMNS)
+    return {
+        'ts': np.array([_trade_ts(t) for t in trades], dtype=np.int64),
+        'yes_price': np.array([_price(t.get('yes_price')) for t in trades]),
+        'count': np.array([t.get('count') or 0 for t in trades], dtype=np.int64),
+        'taker_yes': np.array([t.get('taker_side') == 'yes' for t in trades], dtype=np.bool_),
+        'trade_id': np.array([t.get('trade_id', '') for t in trades], dtype='U36'),
+    }
+
+
+def _concat_sorted(old: Dict[str, np.ndarray], new: Dict[str, np.ndarray], ts_column: str,
+                   unique_column: str) -> Dict[str, np.ndarray]:
+    """Append new rows, drop rows whose unique_column value is already stored, sort by time"""
+    merged = {name: np.concatenate([old[name], new[name]]) for name in old}
+    # Keep the last occurrence so a re-fetched candle replaces a partial one
+    keys = merged[unique_column][::-1]
+    _, first = np.unique(keys, return_index=True)
+    keep = len(keys) - 1 - first
+    order = keep[np.argsort(merged[ts_column][keep], kind='stable')]
+    return {name: column[order] for name, column in merged.items()}
+
+
+class HistoryStore:
+    """Partitioned NumPy store of candlesticks and trades with incremental sync"""
+
+    def __init__(self, root: str = 'market_history'):
+        """
+        Args:
+            root: Directory holding one folder per series
+        """
+        self.root = root
+        self._loaded: Dict[str, Dict[str, np.ndarray]] = {}
+
+    def _path(self, series_ticker: str, market_ticker: str, name: str) -> str:
+        return os.path.join(self.root, series_ticker, market_ticker, name + '.npz')
+
+    def _load(self, path: str, columns) -> Dict[str, np.ndarray]:
+        if path not in self._loaded:
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    self._loaded[path] = {name: data[name] for name in columns}
+            else:
+                self._loaded[path] = _empty(columns)
+        return self._loaded[path]
+
+    def _save(self, path: str, arrays: Dict[str, np.ndarray]) -> None:
+        """Write a partition atomically so readers never see a half-written file"""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._loaded[path] = arrays
+
+    # Sync
+
+    def sync_candles(
+        self,
+        client,
+        series_ticker: str,
+        market_ticker: str,
+        period_interval: int = 60,
+        start_ts: Optional[int] = None,
+        end_ts: Optional[int] = None,
+    ) -> int:
+        """
+        Download candlesticks after the last stored one
+
+        Args:
+            client: Anything with get_market_history
+            period_interval: Candle length in minutes (1, 60 or 1440)
+            start_ts: Where to start when nothing is stored yet (default: 30 days ago)
+            end_ts: Sync up to this time (default: now)
+
+        Returns:
+            Number of new candles stored
+        """
+        path = self._path(series_ticker, market_ticker, f'candles_{period_interval}m')
+        stored = self._load(path, CANDLE_COLUMNS)
+        end_ts = int(end_ts or time.time())
+        if len(stored['end_period_ts']):
+            # Re-fetch the last candle too: it may have been partial when stored
+            start_ts = int(stored['end_period_ts'][-1]) - period_interval * 60
+        elif start_ts is None:
+            start_ts = end_ts - 30 * 24 * 3600
+
+        window = MAX_CANDLES_PER_REQUEST * period_interval * 60
+        fetched = []
+        window_start = start_ts
+        while window_start < end_ts:
+            window_end = min(end_ts, window_start + window)
+            response = client.get_market_history(series_ticker, market_ticker, period_interval,
+                                                 end_ts=window_end, start_ts=window_start)
+            fetched.extend(response.get('candlesticks') or [])
+            window_start = window_end
+
+        before = len(stored['end_period_ts'])
+        merged = _concat_sorted(stored, _candle_columns(fetched), 'end_period_ts', 'end_period_ts')
+        self._save(path, merged)
+        return len(merged['end_period_ts']) - before
+
+    def sync_trades(self, client, series_ticker: str, market_ticker: str,
+                    start_ts: Optional[int] = None, page_size: int = 1000) -> int:
+        """
+        Download trades at or after the last stored trade's timestamp
+
+        Trades sharing the boundary second are fetched again and deduplicated
+        by trade_id.
+
+        Args:
+            client: Anything with get_trades
+            start_ts: Where to start when nothing is stored yet (default: all history)
+
+        Returns:
+            Number of new trades stored
+        """
+        path = self._path(series_ticker, market_ticker, 'trades')
+        stored = self._load(path, TRADE_COLUMNS)
+        if len(stored['ts']):
+            start_ts = int(stored['ts'][-1])
+        filters = {'ticker': market_ticker}
+        if start_ts is not None:
+            filters['min_ts'] = start_ts
+        fetched = list(iter_items(client.get_trades, 'trades', page_size, **filters))
+
+        before = len(stored['ts'])
+        merged = _concat_sorted(stored, _trade_columns(fetched), 'ts', 'trade_id')
+        self._save(path, merged)
+        return len(merged['ts']) - before
+
+    def sync_market(self, client, series_ticker: str, market_ticker: str,
+                    period_interval: int = 60) -> Dict[str, int]:
+        """Sync candles and trades of one market; returns new rows per kind"""
+        return {
+            'candles': self.sync_candles(client, series_ticker, market_ticker, period_interval),
+            'trades': self.sync_trades(client, series_ticker, market_ticker),
+        }
+
+    # Queries
+
+    @staticmethod
+    def _window(arrays: Dict[str, np.ndarray], ts_column: str, start_ts: Optional[int],
+                end_ts: Optional[int]) -> Dict[str, np.ndarray]:
+        ts = arrays[ts_column]
+        lo = 0 if start_ts is None else np.searchsorted(ts, start_ts, side='left')
+        hi = len(ts) if end_ts is None else np.searchsorted(ts, end_ts, side='right')
+        return {name: column[lo:hi] for name, column in arrays.items()}
+
+    def candles(self, series_ticker: str, market_ticker: str, period_interval: int = 60,
+                start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Stored candles with end_period_ts in [start_ts, end_ts], as column arrays (views)"""
+        path = self._path(series_ticker, market_ticker, f'candles_{period_interval}m')
+        return self._window(self._load(path, CANDLE_COLUMNS), 'end_period_ts', start_ts, end_ts)
+
+    def trades(self, series_ticker: str, market_ticker: str,
+               start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Stored trades with ts in [start_ts, end_ts], as column arrays (views)"""
+        path = self._path(series_ticker, market_ticker, 'trades')
+        return self._window(self._load(path, TRADE_COLUMNS), 'ts', start_ts, end_ts)
+
+    def vwap(self, series_ticker: str, market_ticker: str,
+             start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> Optional[float]:
+        """Volume-weighted average YES price in cents, or None without trades"""
+        window = self.trades(series_ticker, market_ticker, start_ts, end_ts)
+        volume = window['count'].sum()
+        if not volume:
+            return None
+        return float(np.dot(window['yes_price'], window['count']) / volume)
+
+    def resample_trades(self, series_ticker: str, market_ticker: str, bucket_seconds: int,
+                        start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Aggregate trades into fixed time buckets
+
+        Returns:
+            Column arrays for buckets that had trades: bucket_ts (bucket start),
+            open, high, low, close, volume, vwap and yes_taker_volume
+        """
+        window = self.trades(series_ticker, market_ticker, start_ts, end_ts)
+        ts, price, count = window['ts'], window['yes_price'], window['count']
+        if not len(ts):
+            return {name: np.empty(0) for name in
+                    ('bucket_ts', 'open', 'high', 'low', 'close', 'volume', 'vwap', 'yes_taker_volume')}
+        buckets = ts // bucket_seconds
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(ts)] - 1
+        volume = np.add.reduceat(count, starts)
+        notional = np.add.reduceat(price * count, starts)
+        return {
+            'bucket_ts': buckets[starts] * bucket_seconds,
+            'open': price[starts],
+            'high': np.maximum.reduceat(price, starts),
+            'low': np.minimum.reduceat(price, starts),
+            'close': price[ends],
+            'volume': volume,
+            'vwap': np.divide(notional, volume, out=np.full(len(starts), np.nan), where=volume > 0),
+            'yes_taker_volume': np.add.reduceat(count * window['taker_yes'], starts),
+        }
+
+    def markets(self) -> Dict[str, List[str]]:
+        """Stored partitions as {series_ticker: [market_ticker, ...]}"""
+        if not os.path.isdir(self.root):
+            return {}
+        return {
+            series: sorted(os.listdir(os.path.join(self.root, series)))
+            for series in sorted(os.listdir(self.root))
+            if os.path.isdir(os.path.join(self.root, series))
+        }
@@ -3,6 +3,8 @@ from dotenv import load_dotenv
 from cryptography.hazmat.primitives import serialization
 from clients import KalshiHttpClient, Environment
 from betting_system import BettingSystem
+from pagination import iter_items
+from response_cache import ResponseCache
 from pathlib import Path
 
 def extract_ticker_from_url(url_or_ticker):
@@ -49,63 +51,92 @@ def detect_environment_from_url(url):
     else:
         return Environment.DEMO
 
+def extract_market_prices(market_data):
+    """
+    Build the price row used by the analysis from a market API response
+    """
+    # Extract the actual market data from the response
+    if 'market' in market_data:
+        market_info = market_data['market']
+    else:
+        market_info = market_data
+    
+    # Extract key price information
+    return {
+        'ticker': market_info.get('ticker'),
+        'title': market_info.get('title'),
+        'yes_bid': market_info.get('yes_bid') or 'N/A',
+        'yes_ask': market_info.get('yes_ask') or 'N/A',
+        'no_bid': market_info.get('no_bid') or 'N/A',
+        'no_ask': market_info.get('no_ask') or 'N/A',
+        'last_price': market_info.get('last_price') or 'N/A',
+        'status': market_info.get('status'),
+        'volume': market_info.get('volume'),
+        'open_interest': market_info.get('open_interest')
+    }
+
 def analyze_single_market(client, ticker):
     """
     Analyze a single market and return price data
     """
     try:
         market_data = client.get_market(ticker)
-        
-        # Extract the actual market data from the response
-        if 'market' in market_data:
-            market_info = market_data['market']
-        else:
-            market_info = market_data
-        
-        # Extract key price information
-        market_prices = {
-            'ticker': market_info.get('ticker'),
-            'title': market_info.get('title'),
-            'yes_bid': market_info.get('yes_bid') or 'N/A',
-            'yes_ask': market_info.get('yes_ask') or 'N/A',
-            'no_bid': market_info.get('no_bid') or 'N/A',
-            'no_ask': market_info.get('no_ask') or 'N/A',
-            'last_price': market_info.get('last_price') or 'N/A',
-            'status': market_info.get('status'),
-            'volume': market_info.get('volume'),
-            'open_interest': market_info.get('open_interest')
-        }
-        
-        
-        return market_prices
+        return extract_market_prices(market_data)
         
     except Exception as e:
         print(f"ERROR: Failed to get market data for {ticker}: {str(e)}")
         return None
 
+def build_market_snapshot(client, event_ticker=None, tickers=None, page_size=1000, chunk_size=100):
+    """
+    Build the price table for an event, or for explicit tickers, from list responses
+    
+    get_markets already returns full market objects, so the table is built
+    straight from each page instead of calling get_market once per ticker.
+    Explicit tickers are requested in chunks through the `tickers` filter.
+    Every request follows the cursor until the last page.
+    
+    Args:
+        client: KalshiHttpClient (or any client with get_markets)
+        event_ticker: Event whose markets should be included
+        tickers: Explicit market tickers to include
+        page_size: Markets requested per page
+        chunk_size: Tickers per `tickers` filter request
+        
+    Returns:
+        Dictionary mapping ticker to price data, in API order
+    """
+    if tickers:
+        queries = [
+            {'tickers': ','.join(tickers[i:i + chunk_size])}
+            for i in range(0, len(tickers), chunk_size)
+        ]
+    else:
+        queries = [{'event_ticker': event_ticker}]
+    
+    snapshot = {}
+    for query in queries:
+        for market in iter_items(client.get_markets, 'markets', page_size=page_size, **query):
+            ticker = market.get('ticker')
+            if ticker:
+                snapshot[ticker] = extract_market_prices(market)
+    
+    print(f"Built snapshot of {len(snapshot)} markets")
+    return snapshot
+
 def get_event_markets(client, event_ticker):
     """
     Get all markets for a specific event
     """
     try:
         print(f"Fetching all markets for event: {event_ticker}")
-        markets_response = client.get_markets(event_ticker=event_ticker)
+        market_tickers = list(build_market_snapshot(client, event_ticker=event_ticker))
         
-        if 'markets' in markets_response:
-            markets = markets_response['markets']
-            print(f"Found {len(markets)} markets for event {event_ticker}")
-            
-            # Extract tickers from the markets
-            market_tickers = []
-            for market in markets:
-                ticker = market.get('ticker')
-                if ticker:
-                    market_tickers.append(ticker)
-            
-            return market_tickers
+        if market_tickers:
+            print(f"Found {len(market_tickers)} markets for event {event_ticker}")
         else:
             print(f"No markets found for event {event_ticker}")
-            return []
+        return market_tickers
             
     except Exception as e:
         print(f"ERROR: Failed to get markets for event {event_ticker}: {str(e)}")
@@ -124,7 +155,13 @@ def analyze_multiple_markets(client, market_tickers):
         if market_data:
             all_market_data[ticker] = market_data
     
-    # Print comparison summary
+    print_market_comparison(all_market_data)
+    return all_market_data
+
+def print_market_comparison(all_market_data):
+    """
+    Print the price comparison table for analyzed markets
+    """
     if all_market_data:
         print(f"\nCOMPARISON SUMMARY ({len(all_market_data)} markets):")
         print("Ticker".ljust(20) + "Yes Bid".ljust(10) + "Yes Ask".ljust(10) + "No Bid".ljust(10) + "No Ask".ljust(10) + "Last Price".ljust(12))
@@ -132,8 +169,6 @@ def analyze_multiple_markets(client, market_tickers):
         
         for ticker, data in all_market_data.items():
             print(f"{ticker[:18].ljust(20)}{str(data['yes_bid']).ljust(10)}{str(data['yes_ask']).ljust(10)}{str(data['no_bid']).ljust(10)}{str(data['no_ask']).ljust(10)}{str(data['last_price']).ljust(12)}")
-    
-    return all_market_data
 
 def load_scraped_data():
     """
@@ -272,7 +307,8 @@ def main():
         client = KalshiHttpClient(
             key_id=KEYID,
             private_key=private_key,
-            environment=env
+            environment=env,
+            cache=ResponseCache()
         )
         print(f"Connected to {env.value} environment")
     except Exception as e:
@@ -283,14 +319,19 @@ def main():
     # STEP 6: ANALYZE MARKETS
     # ========================================
     print(f"\nFinding all markets for event: {EVENT_TICKER}")
-    MARKET_TICKERS = get_event_markets(client, EVENT_TICKER)
+    try:
+        # One request per page of the event's markets, prices included
+        all_market_data = build_market_snapshot(client, event_ticker=EVENT_TICKER)
+    except Exception as e:
+        print(f"ERROR: Failed to get markets for event {EVENT_TICKER}: {str(e)}")
+        all_market_data = {}
+    MARKET_TICKERS = list(all_market_data)
     
     if MARKET_TICKERS:
         print(f"Found {len(MARKET_TICKERS)} markets:")
         print("Market tickers:", MARKET_TICKERS)
         
-        # Analyze all markets
-        all_market_data = analyze_multiple_markets(client, MARKET_TICKERS)
+        print_market_comparison(all_market_data)
         
         print(f"\nSuccessfully analyzed {len(all_market_data)} markets!")
         print("All market data is stored in 'all_market_data' for your analysis")
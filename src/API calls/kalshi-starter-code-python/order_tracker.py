@@ -0,0 +1,308 @@
+"""
+Order lifecycle tracking keyed by client_order_id
+
+Orders are followed from submission to a terminal state. Updates come from:
+  - create/batch responses (BettingSystem records them as orders are placed)
+  - get_orders / get_fills polls, fetched incrementally with min_ts
+  - WebSocket fill messages, as decoded dicts or ws_dispatch.Fill records
+
+Each state keeps its own dict of orders, so the open / partially filled /
+filled / cancelled views and lookups by client_order_id or order_id are O(1).
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pagination import iter_items
+
+
+class OrderState(Enum):
+    PENDING = "pending"  # submitted, exchange has not confirmed yet
+    RESTING = "resting"
+    PARTIALLY_FILLED = "partially_filled"
+    FILLED = "filled"
+    CANCELED = "canceled"
+    REJECTED = "rejected"
+
+
+OPEN_STATES = (OrderState.PENDING, OrderState.RESTING, OrderState.PARTIALLY_FILLED)
+
+# Kalshi order status -> state (a resting order with fills becomes PARTIALLY_FILLED)
+_STATUS_STATES = {
+    'pending': OrderState.PENDING,
+    'resting': OrderState.RESTING,
+    'executed': OrderState.FILLED,
+    'canceled': OrderState.CANCELED,
+    'cancelled': OrderState.CANCELED,
+}
+
+
+@dataclass
+class TrackedOrder:
+    """One order and everything known about its fills"""
+    client_order_id: str
+    ticker: str
+    side: str  # 'yes' or 'no'
+    action: str  # 'buy' or 'sell'
+    count: int
+    price: Optional[int]  # limit price in cents for our side
+    order_id: Optional[str] = None
+    state: OrderState = OrderState.PENDING
+    reported_fill_count: int = 0  # fill_count from the latest order poll
+    seen_fill_count: int = 0  # sum of the individual fills ingested
+    fill_cost: int = 0  # sum of fill price * count, in cents
+    trade_ids: List[str] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def filled_count(self) -> int:
+        # Polls and fill messages overlap; whichever has seen more is current
+        return max(self.reported_fill_count, self.seen_fill_count)
+
+    @property
+    def remaining_count(self) -> int:
+        return max(0, self.count - self.filled_count)
+
+    @property
+    def average_fill_price(self) -> Optional[float]:
+        """Average price of the individual fills ingested, in cents"""
+        return self.fill_cost / self.seen_fill_count if self.seen_fill_count else None
+
+    @property
+    def is_open(self) -> bool:
+        return self.state in OPEN_STATES
+
+
+def to_timestamp(value: Any) -> Optional[float]:
+    """Unix seconds from an ISO string or a number (seconds or milliseconds)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+class OrderTracker:
+    """State machine over our orders with per-state views"""
+
+    def __init__(self):
+        self.orders: Dict[str, TrackedOrder] = {}
+        self._by_order_id: Dict[str, TrackedOrder] = {}
+        self._by_state: Dict[OrderState, Dict[str, TrackedOrder]] = {state: {} for state in OrderState}
+        self._seen_trades = set()
+        self._unmatched_fills: Dict[str, List[Dict[str, Any]]] = {}  # order id -> fills seen before the order
+        self.last_fill_ts: Optional[float] = None
+        self.last_order_poll: Optional[float] = None
+
+    # State bookkeeping
+
+    def _set_state(self, order: TrackedOrder, state: OrderState) -> None:
+        if order.state in (OrderState.FILLED, OrderState.CANCELED, OrderState.REJECTED) and state in OPEN_STATES:
+            return  # a stale poll must not reopen a finished order
+        if state == order.state:
+            return  # no change: leave updated_at alone so stale_orders still sees it
+        self._by_state[order.state].pop(order.client_order_id, None)
+        order.state = state
+        order.updated_at = time.time()
+        self._by_state[state][order.client_order_id] = order
+
+    def _add(self, order: TrackedOrder) -> TrackedOrder:
+        self.orders[order.client_order_id] = order
+        self._by_state[order.state][order.client_order_id] = order
+        if order.order_id:
+            self._set_order_id(order, order.order_id)
+        return order
+
+    def _set_order_id(self, order: TrackedOrder, order_id: str) -> None:
+        """Index an order by its exchange id and apply any fills that arrived before it"""
+        order.order_id = order_id
+        self._by_order_id[order_id] = order
+        for fill in self._unmatched_fills.pop(order_id, ()):
+            self._apply_fill(order, fill)
+
+    def _apply_fill(self, order: TrackedOrder, fill: Dict[str, Any]) -> None:
+        trade_id = fill.get('trade_id')
+        if trade_id is not None:
+            if trade_id in self._seen_trades:
+                return
+            self._seen_trades.add(trade_id)
+        count = fill.get('count') or 0
+        price = fill.get(f"{order.side}_price")
+        order.seen_fill_count += count
+        order.fill_cost += (price or 0) * count
+        order.trade_ids.append(trade_id)
+        order.updated_at = time.time()
+        self._set_state(order, self._state_after_fills(order))
+
+    def _state_after_fills(self, order: TrackedOrder) -> OrderState:
+        if order.filled_count >= order.count:
+            return OrderState.FILLED
+        return OrderState.PARTIALLY_FILLED if order.filled_count else order.state
+
+    # Ingestion
+
+    def track(self, client_order_id: str, ticker: str, side: str, count: int,
+              price: Optional[int] = None, action: str = 'buy') -> TrackedOrder:
+        """Start tracking an order as it is submitted"""
+        if client_order_id in self.orders:
+            return self.orders[client_order_id]
+        return self._add(TrackedOrder(client_order_id, ticker, side, action, count, price))
+
+    def record_response(self, client_order_id: str, order: Optional[Dict[str, Any]]) -> Optional[TrackedOrder]:
+        """Apply a create-order response; None (or an error) marks the order rejected"""
+        tracked = self.orders.get(client_order_id)
+        if tracked is None:
+            return None
+        if not order:
+            self._set_state(tracked, OrderState.REJECTED)
+            return tracked
+        return self.ingest_orders([dict(order.get('order', order), client_order_id=client_order_id)])[0]
+
+    def ingest_orders(self, orders: Iterable[Dict[str, Any]]) -> List[TrackedOrder]:
+        """Apply order dicts from get_orders (or create responses); unknown orders are added"""
+        updated = []
+        for data in orders:
+            client_order_id = data.get('client_order_id') or data.get('order_id')
+            order = self.orders.get(client_order_id)
+            if order is None and data.get('order_id') in self._by_order_id:
+                order = self._by_order_id[data['order_id']]
+            if order is None:
+                side = data.get('side', 'yes')
+                count = data.get('initial_count') or (data.get('fill_count', 0) + data.get('remaining_count', 0))
+                order = self._add(TrackedOrder(
+                    client_order_id=client_order_id,
+                    ticker=data.get('ticker', ''),
+                    side=side,
+                    action=data.get('action', 'buy'),
+                    count=count,
+                    price=data.get(f'{side}_price'),
+                    created_at=to_timestamp(data.get('created_time')) or time.time(),
+                ))
+            if data.get('order_id') and order.order_id != data['order_id']:
+                self._set_order_id(order, data['order_id'])
+            if data.get('fill_count') is not None and data['fill_count'] > order.reported_fill_count:
+                order.reported_fill_count = data['fill_count']
+                order.updated_at = time.time()
+
+            state = _STATUS_STATES.get(data.get('status'), order.state)
+            if state in OPEN_STATES:
+                state = self._state_after_fills(order) if order.filled_count else state
+            self._set_state(order, state)
+            updated.append(order)
+        return updated
+
+    def ingest_fills(self, fills: Iterable[Any]) -> List[TrackedOrder]:
+        """
+        Apply fills from get_fills, WebSocket fill msgs or ws_dispatch.Fill records; duplicates are ignored
+
+        A fill for an order id not known yet (typically a WebSocket fill that
+        beats the create response) is held and applied once the order id is
+        recorded by record_response or ingest_orders.
+        """
+        updated = []
+        for fill in fills:
+            if not isinstance(fill, dict):
+                fill = {name: getattr(fill, name) for name in fill.__slots__}
+            trade_id = fill.get('trade_id')
+            if trade_id is not None and trade_id in self._seen_trades:
+                continue
+            ts = to_timestamp(fill.get('created_time', fill.get('ts')))
+            if ts is not None and (self.last_fill_ts is None or ts > self.last_fill_ts):
+                self.last_fill_ts = ts
+
+            order_id = fill.get('order_id')
+            order = self._by_order_id.get(order_id)
+            if order is None:
+                if order_id is not None:
+                    held = self._unmatched_fills.setdefault(order_id, [])
+                    if trade_id is None or all(f.get('trade_id') != trade_id for f in held):
+                        held.append(fill)
+                continue
+            self._apply_fill(order, fill)
+            updated.append(order)
+        return updated
+
+    def handle_message(self, message: Any) -> List[TrackedOrder]:
+        """WebSocket hook: pass decoded messages or Fill records; non-fill messages are ignored"""
+        if isinstance(message, dict):
+            if message.get('type') != 'fill':
+                return []
+            message = message.get('msg', {})
+        return self.ingest_fills([message])
+
+    def poll(self, client, page_size: int = 200,
+             on_fills: Optional[Callable[[List[Dict[str, Any]]], Any]] = None) -> Dict[str, int]:
+        """
+        Fetch what changed since the last poll with get_orders and get_fills
+
+        Orders are requested from the oldest open order onward, and fills from
+        the newest fill already seen onward.
+
+        Args:
+            client: Client with get_orders and get_fills
+            page_size: Items per page
+            on_fills: Optional callable given every fill fetched, e.g.
+                PortfolioEngine.ingest_fills
+
+        Returns:
+            Number of orders and fills applied
+        """
+        open_created = [order.created_at for state in OPEN_STATES for order in self._by_state[state].values()]
+        since = min(open_created) if open_created else self.last_order_poll
+        self.last_order_poll = time.time()
+        order_filters = {'min_ts': int(since) - 1} if since else {}
+        orders = self.ingest_orders(iter_items(client.get_orders, 'orders', page_size, **order_filters))
+
+        fill_filters = {'min_ts': int(self.last_fill_ts)} if self.last_fill_ts else {}
+        fetched = list(iter_items(client.get_fills, 'fills', page_size, **fill_filters))
+        fills = self.ingest_fills(fetched)
+        if on_fills is not None:
+            on_fills(fetched)
+        return {'orders': len(orders), 'fills': len(fills)}
+
+    # Views
+
+    def get(self, client_order_id: str) -> Optional[TrackedOrder]:
+        return self.orders.get(client_order_id)
+
+    def by_order_id(self, order_id: str) -> Optional[TrackedOrder]:
+        return self._by_order_id.get(order_id)
+
+    def in_state(self, state: OrderState) -> Dict[str, TrackedOrder]:
+        """Live view of the orders in one state, keyed by client_order_id"""
+        return self._by_state[state]
+
+    def open_orders(self) -> List[TrackedOrder]:
+        return [order for state in OPEN_STATES for order in self._by_state[state].values()]
+
+    def partially_filled(self) -> Dict[str, TrackedOrder]:
+        return self._by_state[OrderState.PARTIALLY_FILLED]
+
+    def filled(self) -> Dict[str, TrackedOrder]:
+        return self._by_state[OrderState.FILLED]
+
+    def cancelled(self) -> Dict[str, TrackedOrder]:
+        return self._by_state[OrderState.CANCELED]
+
+    def stale_orders(self, max_age: float) -> List[TrackedOrder]:
+        """Open orders with no update for max_age seconds"""
+        cutoff = time.time() - max_age
+        return [order for order in self.open_orders() if order.updated_at < cutoff]
+
+    def cancel_stale(self, client, max_age: float, batch_size: int = 20) -> List[TrackedOrder]:
+        """Cancel stale open orders with batch_cancel_orders; returns the orders cancelled"""
+        stale = [order for order in self.stale_orders(max_age) if order.order_id]
+        for i in range(0, len(stale), batch_size):
+            batch = stale[i:i + batch_size]
+            client.batch_cancel_orders([order.order_id for order in batch])
+            for order in batch:
+                self._set_state(order, OrderState.CANCELED)
+        return stale
+
+    def summary(self) -> Dict[str, int]:
+        """Number of orders per state"""
+        return {state.value: len(orders) for state, orders in self._by_state.items()}
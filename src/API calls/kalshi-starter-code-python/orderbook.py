@@ -0,0 +1,177 @@
+"""
+Live in-memory order books maintained from Kalshi WebSocket orderbook messages
+
+Kalshi books only carry bids: YES bids and NO bids, each priced 1-99 cents.
+A YES ask at p is the same thing as a NO bid at 100 - p. Each side is stored
+as a 100-slot list indexed by price in cents, so applying a delta and reading
+a level are O(1). The best bid is tracked incrementally; when the best level
+empties, the scan for the next one is bounded by the 99 possible prices.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from clients import Environment, KalshiWebSocketClient
+from feed_recorder import FeedRecorder
+
+SIDES = ('yes', 'no')
+MIN_PRICE = 1
+MAX_PRICE = 99
+
+
+class OrderBook:
+    """Bid levels for both sides of one market, indexed by price in cents"""
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.levels = {side: [0] * (MAX_PRICE + 1) for side in SIDES}
+        self._best = {side: 0 for side in SIDES}  # 0 means no bids
+        self.seq: Optional[int] = None
+
+    def clear(self) -> None:
+        for side in SIDES:
+            self.levels[side] = [0] * (MAX_PRICE + 1)
+            self._best[side] = 0
+
+    def apply_snapshot(self, yes_levels: Optional[Iterable], no_levels: Optional[Iterable]) -> None:
+        """Replace the book with [[price, quantity], ...] levels for each side"""
+        self.clear()
+        for side, side_levels in (('yes', yes_levels), ('no', no_levels)):
+            levels = self.levels[side]
+            for price, quantity in side_levels or ():
+                levels[price] = quantity
+                if quantity > 0 and price > self._best[side]:
+                    self._best[side] = price
+
+    def apply_delta(self, side: str, price: int, delta: int) -> None:
+        """Add (or remove, if negative) delta contracts at one price level"""
+        levels = self.levels[side]
+        quantity = max(0, levels[price] + delta)
+        levels[price] = quantity
+        best = self._best[side]
+        if quantity > 0:
+            if price > best:
+                self._best[side] = price
+        elif price == best:
+            while best > 0 and levels[best] == 0:
+                best -= 1
+            self._best[side] = best
+
+    def best_bid(self, side: str) -> Optional[int]:
+        """Highest bid price for a side, or None if the side is empty"""
+        return self._best[side] or None
+
+    def best_ask(self, side: str) -> Optional[int]:
+        """Lowest price to buy a side: 100 minus the best bid on the opposite side"""
+        opposite = self._best['no' if side == 'yes' else 'yes']
+        return 100 - opposite if opposite else None
+
+    def quantity(self, side: str, price: int) -> int:
+        """Resting contracts at one bid level"""
+        return self.levels[side][price]
+
+    def depth(self, side: str, max_levels: int = 5) -> List[Tuple[int, int]]:
+        """Top bid levels for a side as (price, quantity), best first"""
+        levels = self.levels[side]
+        result = []
+        price = self._best[side]
+        while price >= MIN_PRICE and len(result) < max_levels:
+            if levels[price]:
+                result.append((price, levels[price]))
+            price -= 1
+        return result
+
+    def prices(self) -> Dict[str, Optional[int]]:
+        """Top of book in the same shape as the market price rows from main.py"""
+        return {
+            'yes_bid': self.best_bid('yes'),
+            'yes_ask': self.best_ask('yes'),
+            'no_bid': self.best_bid('no'),
+            'no_ask': self.best_ask('no'),
+        }
+
+
+class OrderBookManager:
+    """Holds one OrderBook per market and applies snapshot/delta messages to them"""
+
+    def __init__(self):
+        self.books: Dict[str, OrderBook] = {}
+
+    def book(self, ticker: str) -> OrderBook:
+        if ticker not in self.books:
+            self.books[ticker] = OrderBook(ticker)
+        return self.books[ticker]
+
+    def handle_message(self, data: dict) -> Optional[OrderBook]:
+        """Apply a decoded orderbook_snapshot or orderbook_delta message; returns the book touched"""
+        message_type = data.get('type')
+        if message_type not in ('orderbook_snapshot', 'orderbook_delta'):
+            return None
+        msg = data.get('msg', {})
+        book = self.book(msg['market_ticker'])
+        if message_type == 'orderbook_snapshot':
+            book.apply_snapshot(msg.get('yes'), msg.get('no'))
+        else:
+            book.apply_delta(msg['side'], msg['price'], msg['delta'])
+        book.seq = data.get('seq', book.seq)
+        return book
+
+    def load_rest_snapshot(self, ticker: str, response: dict) -> OrderBook:
+        """Seed a book from a get_orderbook REST response"""
+        orderbook = response.get('orderbook', response)
+        book = self.book(ticker)
+        book.apply_snapshot(orderbook.get('yes'), orderbook.get('no'))
+        return book
+
+    def market_prices(self, ticker: str) -> Optional[Dict[str, Optional[int]]]:
+        """Current top of book for a market, or None if it is not being tracked"""
+        book = self.books.get(ticker)
+        return book.prices() if book else None
+
+
+class OrderBookWebSocketClient(KalshiWebSocketClient):
+    """WebSocket client that keeps an OrderBookManager current for a set of markets"""
+
+    def __init__(
+        self,
+        key_id: str,
+        private_key: rsa.RSAPrivateKey,
+        market_tickers: List[str],
+        environment: Environment = Environment.DEMO,
+        order_books: Optional[OrderBookManager] = None,
+        recorder: Optional[FeedRecorder] = None,
+    ):
+        super().__init__(key_id, private_key, environment, recorder=recorder)
+        self.market_tickers = list(market_tickers)
+        self.order_books = order_books or OrderBookManager()
+
+    async def on_open(self):
+        """Subscribe to snapshots and deltas for the tracked markets."""
+        print(f"WebSocket connection opened, tracking {len(self.market_tickers)} order books.")
+        if self.subscriptions:
+            await self.replay_subscriptions()
+        else:
+            await self.subscribe_markets(self.market_tickers, ["orderbook_delta"])
+
+    async def on_message(self, message):
+        """Apply orderbook messages to the in-memory books."""
+        self.order_books.handle_message(message)
+
+    async def track_markets(self, market_tickers: List[str]) -> list:
+        """Start maintaining books for more markets; the server sends a snapshot for each."""
+        added = [t for t in market_tickers if t not in self.market_tickers]
+        self.market_tickers.extend(added)
+        if not added or self.ws is None:
+            return []
+        return await self.subscribe_markets(added, ["orderbook_delta"])
+
+    async def untrack_markets(self, market_tickers: List[str]) -> list:
+        """Stop receiving orderbook messages for markets and drop their books."""
+        removing = set(market_tickers)
+        self.market_tickers = [t for t in self.market_tickers if t not in removing]
+        for ticker in removing:
+            self.order_books.books.pop(ticker, None)
+        if self.ws is None:
+            return []
+        return await self.unsubscribe_markets(list(market_tickers), ["orderbook_delta"])
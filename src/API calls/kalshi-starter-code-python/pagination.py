@@ -0,0 +1,123 @@
+"""
+Cursor pagination helpers for Kalshi list endpoints
+
+Kalshi list endpoints return one page plus a `cursor` for the next one. These
+helpers turn any such endpoint into a lazy iterator over its items, fetching
+the next page in the background while the caller works through the current
+one. Only about two pages are held in memory at a time.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+
+def _page_limit(page_size: Optional[int], remaining: Optional[int]) -> Optional[int]:
+    """Page size to request, never asking for more than the caller still wants"""
+    if remaining is None:
+        return page_size
+    if page_size is None:
+        return remaining
+    return min(page_size, remaining)
+
+
+def iter_items(
+    fetch: Callable[..., Dict[str, Any]],
+    key: str,
+    page_size: Optional[int] = None,
+    max_items: Optional[int] = None,
+    prefetch: bool = True,
+    **params,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield every item of a paginated list endpoint
+
+    Args:
+        fetch: Page method such as client.get_trades; called with limit, cursor and params
+        key: Response field holding the page items (e.g. 'trades')
+        page_size: Items requested per page (API default if None)
+        max_items: Stop after this many items (all pages if None)
+        prefetch: Request the next page on a background thread while the
+            current page is being consumed
+        **params: Endpoint filters passed to every page request
+
+    Yields:
+        Items in API order
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    pending = None
+    yielded = 0
+    try:
+        page = fetch(limit=_page_limit(page_size, max_items), cursor=None, **params)
+        while True:
+            items = page.get(key) or []
+            cursor = page.get('cursor')
+            if max_items is not None:
+                items = items[:max_items - yielded]
+            remaining = None if max_items is None else max_items - yielded - len(items)
+            more = bool(cursor) and remaining != 0
+
+            if more and executor is not None:
+                pending = executor.submit(fetch, limit=_page_limit(page_size, remaining), cursor=cursor, **params)
+
+            for item in items:
+                yield item
+            yielded += len(items)
+
+            if not more:
+                return
+            if pending is not None:
+                page, pending = pending.result(), None
+            else:
+                page = fetch(limit=_page_limit(page_size, remaining), cursor=cursor, **params)
+    finally:
+        if pending is not None:
+            pending.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+async def aiter_items(
+    fetch: Callable[..., Awaitable[Dict[str, Any]]],
+    key: str,
+    page_size: Optional[int] = None,
+    max_items: Optional[int] = None,
+    prefetch: bool = True,
+    **params,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Async version of iter_items for coroutine page methods
+
+    With prefetch enabled the next page is requested as a separate task as soon
+    as the current page arrives.
+    """
+    pending = None
+    yielded = 0
+    try:
+        page = await fetch(limit=_page_limit(page_size, max_items), cursor=None, **params)
+        while True:
+            items = page.get(key) or []
+            cursor = page.get('cursor')
+            if max_items is not None:
+                items = items[:max_items - yielded]
+            remaining = None if max_items is None else max_items - yielded - len(items)
+            more = bool(cursor) and remaining != 0
+
+            if more and prefetch:
+                pending = asyncio.ensure_future(
+                    fetch(limit=_page_limit(page_size, remaining), cursor=cursor, **params)
+                )
+
+            for item in items:
+                yield item
+            yielded += len(items)
+
+            if not more:
+                return
+            if pending is not None:
+                page, pending = await pending, None
+            else:
+                page = await fetch(limit=_page_limit(page_size, remaining), cursor=cursor, **params)
+    finally:
+        if pending is not None:
+            pending.cancel()
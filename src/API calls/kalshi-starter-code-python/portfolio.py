@@ -0,0 +1,318 @@
+"""
+In-memory portfolio and exposure engine
+
+Holds cash, positions and resting orders, updates them incrementally from
+fills, and checks prospective orders against configured limits so a breach
+is rejected before any API call.
+
+Positions live in NumPy arrays with one row per market and an event index per
+row. Per-event exposure and worst-case loss are then a single bincount over
+all markets, not a loop over positions. All amounts are in cents.
+
+Worst-case loss of a market is what was paid for its contracts plus the cost
+of its resting buy orders, less 100 for every YES/NO pair held (a pair pays
+100 whatever the outcome). Summing this per event is conservative because it
+assumes every market in the event resolves against us.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from order_tracker import to_timestamp
+from pagination import iter_items
+
+
+def event_ticker_of(market_ticker: str) -> str:
+    """Event ticker of a market ticker, e.g. KXRT-25OCT18-T50 -> KXRT-25OCT18"""
+    return market_ticker.rsplit('-', 1)[0]
+
+
+@dataclass
+class PortfolioLimits:
+    """Risk limits; None disables a limit. Money amounts are in cents."""
+    max_total_exposure: Optional[int] = None
+    max_event_exposure: Optional[int] = None
+    max_event_worst_case_loss: Optional[int] = None
+    max_market_contracts: Optional[int] = None
+    min_cash_reserve: int = 0
+
+
+class PortfolioEngine:
+    """Cash, positions and resting orders with vectorized exposure and limit checks"""
+
+    def __init__(self, limits: Optional[PortfolioLimits] = None, cash: Optional[int] = None):
+        """
+        Args:
+            limits: Limits enforced by check_order / filter_recommendations
+            cash: Starting cash balance in cents (load() replaces it). Until
+                cash is given or loaded, orders are not checked against it.
+        """
+        self.limits = limits or PortfolioLimits()
+        self.cash = cash or 0
+        self.cash_known = cash is not None
+        self.loaded_at: Optional[float] = None  # fills before this are already in the loaded state
+        self.tickers: List[str] = []
+        self.events: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._event_rows: Dict[str, int] = {}
+        self.event_index = np.zeros(0, dtype=np.int64)
+        self.yes_qty = np.zeros(0, dtype=np.int64)
+        self.no_qty = np.zeros(0, dtype=np.int64)
+        self.cost = np.zeros(0, dtype=np.int64)  # cents paid for contracts still held
+        self.resting_qty = np.zeros(0, dtype=np.int64)
+        self.resting_cost = np.zeros(0, dtype=np.int64)  # cents reserved by resting buys
+        self.resting_orders: Dict[str, Tuple[int, int, int]] = {}  # order id -> (row, count, price)
+        self._seen_trades = set()
+
+    # Rows
+
+    def _row(self, ticker: str) -> int:
+        row = self._rows.get(ticker)
+        if row is not None:
+            return row
+        event = event_ticker_of(ticker)
+        if event not in self._event_rows:
+            self._event_rows[event] = len(self.events)
+            self.events.append(event)
+        row = len(self.tickers)
+        self._rows[ticker] = row
+        self.tickers.append(ticker)
+        self.event_index = np.append(self.event_index, self._event_rows[event])
+        for name in ('yes_qty', 'no_qty', 'cost', 'resting_qty', 'resting_cost'):
+            setattr(self, name, np.append(getattr(self, name), 0))
+        return row
+
+    # Incremental updates
+
+    def set_position(self, ticker: str, position: int, cost: int) -> None:
+        """Set a market's position (Kalshi convention: positive YES, negative NO) and its cost"""
+        row = self._row(ticker)
+        self.yes_qty[row] = max(position, 0)
+        self.no_qty[row] = max(-position, 0)
+        self.cost[row] = cost
+
+    def record_order(self, order_id: str, ticker: str, side: str, count: int, price: int,
+                     action: str = 'buy') -> None:
+        """Reserve cash and exposure for a resting buy order (sells reserve nothing)"""
+        if action != 'buy' or order_id in self.resting_orders:
+            return
+        row = self._row(ticker)
+        self.resting_orders[order_id] = (row, count, price)
+        self.resting_qty[row] += count
+        self.resting_cost[row] += count * price
+
+    def remove_order(self, order_id: str, count: Optional[int] = None) -> None:
+        """Release a resting order, or count contracts of it (e.g. as they fill)"""
+        entry = self.resting_orders.get(order_id)
+        if entry is None:
+            return
+        row, remaining, price = entry
+        released = remaining if count is None else min(count, remaining)
+        self.resting_qty[row] -= released
+        self.resting_cost[row] -= released * price
+        if remaining - released > 0:
+            self.resting_orders[order_id] = (row, remaining - released, price)
+        else:
+            del self.resting_orders[order_id]
+
+    def apply_fill(self, ticker: str, side: str, action: str, count: int, price: int,
+                   order_id: Optional[str] = None) -> None:
+        """Apply one fill at price (cents, for the side traded) to cash and positions"""
+        row = self._row(ticker)
+        held = self.yes_qty if side == 'yes' else self.no_qty
+        if order_id is not None:
+            self.remove_order(order_id, count)
+        if action == 'buy':
+            held[row] += count
+            self.cost[row] += count * price
+            self.cash -= count * price
+        else:
+            sold = min(count, int(held[row]))
+            total = int(self.yes_qty[row] + self.no_qty[row])
+            if sold and total:
+                self.cost[row] -= self.cost[row] * sold // total
+            held[row] -= sold
+            self.cash += count * price
+
+    def ingest_fills(self, fills: Iterable[Any]) -> int:
+        """
+        Apply fills from get_fills, WebSocket fill msgs or ws_dispatch.Fill records
+
+        Fills older than the last load() are skipped, since the loaded balance
+        and positions already include them.
+
+        Returns:
+            Number of fills applied
+        """
+        applied = 0
+        for fill in fills:
+            if not isinstance(fill, dict):
+                fill = {name: getattr(fill, name) for name in fill.__slots__}
+            if self.loaded_at is not None:
+                ts = to_timestamp(fill.get('created_time', fill.get('ts')))
+                if ts is not None and ts < self.loaded_at:
+                    continue
+            trade_id = fill.get('trade_id')
+            if trade_id is not None:
+                if trade_id in self._seen_trades:
+                    continue
+                self._seen_trades.add(trade_id)
+            side = fill.get('side', 'yes')
+            self.apply_fill(fill.get('ticker') or fill.get('market_ticker'), side, fill.get('action', 'buy'),
+                            fill.get('count') or 0, fill.get(f'{side}_price') or 0, fill.get('order_id'))
+            applied += 1
+        return applied
+
+    def handle_message(self, message: Any) -> int:
+        """WebSocket hook: pass decoded messages or Fill records; non-fill messages are ignored"""
+        if isinstance(message, dict):
+            if message.get('type') != 'fill':
+                return 0
+            message = message.get('msg', {})
+        return self.ingest_fills([message])
+
+    def load(self, client, page_size: int = 200) -> None:
+        """Replace cash, positions and resting orders with the account's current state"""
+        self.loaded_at = time.time()
+        self.cash = client.get_balance().get('balance', 0)
+        self.cash_known = True
+        self.yes_qty[:] = 0
+        self.no_qty[:] = 0
+        self.cost[:] = 0
+        for position in iter_items(client.get_positions, 'market_positions', page_size):
+            self.set_position(position['ticker'], position.get('position', 0), position.get('market_exposure', 0))
+
+        self.resting_orders.clear()
+        self.resting_qty[:] = 0
+        self.resting_cost[:] = 0
+        try:
+            orders = list(iter_items(client.get_orders, 'orders', page_size, status='resting'))
+        except TypeError:
+            # ExchangeClient.get_orders has no status filter
+            orders = list(iter_items(client.get_orders, 'orders', page_size))
+        for order in orders:
+            if order.get('status', 'resting') != 'resting':
+                continue
+            side = order.get('side', 'yes')
+            self.record_order(order['order_id'], order['ticker'], side, order.get('remaining_count', 0),
+                              order.get(f'{side}_price') or 0, order.get('action', 'buy'))
+
+    # Vectorized risk
+
+    def market_worst_case_loss(self) -> np.ndarray:
+        """Worst-case loss per market row, counting resting buys as filled"""
+        hedged = 100 * np.minimum(self.yes_qty, self.no_qty)
+        return np.maximum(self.cost - hedged, 0) + self.resting_cost
+
+    def event_exposure(self) -> np.ndarray:
+        """Cents committed per event (position cost plus resting buys), indexed like self.events"""
+        return np.bincount(self.event_index, weights=self.cost + self.resting_cost,
+                           minlength=len(self.events)).astype(np.int64)
+
+    def event_worst_case_loss(self) -> np.ndarray:
+        """Worst-case loss per event, indexed like self.events"""
+        return np.bincount(self.event_index, weights=self.market_worst_case_loss(),
+                           minlength=len(self.events)).astype(np.int64)
+
+    def summary(self) -> Dict[str, Any]:
+        """Cash, totals and per-event exposure / worst-case loss"""
+        exposure = self.event_exposure()
+        worst = self.event_worst_case_loss()
+        return {
+            'cash': self.cash,
+            'available_cash': self.cash - int(self.resting_cost.sum()),
+            'total_exposure': int(exposure.sum()),
+            'worst_case_loss': int(worst.sum()),
+            'events': {event: {'exposure': int(exposure[i]), 'worst_case_loss': int(worst[i])}
+                       for i, event in enumerate(self.events)},
+        }
+
+    def _event_values(self, ticker: str, exposure: np.ndarray, worst: np.ndarray) -> Tuple[int, int]:
+        """(exposure, worst-case loss) of the event a market belongs to"""
+        event_row = self._event_rows.get(event_ticker_of(ticker))
+        if event_row is None:
+            return 0, 0
+        return int(exposure[event_row]), int(worst[event_row])
+
+    def _market_contracts(self, ticker: str) -> int:
+        row = self._rows.get(ticker)
+        if row is None:
+            return 0
+        return int(self.yes_qty[row] + self.no_qty[row] + self.resting_qty[row])
+
+    def _breaches(self, ticker: str, count: int, price: int, event_exposure: int, event_worst: int,
+                  total_exposure: int, committed_cash: int, contracts: int) -> List[str]:
+        limits = self.limits
+        cost = count * price
+        reasons = []
+        if self.cash_known and self.cash - committed_cash - cost < limits.min_cash_reserve:
+            reasons.append(f"cash {self.cash - committed_cash} cents cannot cover {cost} "
+                           f"plus the {limits.min_cash_reserve} cent reserve")
+        if limits.max_total_exposure is not None and total_exposure + cost > limits.max_total_exposure:
+            reasons.append(f"total exposure would be {total_exposure + cost} > {limits.max_total_exposure}")
+        if limits.max_event_exposure is not None and event_exposure + cost > limits.max_event_exposure:
+            reasons.append(f"event exposure would be {event_exposure + cost} > {limits.max_event_exposure}")
+        if (limits.max_event_worst_case_loss is not None
+                and event_worst + cost > limits.max_event_worst_case_loss):
+            reasons.append(f"event worst-case loss would be {event_worst + cost} > {limits.max_event_worst_case_loss}")
+        if limits.max_market_contracts is not None and contracts + count > limits.max_market_contracts:
+            reasons.append(f"{ticker} would hold {contracts + count} > {limits.max_market_contracts} contracts")
+        return reasons
+
+    def check_order(self, ticker: str, side: str, count: int, price: int) -> List[str]:
+        """
+        Check a prospective buy against the limits
+
+        Returns:
+            Reasons the order would breach a limit; empty if it is allowed
+        """
+        exposure = self.event_exposure()
+        event_exposure, event_worst = self._event_values(ticker, exposure, self.event_worst_case_loss())
+        return self._breaches(ticker, count, price, event_exposure, event_worst, int(exposure.sum()),
+                              int(self.resting_cost.sum()), self._market_contracts(ticker))
+
+    def filter_recommendations(self, recommendations: List[Any], contracts: Optional[int] = None,
+                               price_offset: int = 0) -> List[Any]:
+        """
+        Keep the recommendations that fit within the limits, in order
+
+        Accepted recommendations count against the limits of later ones, so the
+        set that comes back fits as a whole.
+
+        Args:
+            recommendations: BetRecommendation objects (ticker, side, current_price,
+                recommended_bet_size)
+            contracts: Contracts per bet; defaults to each recommended_bet_size
+            price_offset: Cents added to current_price when ordering (e.g. 1 for
+                a limit just above the ask)
+        """
+        exposure = self.event_exposure()
+        worst = self.event_worst_case_loss()
+        total_exposure = int(exposure.sum())
+        committed_cash = int(self.resting_cost.sum())
+        added_by_event: Dict[str, int] = {}
+        added_by_market: Dict[str, int] = {}
+        accepted = []
+        for recommendation in recommendations:
+            ticker = recommendation.ticker
+            event = event_ticker_of(ticker)
+            count = contracts if contracts is not None else recommendation.recommended_bet_size
+            price = int(recommendation.current_price + price_offset)
+            event_exposure, event_worst = self._event_values(ticker, exposure, worst)
+            added = added_by_event.get(event, 0)
+            reasons = self._breaches(ticker, count, price, event_exposure + added, event_worst + added,
+                                     total_exposure, committed_cash,
+                                     self._market_contracts(ticker) + added_by_market.get(ticker, 0))
+            if reasons:
+                print(f"Rejected {ticker} {recommendation.side.upper()}: {'; '.join(reasons)}")
+                continue
+            cost = count * price
+            accepted.append(recommendation)
+            total_exposure += cost
+            committed_cash += cost
+            added_by_event[event] = added + cost
+            added_by_market[ticker] = added_by_market.get(ticker, 0) + count
+        return accepted
@@ -0,0 +1,121 @@
+"""
+Vectorized pricing kernel for threshold markets
+
+Array versions of BettingSystem's per-market pricing functions. Each one takes
+NumPy arrays (or scalars) covering every market of an event and matches
+_adjust_probability_for_threshold, _calculate_expected_value,
+_calculate_bet_size and the side choice of _analyze_sentiment_for_market.
+benchmark_pricing.py checks the parity.
+
+Prices are in cents. Probabilities and expected values are decimals.
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+BASELINE_THRESHOLD = 50
+PROBABILITY_PER_POINT = 0.02  # probability moved per threshold point away from the baseline
+KELLY_MULTIPLIER = 0.25  # conservative (quarter) Kelly
+MIN_BET_SIZE = 1
+MAX_BET_SIZE = 10
+
+SIDE_NONE = 0
+SIDE_YES = 1
+SIDE_NO = -1
+
+PRICE_FIELDS = ('yes_bid', 'yes_ask', 'no_bid', 'no_ask')
+
+
+def to_price(value: Any) -> float:
+    """Price in cents as a float: None counts as 0 (no quote), non-numeric values such as main.py's 'N/A' as NaN"""
+    if value is None:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def price_columns(markets: List[Dict]) -> Dict[str, np.ndarray]:
+    """yes_bid/yes_ask/no_bid/no_ask arrays from market data dicts, NaN where a price is not a number"""
+    return {name: np.array([to_price(market.get(name)) for market in markets], dtype=np.float64)
+            for name in PRICE_FIELDS}
+
+
+def adjust_probability_for_threshold(base_probability, thresholds) -> np.ndarray:
+    """Probability of clearing each threshold: lower thresholds get higher probabilities"""
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    adjusted = base_probability - (thresholds - BASELINE_THRESHOLD) * PROBABILITY_PER_POINT
+    return np.clip(adjusted, 0.01, 0.99)
+
+
+def expected_value(probability, ask) -> np.ndarray:
+    """Expected profit per contract (decimal) of buying at ask; 0 where there is no ask"""
+    probability = np.asarray(probability, dtype=np.float64)
+    ask = np.asarray(ask, dtype=np.float64)
+    expected_profit = probability * (100 - ask) - (1 - probability) * ask
+    return np.where(ask > 0, expected_profit / 100, 0.0)
+
+
+def kelly_bet_size(confidence, expected_value, price) -> np.ndarray:
+    """Quarter-Kelly bet size in contracts, clamped to 1..10; 0 where expected_value <= 0"""
+    confidence = np.asarray(confidence, dtype=np.float64)
+    expected_value = np.asarray(expected_value, dtype=np.float64)
+    price = np.asarray(price, dtype=np.float64)
+    tradable = (price > 0) & (price < 100)
+    safe_price = np.where(tradable, price, 50.0)
+    odds = (100 - safe_price) / safe_price
+    kelly_fraction = (odds * confidence - (1 - confidence)) / odds
+    shares = np.trunc(kelly_fraction * KELLY_MULTIPLIER * 100)
+    size = np.where(tradable, np.clip(shares, MIN_BET_SIZE, MAX_BET_SIZE), MIN_BET_SIZE)
+    return np.where(expected_value > 0, size, 0).astype(np.int64)
+
+
+def price_markets(thresholds, yes_bid, yes_ask, no_bid, no_ask, base_probability, confidence,
+                  probability=None) -> Dict[str, np.ndarray]:
+    """
+    Price every market of an event in one pass
+
+    Args:
+        thresholds: Threshold of each market (e.g. 50 for KXTRON-50)
+        yes_bid, yes_ask, no_bid, no_ask: Prices in cents (0 where missing)
+        base_probability: Sentiment probability; scalar or one per market
+        confidence: Sentiment confidence; scalar or one per market
+        probability: Optional P(YES) per market (e.g. from score_model); replaces
+            the linear threshold adjustment of base_probability
+
+    Returns:
+        Arrays aligned with the inputs:
+          probability - predicted probability of YES at each threshold
+          yes_ev, no_ev - expected value of buying each side at its ask
+          side - SIDE_YES, SIDE_NO or SIDE_NONE (no side has positive EV)
+          price - ask of the chosen side (0 for SIDE_NONE)
+          expected_value - EV of the chosen side (0 for SIDE_NONE)
+          bet_size - quarter-Kelly contracts (0 for SIDE_NONE)
+    """
+    if probability is None:
+        probability = adjust_probability_for_threshold(base_probability, thresholds)
+    else:
+        probability = np.asarray(probability, dtype=np.float64)
+    yes_ask = np.asarray(yes_ask, dtype=np.float64)
+    no_ask = np.asarray(no_ask, dtype=np.float64)
+    yes_ev = expected_value(probability, yes_ask)
+    no_ev = expected_value(1 - probability, no_ask)
+
+    buy_yes = (yes_ev > no_ev) & (yes_ev > 0)
+    buy_no = ~buy_yes & (no_ev > yes_ev) & (no_ev > 0)
+    side = np.where(buy_yes, SIDE_YES, np.where(buy_no, SIDE_NO, SIDE_NONE))
+    price = np.where(buy_yes, yes_ask, np.where(buy_no, no_ask, 0.0))
+    chosen_ev = np.where(buy_yes, yes_ev, np.where(buy_no, no_ev, 0.0))
+    confidence = np.broadcast_to(np.asarray(confidence, dtype=np.float64), side.shape)
+
+    return {
+        'probability': probability,
+        'yes_ev': yes_ev,
+        'no_ev': no_ev,
+        'side': side,
+        'price': price,
+        'expected_value': chosen_ev,
+        'bet_size': kelly_bet_size(confidence, chosen_ev, price),
+    }
@@ -0,0 +1,122 @@
+"""
+Token-bucket rate limiting for the Kalshi API clients
+
+Buckets hand out reservations under a lock and callers sleep outside it, so one
+limiter can be shared by many threads and asyncio tasks at once. Each call
+reports how long it was throttled.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens/sec, holding at most ``capacity``"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Sustained tokens (requests) per second
+            capacity: Burst size; defaults to one second worth of tokens
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        if self.capacity < 1:
+            raise ValueError("capacity must allow at least one token")
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens now and return how many seconds the caller must wait before using them
+
+        The balance may go negative; later callers then queue behind earlier
+        reservations instead of racing for the same refill.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block the current thread until tokens are available; returns seconds waited"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """Suspend the current task until tokens are available; returns seconds waited"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    Separate read and write budgets for Kalshi requests, with throttling statistics
+
+    GET requests draw from the read bucket; POST/DELETE (order placement and
+    cancellation) draw from the write bucket. The defaults match Kalshi's Basic
+    API tier (20 reads/sec, 10 writes/sec); raise them for higher tiers.
+    """
+
+    def __init__(
+        self,
+        read_rate: float = 20.0,
+        write_rate: float = 10.0,
+        read_burst: Optional[float] = None,
+        write_burst: Optional[float] = None,
+    ):
+        self.buckets = {
+            'read': TokenBucket(read_rate, read_burst),
+            'write': TokenBucket(write_rate, write_burst),
+        }
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.throttled_calls = 0
+        self.total_wait = 0.0
+        self.last_wait = 0.0
+
+    @staticmethod
+    def budget_for(method: str) -> str:
+        """Map an HTTP method to its budget name"""
+        return 'read' if method.upper() in ('GET', 'HEAD') else 'write'
+
+    def _record(self, wait: float) -> float:
+        with self._stats_lock:
+            self.calls += 1
+            self.last_wait = wait
+            if wait > 0:
+                self.throttled_calls += 1
+                self.total_wait += wait
+        return wait
+
+    def acquire(self, method: str = 'GET') -> float:
+        """Wait for the method's budget in a thread; returns seconds throttled"""
+        return self._record(self.buckets[self.budget_for(method)].acquire())
+
+    async def acquire_async(self, method: str = 'GET') -> float:
+        """Wait for the method's budget in a task; returns seconds throttled"""
+        return self._record(await self.buckets[self.budget_for(method)].acquire_async())
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of throttling statistics"""
+        with self._stats_lock:
+            return {
+                'calls': self.calls,
+                'throttled_calls': self.throttled_calls,
+                'total_wait': self.total_wait,
+                'last_wait': self.last_wait,
+                'average_wait': self.total_wait / self.calls if self.calls else 0.0,
+            }
@@ -0,0 +1,117 @@
+"""
+In-memory TTL response cache for read-only Kalshi endpoints
+
+Entries are keyed by path and query params and expire after a TTL chosen per
+endpoint family (the first path segment after /trade-api/v2, e.g. "series" or
+"markets"). The least recently used entry is evicted once the cache is full.
+Responses are deep-copied in and out, so a caller that edits the dict it got
+back cannot change what later hits return.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Series and event metadata rarely change; market entries carry live prices
+DEFAULT_TTLS = {
+    'series': 3600.0,
+    'events': 600.0,
+    'exchange': 30.0,
+    'markets': 5.0,
+}
+
+_MISSING = object()
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of GET responses with per-family TTLs and hit/miss counters"""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = 1024):
+        """
+        Args:
+            ttls: Seconds to keep responses per endpoint family; merged over DEFAULT_TTLS.
+                Families without a TTL (or with TTL <= 0) are never cached.
+            max_entries: Maximum cached responses before LRU eviction
+        """
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def family(path: str) -> str:
+        """Endpoint family of a path, e.g. /trade-api/v2/series/KXRT -> 'series'"""
+        parts = [p for p in path.partition('?')[0].split('/') if p]
+        if len(parts) >= 2 and parts[0] == 'trade-api':
+            parts = parts[2:]
+        return parts[0] if parts else ''
+
+    @staticmethod
+    def _key(path: str, params: Optional[Dict[str, Any]]) -> Tuple:
+        return (path, tuple(sorted((params or {}).items())))
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Return a copy of the cached response, or a sentinel for which is_miss() is True"""
+        key = self._key(path, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, _, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+            self.misses += 1
+            return _MISSING
+
+    def set(self, path: str, params: Optional[Dict[str, Any]], value: Any) -> None:
+        """Store a response if its endpoint family has a TTL"""
+        family = self.family(path)
+        ttl = self.ttls.get(family, 0)
+        if ttl <= 0:
+            return
+        key = self._key(path, params)
+        value = copy.deepcopy(value)  # the caller keeps and may edit the original
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, family, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, family: Optional[str] = None) -> int:
+        """Drop every entry, or only one endpoint family; returns entries removed"""
+        with self._lock:
+            if family is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            stale = [key for key, (_, fam, _) in self._entries.items() if fam == family]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+            }
+
+    @staticmethod
+    def is_miss(value: Any) -> bool:
+        """True if value is the sentinel returned by get() for a miss"""
+        return value is _MISSING
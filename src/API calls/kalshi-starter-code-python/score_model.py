@@ -0,0 +1,147 @@
+"""
+Score-distribution model for a ladder of threshold markets
+
+An event such as KXRT-25OCT18 lists one market per threshold ("score above
+50", "above 60", ...). Instead of shifting each market's probability on its
+own, one logistic distribution of the final score is fitted per event and
+every threshold's P(score > T) is read off its CDF in a single vectorized
+evaluation, so probabilities are always monotone across the ladder.
+
+With the default scale of 12.5 the CDF's slope at the centre is 1/(4 * 12.5)
+= 2% per point, the same as BettingSystem's linear adjustment, and a
+sentiment probability p at the baseline threshold 50 maps to a centre of
+50 + 12.5 * logit(p).
+
+find_ladder_arbitrage checks the order books of a ladder: for thresholds
+T_i <= T_j, YES on T_i plus NO on T_j pays at least 100 whatever the score,
+so buying both for less than 100 is riskless.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from pricing import BASELINE_THRESHOLD, to_price
+
+DEFAULT_SCALE = 12.5
+MIN_PROBABILITY = 0.01
+MAX_PROBABILITY = 0.99
+
+
+def logit(p) -> np.ndarray:
+    p = np.clip(np.asarray(p, dtype=np.float64), MIN_PROBABILITY, MAX_PROBABILITY)
+    return np.log(p / (1 - p))
+
+
+def sigmoid(x) -> np.ndarray:
+    return 1 / (1 + np.exp(-np.asarray(x, dtype=np.float64)))
+
+
+def _quotes(prices) -> np.ndarray:
+    """Prices in cents, with None and non-numeric values (e.g. 'N/A') as 0, meaning no quote"""
+    return np.nan_to_num(np.array([to_price(price) for price in prices], dtype=np.float64), nan=0.0)
+
+
+@dataclass
+class ScoreDistribution:
+    """Logistic distribution of an event's final score"""
+    mu: float  # centre (median score)
+    scale: float = DEFAULT_SCALE
+
+    def cdf(self, scores) -> np.ndarray:
+        """P(score <= s) for each s"""
+        return sigmoid((np.asarray(scores, dtype=np.float64) - self.mu) / self.scale)
+
+    def prob_above(self, thresholds) -> np.ndarray:
+        """P(score > T) for every threshold, clipped to [0.01, 0.99]"""
+        return np.clip(1 - self.cdf(thresholds), MIN_PROBABILITY, MAX_PROBABILITY)
+
+    @classmethod
+    def from_sentiment(cls, base_probabilities, weights=None, scale: float = DEFAULT_SCALE) -> 'ScoreDistribution':
+        """
+        Distribution implied by sentiment probabilities of clearing the baseline threshold
+
+        Args:
+            base_probabilities: One or more sentiment probabilities for the event
+            weights: Optional weight per probability (e.g. sentiment confidence)
+            scale: Logistic scale in score points
+
+        Returns:
+            ScoreDistribution centred on the weighted mean of the implied centres
+        """
+        centres = BASELINE_THRESHOLD + scale * logit(np.atleast_1d(base_probabilities))
+        if weights is not None and np.sum(weights) > 0:
+            mu = np.average(centres, weights=weights)
+        else:
+            mu = centres.mean()
+        return cls(float(mu), scale)
+
+    @classmethod
+    def fit_to_market(cls, thresholds, yes_bid, yes_ask) -> Optional['ScoreDistribution']:
+        """
+        Distribution implied by the ladder's mid prices
+
+        logit(mid / 100) = (mu - T) / scale is linear in T, so mu and scale
+        come from one least-squares line. Markets without both a bid and an ask
+        (0, None or 'N/A') are skipped. A single usable market fixes mu at the
+        default scale.
+
+        Returns:
+            ScoreDistribution, or None if no market has a two-sided quote
+        """
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        yes_bid = _quotes(yes_bid)
+        yes_ask = _quotes(yes_ask)
+        quoted = (yes_bid > 0) & (yes_ask > 0)
+        if not quoted.any():
+            return None
+
+        x = thresholds[quoted]
+        y = logit((yes_bid[quoted] + yes_ask[quoted]) / 200)
+        if len(np.unique(x)) >= 2:
+            slope, intercept = np.polyfit(x, y, 1)
+            if slope < 0:
+                scale = -1 / slope
+                return cls(float(intercept * scale), float(scale))
+        # One threshold, or a ladder priced against its own ordering: keep the default scale
+        return cls(float(np.mean(x + DEFAULT_SCALE * y)), DEFAULT_SCALE)
+
+
+def find_ladder_arbitrage(thresholds, yes_ask, no_ask, tickers: Optional[Sequence[str]] = None) -> List[Dict]:
+    """
+    Find YES/NO pairs across a ladder that cost less than their guaranteed payout
+
+    For T_i <= T_j, every score clears T_i or stays at or below T_j, so YES on
+    T_i plus NO on T_j pays at least 100. All pairs are checked at once.
+
+    Args:
+        thresholds: Threshold of each market in the event
+        yes_ask, no_ask: Asks in cents (0, None or 'N/A' where there is no ask)
+        tickers: Optional market tickers aligned with thresholds
+
+    Returns:
+        List of dicts (yes_ticker, no_ticker, yes_threshold, no_threshold, cost,
+        profit in cents per pair), most profitable first
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    yes_ask = _quotes(yes_ask)
+    no_ask = _quotes(no_ask)
+    if tickers is None:
+        tickers = [str(t) for t in thresholds]
+
+    cost = yes_ask[:, None] + no_ask[None, :]
+    covered = thresholds[:, None] <= thresholds[None, :]
+    available = (yes_ask[:, None] > 0) & (no_ask[None, :] > 0)
+    yes_index, no_index = np.nonzero(covered & available & (cost < 100))
+
+    opportunities = [{
+        'yes_ticker': tickers[i],
+        'no_ticker': tickers[j],
+        'yes_threshold': float(thresholds[i]),
+        'no_threshold': float(thresholds[j]),
+        'cost': float(cost[i, j]),
+        'profit': float(100 - cost[i, j]),
+    } for i, j in zip(yes_index, no_index)]
+    opportunities.sort(key=lambda o: o['profit'], reverse=True)
+    return opportunities
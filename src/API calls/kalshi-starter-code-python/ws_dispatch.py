@@ -0,0 +1,202 @@
+"""
+Fast decoding and typed dispatch for Kalshi WebSocket messages
+
+Frames are decoded with orjson or ujson when one is installed, falling back to
+the standard library. A MessageDispatcher routes each decoded message to the
+handlers registered for its `type` (or for the channel that produces it). The
+hot market-data types can be delivered as compact __slots__ records instead of
+nested dicts.
+"""
+
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+
+    loads = orjson.loads
+    JSON_BACKEND = 'orjson'
+except ImportError:
+    try:
+        import ujson
+
+        loads = ujson.loads
+        JSON_BACKEND = 'ujson'
+    except ImportError:
+        loads = json.loads
+        JSON_BACKEND = 'json'
+
+
+class TickerUpdate:
+    """Top-of-book and volume update from the ticker channel"""
+    __slots__ = ('sid', 'seq', 'market_ticker', 'price', 'yes_bid', 'yes_ask', 'volume', 'open_interest', 'ts')
+
+    def __init__(self, sid, seq, market_ticker, price, yes_bid, yes_ask, volume, open_interest, ts):
+        self.sid = sid
+        self.seq = seq
+        self.market_ticker = market_ticker
+        self.price = price
+        self.yes_bid = yes_bid
+        self.yes_ask = yes_ask
+        self.volume = volume
+        self.open_interest = open_interest
+        self.ts = ts
+
+    @classmethod
+    def from_message(cls, data: Dict[str, Any]) -> "TickerUpdate":
+        msg = data['msg']
+        return cls(data.get('sid'), data.get('seq'), msg.get('market_ticker'), msg.get('price'),
+                   msg.get('yes_bid'), msg.get('yes_ask'), msg.get('volume'), msg.get('open_interest'),
+                   msg.get('ts'))
+
+
+class OrderbookDelta:
+    """Change of resting quantity at one price level"""
+    __slots__ = ('sid', 'seq', 'market_ticker', 'side', 'price', 'delta')
+
+    def __init__(self, sid, seq, market_ticker, side, price, delta):
+        self.sid = sid
+        self.seq = seq
+        self.market_ticker = market_ticker
+        self.side = side
+        self.price = price
+        self.delta = delta
+
+    @classmethod
+    def from_message(cls, data: Dict[str, Any]) -> "OrderbookDelta":
+        msg = data['msg']
+        return cls(data.get('sid'), data.get('seq'), msg.get('market_ticker'), msg.get('side'),
+                   msg.get('price'), msg.get('delta'))
+
+
+class Trade:
+    """Public trade from the trade channel"""
+    __slots__ = ('sid', 'seq', 'trade_id', 'market_ticker', 'yes_price', 'no_price', 'count', 'taker_side', 'ts')
+
+    def __init__(self, sid, seq, trade_id, market_ticker, yes_price, no_price, count, taker_side, ts):
+        self.sid = sid
+        self.seq = seq
+        self.trade_id = trade_id
+        self.market_ticker = market_ticker
+        self.yes_price = yes_price
+        self.no_price = no_price
+        self.count = count
+        self.taker_side = taker_side
+        self.ts = ts
+
+    @classmethod
+    def from_message(cls, data: Dict[str, Any]) -> "Trade":
+        msg = data['msg']
+        return cls(data.get('sid'), data.get('seq'), msg.get('trade_id'), msg.get('market_ticker'),
+                   msg.get('yes_price'), msg.get('no_price'), msg.get('count'), msg.get('taker_side'),
+                   msg.get('ts'))
+
+
+class Fill:
+    """One of our own orders (partially) filling, from the fill channel"""
+    __slots__ = ('sid', 'seq', 'trade_id', 'order_id', 'market_ticker', 'side', 'action', 'count',
+                 'yes_price', 'no_price', 'is_taker', 'ts')
+
+    def __init__(self, sid, seq, trade_id, order_id, market_ticker, side, action, count,
+                 yes_price, no_price, is_taker, ts):
+        self.sid = sid
+        self.seq = seq
+        self.trade_id = trade_id
+        self.order_id = order_id
+        self.market_ticker = market_ticker
+        self.side = side
+        self.action = action
+        self.count = count
+        self.yes_price = yes_price
+        self.no_price = no_price
+        self.is_taker = is_taker
+        self.ts = ts
+
+    @classmethod
+    def from_message(cls, data: Dict[str, Any]) -> "Fill":
+        msg = data['msg']
+        return cls(data.get('sid'), data.get('seq'), msg.get('trade_id'), msg.get('order_id'),
+                   msg.get('market_ticker'), msg.get('side'), msg.get('action'), msg.get('count'),
+                   msg.get('yes_price'), msg.get('no_price'), msg.get('is_taker'), msg.get('ts'))
+
+
+# Message types that have a record class
+RECORD_TYPES = {
+    'ticker': TickerUpdate,
+    'orderbook_delta': OrderbookDelta,
+    'trade': Trade,
+    'fill': Fill,
+}
+
+# Subscription channel -> message types it produces
+CHANNEL_TYPES = {
+    'ticker': ('ticker',),
+    'orderbook_delta': ('orderbook_snapshot', 'orderbook_delta'),
+    'trade': ('trade',),
+    'fill': ('fill',),
+}
+
+
+class MessageDispatcher:
+    """Routes decoded WebSocket messages to handlers registered per type or channel"""
+
+    def __init__(self, default_handler: Optional[Callable] = None):
+        """
+        Args:
+            default_handler: Called with the decoded dict for messages no handler is registered for
+        """
+        # message type -> [(handler, is_async, typed)]
+        self.handlers: Dict[str, List[Tuple[Callable, bool, bool]]] = defaultdict(list)
+        self.default_handler = default_handler
+        self.counts: Dict[str, int] = defaultdict(int)
+
+    def register(self, name: str, handler: Callable, typed: bool = True) -> None:
+        """
+        Register a handler (plain function or coroutine function)
+
+        Args:
+            name: A message type ('ticker', 'orderbook_snapshot', 'error', ...) or a
+                channel name, which registers every message type the channel produces
+            handler: Called with one message
+            typed: Pass a record object for types in RECORD_TYPES instead of the dict
+        """
+        is_async = asyncio.iscoroutinefunction(handler)
+        for message_type in CHANNEL_TYPES.get(name, (name,)):
+            self.handlers[message_type].append((handler, is_async, typed))
+
+    def unregister(self, name: str, handler: Callable) -> None:
+        """Remove a handler registered under a type or channel name"""
+        for message_type in CHANNEL_TYPES.get(name, (name,)):
+            self.handlers[message_type] = [h for h in self.handlers[message_type] if h[0] is not handler]
+
+    async def dispatch(self, data: Dict[str, Any]) -> int:
+        """Deliver one decoded message; returns how many handlers received it"""
+        message_type = data.get('type')
+        self.counts[message_type] += 1
+        handlers = self.handlers.get(message_type)
+        if not handlers:
+            if self.default_handler is not None:
+                result = self.default_handler(data)
+                if asyncio.iscoroutine(result):
+                    await result
+            return 0
+
+        record = None
+        record_class = RECORD_TYPES.get(message_type)
+        for handler, is_async, typed in handlers:
+            message = data
+            if typed and record_class is not None:
+                if record is None:
+                    record = record_class.from_message(data)
+                message = record
+            if is_async:
+                await handler(message)
+            else:
+                handler(message)
+        return len(handlers)
+
+    async def dispatch_raw(self, frame) -> int:
+        """Decode one raw text/bytes frame and dispatch it"""
+        return await self.dispatch(loads(frame))
@@ -0,0 +1,109 @@
+"""
+Supervisor that keeps a KalshiWebSocketClient connected for long-running feeds
+
+Every time the connection drops, the supervisor waits a jittered exponential
+backoff and connects again. Each connect signs fresh auth headers, and the
+client replays its remembered subscriptions in on_open. Sequence-gap
+resnapshots are handled by the client itself. The supervisor adds uptime,
+reconnect and message-rate metrics across connections.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+
+from clients import KalshiWebSocketClient
+
+
+class WebSocketSupervisor:
+    """Reconnects a WebSocket client with jittered backoff until stopped"""
+
+    def __init__(
+        self,
+        client: KalshiWebSocketClient,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        stable_after: float = 30.0,
+    ):
+        """
+        Args:
+            client: WebSocket client to keep connected
+            initial_backoff: Backoff ceiling (seconds) after the first failure
+            max_backoff: Largest backoff ceiling, however many failures in a row
+            stable_after: A connection that lasted this long resets the backoff
+        """
+        self.client = client
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self._stopping = False
+        self.started_at: Optional[float] = None
+        self.connections = 0
+        self.reconnects = 0
+        self.failures_in_row = 0
+        self.completed_uptime = 0.0
+        self.last_error: Optional[str] = None
+
+    def backoff_delay(self) -> float:
+        """Full-jitter exponential backoff for the current run of failures"""
+        ceiling = min(self.max_backoff, self.initial_backoff * (2 ** max(0, self.failures_in_row - 1)))
+        return random.uniform(0, ceiling)
+
+    async def run(self) -> None:
+        """Connect, and reconnect after every drop, until stop() is called"""
+        self.started_at = time.monotonic()
+        self._stopping = False
+        while not self._stopping:
+            if self.connections:
+                self.reconnects += 1
+            self.connections += 1
+            session_start = time.monotonic()
+            try:
+                await self.client.connect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"WebSocket connect failed: {self.last_error}")
+            # Uptime counts from the handshake; an attempt that never connected adds nothing
+            connected_at = self.client.last_connected_at
+            if connected_at is not None and connected_at >= session_start:
+                session_length = time.monotonic() - connected_at
+            else:
+                session_length = 0.0
+            self.completed_uptime += session_length
+
+            if self._stopping:
+                break
+            if session_length >= self.stable_after:
+                self.failures_in_row = 0
+            self.failures_in_row += 1
+            delay = self.backoff_delay()
+            print(f"Reconnecting in {delay:.1f}s (attempt {self.failures_in_row})")
+            await asyncio.sleep(delay)
+
+    async def stop(self) -> None:
+        """Stop reconnecting and close the current connection"""
+        self._stopping = True
+        if self.client.ws is not None:
+            await self.client.ws.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Connection uptime, reconnect count and message rate so far"""
+        now = time.monotonic()
+        current_uptime = now - self.client.connected_at if self.client.connected_at else 0.0
+        connected_seconds = self.completed_uptime + current_uptime
+        wall_seconds = now - self.started_at if self.started_at else 0.0
+        return {
+            'connected': self.client.connected_at is not None,
+            'current_uptime': current_uptime,
+            'total_uptime': connected_seconds,
+            'uptime_ratio': connected_seconds / wall_seconds if wall_seconds else 0.0,
+            'connections': self.connections,
+            'reconnects': self.reconnects,
+            'messages_received': self.client.messages_received,
+            'messages_per_second': self.client.messages_received / connected_seconds if connected_seconds else 0.0,
+            'sequence_gaps': self.client.sequence_gaps,
+            'last_error': self.last_error,
+        }
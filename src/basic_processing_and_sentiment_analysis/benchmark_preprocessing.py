@@ -0,0 +1,101 @@
+"""
+Preprocessing throughput on the movie_reviews corpus
+
+Compares the original preprocess_text, which rebuilt the stopword set and
+WordNetLemmatizer on every call and made three list passes, with
+preprocessing.TextPreprocessor (prebuilt resources, one pass, cached lemmas).
+Asserts both produce identical tokens, then reports docs/sec. It then runs
+preprocess_corpus with increasing worker counts to show how the parallel
+stage scales.
+
+Usage:
+    python benchmark_preprocessing.py [--docs 2000] [--workers 1,2,4,8]
+"""
+
+import argparse
+import os
+import string
+import sys
+import time
+
+from preprocessing import TextPreprocessor, preprocess_corpus
+
+
+def preprocess_text_baseline(text):
+    """preprocess_text as it was before TextPreprocessor"""
+    from nltk.corpus import stopwords
+    from nltk.stem import WordNetLemmatizer
+    from nltk.tokenize import word_tokenize
+
+    tokens = word_tokenize(text.lower())
+    stop_words = set(stopwords.words('english'))
+    tokens = [t for t in tokens if t not in string.punctuation]
+    tokens = [t for t in tokens if t not in stop_words]
+    lemmatizer = WordNetLemmatizer()
+    return [lemmatizer.lemmatize(t) for t in tokens]
+
+
+def load_reviews(limit):
+    from nltk.corpus import movie_reviews
+    fileids = movie_reviews.fileids()[:limit]
+    return [movie_reviews.raw(fileid) for fileid in fileids]
+
+
+def timed(function, texts):
+    start = time.perf_counter()
+    results = [function(text) for text in texts]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000, help="movie_reviews documents to preprocess")
+    parser.add_argument("--workers", default=None,
+                        help="comma-separated worker counts for preprocess_corpus (default: powers of 2 up to the CPU count)")
+    args = parser.parse_args()
+
+    try:
+        texts = load_reviews(args.docs)
+        TextPreprocessor()  # fails fast if stopwords/wordnet/punkt are missing
+    except LookupError as e:
+        print(f"Missing NLTK data: {e}")
+        print("Run: python -m nltk.downloader movie_reviews punkt punkt_tab stopwords wordnet")
+        sys.exit(1)
+
+    baseline, baseline_time = timed(preprocess_text_baseline, texts)
+    preprocessor = TextPreprocessor()
+    cold, cold_time = timed(preprocessor, texts)
+    warm, warm_time = timed(preprocessor, texts)
+    assert baseline == cold == warm, "TextPreprocessor output differs from the original preprocess_text"
+
+    print("PREPROCESSING BENCHMARK")
+    print("=" * 50)
+    print(f"{len(texts)} movie_reviews documents, identical tokens on every path")
+    print(f"Distinct tokens lemmatized: {len(preprocessor.lemma_cache):,}\n")
+    for label, elapsed in (("original preprocess_text", baseline_time),
+                           ("TextPreprocessor (cold)", cold_time),
+                           ("TextPreprocessor (warm)", warm_time)):
+        print(f"{label.ljust(26)}{len(texts) / elapsed:10,.0f} docs/sec   {elapsed:7.2f} s")
+    print(f"\nSpeedup: {baseline_time / cold_time:.1f}x cold, {baseline_time / warm_time:.1f}x warm")
+
+    if args.workers:
+        worker_counts = [int(count) for count in args.workers.split(',')]
+    else:
+        cpus = os.cpu_count() or 1
+        worker_counts = [2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus]
+    worker_counts = [1] + [count for count in worker_counts if count != 1]  # 1 worker is the reference
+
+    print("\nPARALLEL preprocess_corpus")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        parallel = preprocess_corpus(texts, workers=workers)
+        elapsed = time.perf_counter() - start
+        assert parallel == baseline, f"preprocess_corpus with {workers} workers differs from the original"
+        if workers == 1:
+            single_time = elapsed
+        print(f"{f'{workers} worker(s)'.ljust(26)}{len(texts) / elapsed:10,.0f} docs/sec   {elapsed:7.2f} s"
+              f"   {single_time / elapsed:5.1f}x vs 1 worker")
+
+
+if __name__ == "__main__":
+    main()
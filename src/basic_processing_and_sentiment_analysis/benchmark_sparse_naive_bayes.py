@@ -0,0 +1,120 @@
+"""
+Parity and speed of SparseNaiveBayesClassifier against nltk's NaiveBayesClassifier
+
+Trains NLTK's classifier and the sparse backend (natively, and converted with
+from_nltk) on the same {word: True} featuresets, then asserts that labels,
+probabilities and accuracy match on held-out documents. Reports docs/sec of
+NLTK's per-document classify against one batched classify_many call.
+
+Uses a synthetic positive/negative corpus by default; --movie-reviews uses the
+NLTK corpus with the SentimentAnalyzer preprocessing instead.
+
+Usage:
+    python benchmark_sparse_naive_bayes.py [--docs 2000] [--vocabulary 20000] [--movie-reviews]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+from nltk import NaiveBayesClassifier
+from nltk.classify import accuracy
+
+from sparse_naive_bayes import SparseNaiveBayesClassifier
+
+
+def synthetic_featuresets(docs, vocabulary, words_per_doc=300, seed=0):
+    """Zipf-distributed documents whose word frequencies lean towards their label"""
+    rng = np.random.default_rng(seed)
+    ranks = np.arange(1, vocabulary + 1)
+    base = 1 / ranks
+    lean = {label: base * np.exp(rng.normal(0, 0.2, vocabulary)) for label in ('pos', 'neg')}
+    featuresets = []
+    for i in range(docs):
+        label = 'pos' if i % 2 else 'neg'
+        weights = lean[label] / lean[label].sum()
+        words = rng.choice(vocabulary, size=words_per_doc, p=weights)
+        featuresets.append(({f"w{word}": True for word in words}, label))
+    random.Random(seed).shuffle(featuresets)
+    return featuresets
+
+
+def movie_review_featuresets(docs):
+    from nltk.corpus import movie_reviews
+    from sentiment_classifier import extract_features
+    from preprocessing import preprocess_corpus
+
+    labeled = [(movie_reviews.raw(fileid), category)
+               for category in movie_reviews.categories()
+               for fileid in movie_reviews.fileids(category)]
+    random.Random(0).shuffle(labeled)
+    labeled = labeled[:docs]
+    tokens = preprocess_corpus([text for text, _ in labeled])
+    return [(extract_features(words), label) for words, (_, label) in zip(tokens, labeled)]
+
+
+def check_parity(name, nltk_classifier, sparse_classifier, test_set):
+    featuresets = [featureset for featureset, _ in test_set]
+    nltk_labels = [nltk_classifier.classify(featureset) for featureset in featuresets]
+    sparse_labels = sparse_classifier.classify_many(featuresets)
+    assert nltk_labels == sparse_labels, f"{name}: labels differ"
+
+    positive = sparse_classifier.labels().index('pos')
+    nltk_probs = np.array([nltk_classifier.prob_classify(featureset).prob('pos') for featureset in featuresets])
+    sparse_probs = sparse_classifier.predict_proba(featuresets)[:, positive]
+    assert np.allclose(nltk_probs, sparse_probs, rtol=1e-9, atol=1e-12), (
+        f"{name}: probabilities differ by up to {np.abs(nltk_probs - sparse_probs).max():.3g}")
+
+    nltk_accuracy = accuracy(nltk_classifier, test_set)
+    sparse_accuracy = accuracy(sparse_classifier, test_set)
+    assert nltk_accuracy == sparse_accuracy
+    print(f"{name.ljust(20)} labels and probabilities match NLTK, accuracy {sparse_accuracy:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000, help="documents (75%% train, 25%% test)")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="synthetic vocabulary size")
+    parser.add_argument("--movie-reviews", action="store_true", help="use the nltk movie_reviews corpus")
+    args = parser.parse_args()
+
+    if args.movie_reviews:
+        featuresets = movie_review_featuresets(args.docs)
+    else:
+        featuresets = synthetic_featuresets(args.docs, args.vocabulary)
+    split = len(featuresets) * 3 // 4
+    training_set, test_set = featuresets[:split], featuresets[split:]
+
+    print("SPARSE NAIVE BAYES BENCHMARK")
+    print("=" * 50)
+    print(f"{len(training_set)} training / {len(test_set)} test documents\n")
+
+    start = time.perf_counter()
+    nltk_classifier = NaiveBayesClassifier.train(training_set)
+    nltk_train = time.perf_counter() - start
+    start = time.perf_counter()
+    native = SparseNaiveBayesClassifier.train(training_set)
+    sparse_train = time.perf_counter() - start
+    converted = SparseNaiveBayesClassifier.from_nltk(nltk_classifier)
+
+    check_parity("native training", nltk_classifier, native, test_set)
+    check_parity("from_nltk", nltk_classifier, converted, test_set)
+
+    featuresets = [featureset for featureset, _ in test_set]
+    start = time.perf_counter()
+    for featureset in featuresets:
+        nltk_classifier.prob_classify(featureset)
+    nltk_time = time.perf_counter() - start
+    start = time.perf_counter()
+    native.predict_proba(featuresets)
+    sparse_time = time.perf_counter() - start
+
+    print(f"\n{'training'.ljust(20)} NLTK {nltk_train:7.2f} s   sparse {sparse_train:7.2f} s"
+          f"   ({nltk_train / sparse_train:.1f}x)")
+    print(f"{'classification'.ljust(20)} NLTK {len(featuresets) / nltk_time:9,.0f} docs/sec"
+          f"   sparse batch {len(featuresets) / sparse_time:9,.0f} docs/sec   ({nltk_time / sparse_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Versioned cache of trained models
+
+Each artifact is keyed by a hash of its training data, its preprocessing
+config (including the source of the preprocessing functions) and the
+versions of the libraries that produced it. A change to any of them gives a
+new key, so stale models are retrained automatically, and an unchanged setup
+always loads the stored model instead of retraining.
+
+Artifacts live in ~/.cache/rotten_to_riches/models (override the cache root
+with ROTTEN_TO_RICHES_CACHE_DIR, or just the model directory with
+ROTTEN_TO_RICHES_MODEL_DIR), never in the source tree. They are pickled with the highest protocol and written atomically,
+next to a small JSON file describing what they were trained on.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import platform
+import tempfile
+import time
+from importlib import metadata as importlib_metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+# Shared with the Kalshi client's on-disk state (ROTTEN_TO_RICHES_CACHE_DIR)
+CACHE_DIR = Path(os.environ.get('ROTTEN_TO_RICHES_CACHE_DIR', Path.home() / '.cache' / 'rotten_to_riches'))
+DEFAULT_MODEL_DIR = Path(os.environ.get('ROTTEN_TO_RICHES_MODEL_DIR', CACHE_DIR / 'models'))
+
+
+def hash_parts(*parts: Any) -> str:
+    """Stable sha256 of JSON-serializable values"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def hash_documents(documents: Iterable[Any]) -> str:
+    """sha256 over a stream of documents (str, bytes, or JSON-serializable values)"""
+    digest = hashlib.sha256()
+    for document in documents:
+        if isinstance(document, str):
+            document = document.encode('utf-8')
+        elif not isinstance(document, bytes):
+            document = json.dumps(document, sort_keys=True).encode('utf-8')
+        digest.update(len(document).to_bytes(8, 'little'))
+        digest.update(document)
+    return digest.hexdigest()
+
+
+def hash_corpus(corpus) -> str:
+    """Content hash of an NLTK categorized corpus (e.g. movie_reviews): every file's label and raw text"""
+    return hash_documents(
+        part
+        for category in corpus.categories()
+        for fileid in corpus.fileids(category)
+        for part in (category, fileid, corpus.raw(fileid))
+    )
+
+
+def source_hash(*functions: Callable) -> str:
+    """Hash of the source code of functions, so editing preprocessing invalidates models"""
+    return hash_parts(*(inspect.getsource(function) for function in functions))
+
+
+def library_versions(libraries: Sequence[str] = ('nltk',)) -> Dict[str, str]:
+    """Installed versions of the given distributions plus Python and the pickle protocol"""
+    versions = {'python': platform.python_version(), 'pickle_protocol': str(pickle.HIGHEST_PROTOCOL)}
+    for library in libraries:
+        try:
+            versions[library] = importlib_metadata.version(library)
+        except importlib_metadata.PackageNotFoundError:
+            versions[library] = 'not installed'
+    return versions
+
+
+class ModelRegistry:
+    """Trained models stored by content key in a fixed cache directory"""
+
+    def __init__(self, root: Optional[os.PathLike] = None):
+        """
+        Args:
+            root: Cache directory (defaults to DEFAULT_MODEL_DIR)
+        """
+        self.root = Path(root) if root else DEFAULT_MODEL_DIR
+
+    def key(self, data_hash: str, config: Dict[str, Any], libraries: Sequence[str] = ('nltk',)) -> str:
+        """Artifact key from the training data hash, preprocessing config and library versions"""
+        return hash_parts(data_hash, config, library_versions(libraries))[:32]
+
+    def path(self, name: str, key: str) -> Path:
+        return self.root / f"{name}-{key}.pkl"
+
+    def load(self, name: str, key: str) -> Optional[Any]:
+        """The stored model, or None if there is none (or it cannot be read)"""
+        path = self.path(name, key)
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable model {path}: {e}")
+            return None
+
+    def _write_atomic(self, path: Path, write: Callable) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=f".{path.name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def save(self, name: str, key: str, model: Any, metadata: Optional[Dict[str, Any]] = None,
+             prune: bool = True) -> Path:
+        """
+        Store a model atomically under its key
+
+        Args:
+            name: Model family, e.g. "sentiment_analyzer"
+            key: Key from key()
+            model: Picklable model
+            metadata: Optional description written to a .json file beside the model
+            prune: Remove this family's artifacts stored under other (stale) keys
+
+        Returns:
+            Path of the stored model
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(name, key)
+        self._write_atomic(path, lambda f: pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL))
+        info = dict(metadata or {}, name=name, key=key, saved_at=time.time())
+        self._write_atomic(path.with_suffix('.json'), lambda f: f.write(json.dumps(info, indent=2, default=str).encode('utf-8')))
+        if prune:
+            for stale in self.root.glob(f"{name}-{'?' * len(key)}.*"):
+                if stale.stem != path.stem:
+                    stale.unlink(missing_ok=True)
+        return path
+
+    def get_or_train(self, name: str, train: Callable[[], Any], data_hash: str, config: Dict[str, Any],
+                     libraries: Sequence[str] = ('nltk',)) -> Any:
+        """
+        Load the model for this data/config/library combination, training and storing it if missing
+
+        Args:
+            name: Model family
+            train: Zero-argument function returning a freshly trained model
+            data_hash: Hash of the training data (see hash_corpus)
+            config: Preprocessing/training settings that affect the model
+            libraries: Distributions whose versions are part of the key
+
+        Returns:
+            The trained model
+        """
+        key = self.key(data_hash, config, libraries)
+        model = self.load(name, key)
+        if model is not None:
+            print(f"Loaded {name} model {key[:8]} from {self.root}")
+            return model
+        print(f"No stored {name} model for {key[:8]}, training...")
+        model = train()
+        path = self.save(name, key, model, metadata={
+            'data_hash': data_hash,
+            'config': config,
+            'libraries': library_versions(libraries),
+        })
+        print(f"Stored {name} model at {path}")
+        return model
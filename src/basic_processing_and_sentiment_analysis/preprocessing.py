@@ -0,0 +1,150 @@
+"""
+Reusable text preprocessing pipeline
+
+TextPreprocessor builds the stopword set and WordNet lemmatizer once, filters
+tokens in a single pass and memoizes lemmas by token, so preprocessing a
+corpus no longer rebuilds NLTK resources per document. Its output is the same
+as the original per-call preprocess_text (see benchmark_preprocessing.py).
+
+preprocess_corpus spreads a corpus over a process pool: each worker builds
+its TextPreprocessor once, documents travel in chunks, and results come back
+in input order.
+"""
+
+import os
+import string
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+
+def _punctuation_substrings() -> frozenset:
+    """Every substring of string.punctuation, including ''.
+
+    The original filter was `token not in string.punctuation`, a substring test
+    that also drops tokens like '' or '()'; a set of all substrings keeps that
+    behaviour with O(1) lookups.
+    """
+    p = string.punctuation
+    return frozenset(p[i:j] for i in range(len(p) + 1) for j in range(i, len(p) + 1))
+
+
+PUNCTUATION = _punctuation_substrings()
+
+
+class TextPreprocessor:
+    """
+    Tokenize, drop punctuation/stopwords and lemmatize text with prebuilt NLTK resources
+
+    Instances are callable: preprocessor(text) -> list of tokens.
+    """
+
+    def __init__(self, language: str = 'english', min_length: int = 0, lemmatize: bool = True):
+        """
+        Args:
+            language: Stopword list to remove
+            min_length: Drop tokens shorter than this (OptimizedSentimentClassifier uses 3)
+            lemmatize: Reduce tokens to their WordNet lemma
+        """
+        from nltk.corpus import stopwords
+        from nltk.stem import WordNetLemmatizer
+        from nltk.tokenize import word_tokenize
+
+        self.language = language
+        self.min_length = min_length
+        self._tokenize = word_tokenize
+        #stopwords are actually in multiple languages
+        #set for faster lookup
+        self.stop_words = frozenset(stopwords.words(language))
+        self._skip = PUNCTUATION | self.stop_words
+        self.lemmatizer = WordNetLemmatizer() if lemmatize else None
+        self.lemma_cache: Dict[str, str] = {}
+
+    def lemmatize(self, token: str) -> str:
+        """WordNet lemma of a token, computed once per distinct token"""
+        lemma = self.lemma_cache.get(token)
+        if lemma is None:
+            lemma = self.lemma_cache[token] = self.lemmatizer.lemmatize(token)
+        return lemma
+
+    def __call__(self, text: str) -> List[str]:
+        return self.preprocess(text)
+
+    def preprocess(self, text: str) -> List[str]:
+        """
+        Preprocess one document
+
+        Args:
+            text: Raw text
+
+        Returns:
+            Lowercased, filtered (and lemmatized) tokens in document order
+        """
+        skip = self._skip
+        min_length = self.min_length
+        tokens = [t for t in self._tokenize(text.lower()) if t not in skip and len(t) >= min_length]
+        if self.lemmatizer is None:
+            return tokens
+        cache = self.lemma_cache
+        lemmatize = self.lemmatize
+        return [cache.get(t) or lemmatize(t) for t in tokens]
+
+    def preprocess_many(self, texts) -> List[List[str]]:
+        """Preprocess documents in order"""
+        return [self.preprocess(text) for text in texts]
+
+    def clear_cache(self) -> None:
+        self.lemma_cache.clear()
+
+
+# One preprocessor per worker process, built by the pool initializer
+_worker_preprocessor: Optional[TextPreprocessor] = None
+
+
+def _init_worker(options: Dict) -> None:
+    global _worker_preprocessor
+    _worker_preprocessor = TextPreprocessor(**options)
+
+
+def _preprocess_chunk(texts: List[str], skip_errors: bool = False, preprocessor=None) -> List[Optional[List[str]]]:
+    preprocessor = preprocessor or _worker_preprocessor
+    if not skip_errors:
+        return [preprocessor(text) for text in texts]
+    results = []
+    for text in texts:
+        try:
+            results.append(preprocessor(text))
+        except Exception:
+            results.append(None)
+    return results
+
+
+def preprocess_corpus(texts: Iterable[str], workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                      skip_errors: bool = False, **options) -> List[Optional[List[str]]]:
+    """
+    Preprocess many documents in parallel, preserving order
+
+    Args:
+        texts: Documents to preprocess
+        workers: Worker processes (default: CPU count); 1 runs in this process
+        chunk_size: Documents per work unit (default: about four units per worker)
+        skip_errors: Return None for documents that fail instead of raising
+        **options: TextPreprocessor arguments (language, min_length, lemmatize)
+
+    Returns:
+        Token lists aligned with texts
+    """
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(texts) // (workers * 4)))
+    if workers <= 1 or len(texts) <= chunk_size:
+        return _preprocess_chunk(texts, skip_errors, TextPreprocessor(**options))
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                             initializer=_init_worker, initargs=(options,)) as pool:
+        # map yields chunk results in submission order
+        for chunk_result in pool.map(_preprocess_chunk, chunks, [skip_errors] * len(chunks)):
+            results.extend(chunk_result)
+    return results
@@ -1,9 +1,21 @@
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-import string
+"""
+NLTK Naive Bayes sentiment analysis of scraped reviews
+
+Importing this module is cheap: nltk is imported on first use, and the global
+sentiment_analyzer trains (or loads its persisted model) on its first
+analysis. Run the module directly for the original scraped-data walkthrough.
+"""
+
+import random
+import threading
 from pathlib import Path
+
+try:
+    from .model_registry import ModelRegistry, hash_corpus, source_hash
+    from .preprocessing import TextPreprocessor, preprocess_corpus
+except ImportError:  # run from this directory rather than as a package
+    from model_registry import ModelRegistry, hash_corpus, source_hash
+    from preprocessing import TextPreprocessor, preprocess_corpus
 #should we discard some stopwords?
 
 #punkt is a pretrained sentence/word tokenizer, splits better (knows abbreviations, punctuation, etc.)
@@ -13,117 +25,77 @@ from pathlib import Path
 #synonym/antonym 
 #nltk.download('wordnet') #wordnet is lexical database for english
 
-def preprocess_text(text):
-    # Tokenize the text into words
-    tokens = word_tokenize(text.lower())
-    
-    # Remove punctuation and stopwords
-    #stopwords are actually in multiple languages
-    #set for faster lookup
-    #string.punctuation is a string containing all punctuation characters
-    stop_words = set(stopwords.words('english'))
-    tokens = [t for t in tokens if t not in string.punctuation]
-    tokens = [t for t in tokens if t not in stop_words]
-    
-    # Lemmatize the words (aka converting word to base def)
-    lemmatizer = WordNetLemmatizer()
-    tokens = [lemmatizer.lemmatize(t) for t in tokens]
-    
-    #return ' '.join(tokens)
-    return tokens
-
-#testing
-directory = Path("src/webscraping/scraped_data")
+TRAINING_SIZE = 1500  # movie_reviews docs used for training; the rest measure accuracy
+TRAINING_SEED = 0  # fixed shuffle, so an unchanged setup always yields the same model
 
-for filename in directory.glob("*.txt"):
-    with open(filename, "r", encoding="utf-8") as file:
-        text = file.read()
-        print(f"Data preprocessing file: {filename.name}")
-        data = preprocess_text(text)
+_preprocessor = None
 
-#print(data)
+def preprocess_text(text):
+    # Tokenize, remove punctuation and stopwords, and lemmatize the words (aka converting word to base def)
+    # The stopword set and lemmatizer are built once, on first call, and lemmas are cached per token
+    global _preprocessor
+    if _preprocessor is None:
+        _preprocessor = TextPreprocessor()
+    return _preprocessor(text)
 
 def extract_features(words):
     return {word: True for word in words}
 
-from nltk.corpus import movie_reviews
-#nltk.download('movie_reviews')
-import random
-
-#categories are positiev or negative
-docs = []
-for category in movie_reviews.categories():
-    #this part gets all the fileids of a specifi ccategory
-    for fileid in movie_reviews.fileids(category):
-        #movie_reviews.words(fileid) gets all the words in that file (tokenized)
-        #docs is a list of tuples, where each tuple contains a list of words and their corresponding category (pos, neg)
-        docs.append((list(movie_reviews.words(fileid)), category))
-
-random.shuffle(docs)
-featuresets = []
-for (words, label) in docs:
-    try:
-        featuresets.append((extract_features(preprocess_text("".join(words))), label))
-    except Exception as e:
-        print(f"Error processing {words}: {e}")
-#featuresets = [(extract_features(preprocess_text(words)), label) for (words, label) in docs]
-#do we split in half or just split by first 1500 and rest?
-training_set = featuresets[:1500]
-testing_set = featuresets[1500:]
-
-#naivebayesclassifier, supervised ML (learns from labeled data)
-#bayes theorem for probability calcs
-#naive bc assumes independence between features
-#counts how often each word appears in each category (pos, neg)
-from nltk import NaiveBayesClassifier
-print(f'# of training examples: {len(training_set)}')
-print(f'# of featuresets: {len(featuresets)}')
-classifier = NaiveBayesClassifier.train(training_set)
-#test accuracy
-print(f"Classifier accuracy: {nltk.classify.accuracy(classifier, testing_set)}")
-
-
-classifications = []
-for filename in directory.glob("*.txt"):
-    with open(filename, "r", encoding="utf-8") as file:
-        text = file.read()
-        print(f"Classifying file: {filename.name}")
-        features = extract_features(preprocess_text(text))
-        label = classifier.classify(features)
-        if label == 'pos':
-            classifications.append(1)
-        else:
-            classifications.append(0)
-        print(f"Sentiment for {filename.name}: {label}")
-
-#we can improve accuracy by using more data, better preprocessing, or more advanced models
-
-#change our current data to be more relevant to our use case so we can make actual bets
-if len(classifications) == 0:
-    print("No files were successfully processed. Check if the scraped_data directory exists and contains .txt files.")
-else:
-    percentage_pos = classifications.count(1) / len(classifications)
-    print(f"Percentage of positive sentiment: {percentage_pos:.2%}")
-    if percentage_pos > 0.6:
-        print("Overall Sentiment: Positive")
-    elif percentage_pos < 0.4:
-        print("Overall Sentiment: Negative")
-    else:
-        print("Overall Sentiment: Neutral")
-
 
 class SentimentAnalyzer:
     """
     A class for analyzing sentiment of text data using NLTK's Naive Bayes classifier
     """
     
-    def __init__(self):
-        """Initialize the sentiment analyzer and train the classifier"""
+    def __init__(self, registry: ModelRegistry = None, workers: int = None, backend: str = 'nltk'):
+        """
+        Initialize the sentiment analyzer; the classifier is loaded or trained on first use
+        
+        Args:
+            registry: ModelRegistry holding trained models (default cache directory if not given)
+            workers: Processes used to preprocess the training corpus (default: CPU count)
+            backend: 'nltk' classifies with NaiveBayesClassifier; 'sparse' converts it to a
+                SparseNaiveBayesClassifier that scores all texts of a batch in one matrix product
+        """
+        self.registry = registry or ModelRegistry()
+        self.workers = workers
+        self.backend = backend
         self.classifier = None
-        self._train_classifier()
+        self._lock = threading.Lock()
+    
+    def _ensure_classifier(self):
+        """Load the stored classifier for the current data and preprocessing, or train one, exactly once"""
+        if self.classifier is not None:
+            return self.classifier
+        with self._lock:
+            if self.classifier is None:
+                from nltk.corpus import movie_reviews
+                
+                classifier = self.registry.get_or_train(
+                    'sentiment_analyzer',
+                    self._train_classifier,
+                    data_hash=hash_corpus(movie_reviews),
+                    config={
+                        'preprocessing': source_hash(preprocess_text, extract_features, TextPreprocessor),
+                        'training_size': TRAINING_SIZE,
+                        'seed': TRAINING_SEED,
+                    },
+                )
+                if self.backend == 'sparse':
+                    try:
+                        from .sparse_naive_bayes import SparseNaiveBayesClassifier
+                    except ImportError:
+                        from sparse_naive_bayes import SparseNaiveBayesClassifier
+                    classifier = SparseNaiveBayesClassifier.from_nltk(classifier)
+                self.classifier = classifier
+        return self.classifier
     
     def _train_classifier(self):
         """Train the Naive Bayes classifier on movie reviews data"""
+        import nltk
+        from nltk import NaiveBayesClassifier
+        from nltk.corpus import movie_reviews
+        
         print("Training sentiment classifier...")
         
         # Load and prepare training data
@@ -132,24 +104,28 @@ class SentimentAnalyzer:
             for fileid in movie_reviews.fileids(category):
                 docs.append((list(movie_reviews.words(fileid)), category))
         
-        random.shuffle(docs)
+        random.Random(TRAINING_SEED).shuffle(docs)
+        
+        # Preprocess all docs across worker processes, in order
+        token_lists = preprocess_corpus(["".join(words) for words, _ in docs], workers=self.workers, skip_errors=True)
         featuresets = []
-        for (words, label) in docs:
-            try:
-                featuresets.append((extract_features(preprocess_text("".join(words))), label))
-            except Exception as e:
-                print(f"Error processing {words}: {e}")
+        for (words, label), tokens in zip(docs, token_lists):
+            if tokens is None:
+                print(f"Error processing {words}")
+                continue
+            featuresets.append((extract_features(tokens), label))
         
         # Split into training and testing sets
-        training_set = featuresets[:1500]
-        testing_set = featuresets[1500:]
+        training_set = featuresets[:TRAINING_SIZE]
+        testing_set = featuresets[TRAINING_SIZE:]
         
         # Train the classifier
-        self.classifier = NaiveBayesClassifier.train(training_set)
+        classifier = NaiveBayesClassifier.train(training_set)
         
         # Print accuracy
-        accuracy = nltk.classify.accuracy(self.classifier, testing_set)
+        accuracy = nltk.classify.accuracy(classifier, testing_set)
         print(f"Sentiment classifier trained with {accuracy:.2%} accuracy")
+        return classifier
     
     def analyze_sentiment(self, text: str) -> dict:
         """
@@ -161,30 +137,34 @@ class SentimentAnalyzer:
         Returns:
             Dictionary with sentiment analysis results
         """
-        if not self.classifier:
-            raise ValueError("Classifier not trained")
+        return self._analyze_batch([text])[0]
+    
+    def _analyze_batch(self, texts: list) -> list:
+        """Classify texts together, so the sparse backend scores them in one call"""
+        classifier = self._ensure_classifier()
         
         # Preprocess and extract features
-        features = extract_features(preprocess_text(text))
-        
-        # Get classification
-        label = self.classifier.classify(features)
-        
-        # Get probability distribution
-        prob_dist = self.classifier.prob_classify(features)
+        featuresets = [extract_features(preprocess_text(text)) for text in texts]
         
-        # Calculate confidence as the difference between positive and negative probabilities
-        # This gives us a measure of how decisive the classification is
-        positive_prob = prob_dist.prob('pos')
-        negative_prob = prob_dist.prob('neg')
-        confidence = abs(positive_prob - negative_prob)
+        # Get classification and probability distribution
+        labels = classifier.classify_many(featuresets)
+        prob_dists = classifier.prob_classify_many(featuresets)
         
-        return {
-            'label': label,
-            'confidence': confidence,
-            'positive_prob': positive_prob,
-            'negative_prob': negative_prob
-        }
+        results = []
+        for label, prob_dist in zip(labels, prob_dists):
+            # Calculate confidence as the difference between positive and negative probabilities
+            # This gives us a measure of how decisive the classification is
+            positive_prob = prob_dist.prob('pos')
+            negative_prob = prob_dist.prob('neg')
+            confidence = abs(positive_prob - negative_prob)
+            
+            results.append({
+                'label': label,
+                'confidence': confidence,
+                'positive_prob': positive_prob,
+                'negative_prob': negative_prob
+            })
+        return results
     
     def analyze_multiple_texts(self, texts: list) -> dict:
         """
@@ -199,14 +179,8 @@ class SentimentAnalyzer:
         if not texts:
             return {'overall_sentiment': 'neutral', 'confidence': 0.0, 'positive_percentage': 0.5}
         
-        results = []
-        positive_count = 0
-        
-        for text in texts:
-            result = self.analyze_sentiment(text)
-            results.append(result)
-            if result['label'] == 'pos':
-                positive_count += 1
+        results = self._analyze_batch(texts)
+        positive_count = sum(1 for result in results if result['label'] == 'pos')
         
         # Avoid division by zero
         if len(texts) > 0:
@@ -272,5 +246,88 @@ class SentimentAnalyzer:
         }
 
 
-# Create a global instance for easy import
-sentiment_analyzer = SentimentAnalyzer()
\ No newline at end of file
+# Create a global instance for easy import (trains or loads on first analysis)
+sentiment_analyzer = SentimentAnalyzer()
+
+
+def main():
+    """Preprocess, train on movie_reviews and classify the scraped files (the original script)"""
+    import nltk
+    from nltk import NaiveBayesClassifier
+    from nltk.corpus import movie_reviews
+    #nltk.download('movie_reviews')
+
+    #testing
+    directory = Path("src/webscraping/scraped_data")
+
+    for filename in directory.glob("*.txt"):
+        with open(filename, "r", encoding="utf-8") as file:
+            text = file.read()
+            print(f"Data preprocessing file: {filename.name}")
+            data = preprocess_text(text)
+
+    #print(data)
+
+    #categories are positiev or negative
+    docs = []
+    for category in movie_reviews.categories():
+        #this part gets all the fileids of a specifi ccategory
+        for fileid in movie_reviews.fileids(category):
+            #movie_reviews.words(fileid) gets all the words in that file (tokenized)
+            #docs is a list of tuples, where each tuple contains a list of words and their corresponding category (pos, neg)
+            docs.append((list(movie_reviews.words(fileid)), category))
+
+    random.shuffle(docs)
+    featuresets = []
+    for (words, label) in docs:
+        try:
+            featuresets.append((extract_features(preprocess_text("".join(words))), label))
+        except Exception as e:
+            print(f"Error processing {words}: {e}")
+    #featuresets = [(extract_features(preprocess_text(words)), label) for (words, label) in docs]
+    #do we split in half or just split by first 1500 and rest?
+    training_set = featuresets[:1500]
+    testing_set = featuresets[1500:]
+
+    #naivebayesclassifier, supervised ML (learns from labeled data)
+    #bayes theorem for probability calcs
+    #naive bc assumes independence between features
+    #counts how often each word appears in each category (pos, neg)
+    print(f'# of training examples: {len(training_set)}')
+    print(f'# of featuresets: {len(featuresets)}')
+    classifier = NaiveBayesClassifier.train(training_set)
+    #test accuracy
+    print(f"Classifier accuracy: {nltk.classify.accuracy(classifier, testing_set)}")
+
+
+    classifications = []
+    for filename in directory.glob("*.txt"):
+        with open(filename, "r", encoding="utf-8") as file:
+            text = file.read()
+            print(f"Classifying file: {filename.name}")
+            features = extract_features(preprocess_text(text))
+            label = classifier.classify(features)
+            if label == 'pos':
+                classifications.append(1)
+            else:
+                classifications.append(0)
+            print(f"Sentiment for {filename.name}: {label}")
+
+    #we can improve accuracy by using more data, better preprocessing, or more advanced models
+
+    #change our current data to be more relevant to our use case so we can make actual bets
+    if len(classifications) == 0:
+        print("No files were successfully processed. Check if the scraped_data directory exists and contains .txt files.")
+    else:
+        percentage_pos = classifications.count(1) / len(classifications)
+        print(f"Percentage of positive sentiment: {percentage_pos:.2%}")
+        if percentage_pos > 0.6:
+            print("Overall Sentiment: Positive")
+        elif percentage_pos < 0.4:
+            print("Overall Sentiment: Negative")
+        else:
+            print("Overall Sentiment: Neutral")
+
+
+if __name__ == "__main__":
+    main()
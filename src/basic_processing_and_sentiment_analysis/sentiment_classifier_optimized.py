@@ -1,23 +1,27 @@
 import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
 from nltk import NaiveBayesClassifier
-import string
-import pickle
-import os
+import random
 from pathlib import Path
 
+from model_registry import ModelRegistry, hash_corpus, source_hash
+from preprocessing import TextPreprocessor, preprocess_corpus
+
+DOCS_PER_CATEGORY = 500  # movie_reviews files used per category
+TRAIN_FRACTION = 0.8
+TRAINING_SEED = 0
+
 class OptimizedSentimentClassifier:
     """
     Optimized sentiment classifier that caches downloads and trained models
     """
     
-    def __init__(self):
+    def __init__(self, registry: ModelRegistry = None, workers: int = None):
+        self.workers = workers  # processes used to preprocess the training docs (default: CPU count)
         self.stop_words = None
         self.lemmatizer = None
+        self.preprocessor = None
         self.classifier = None
-        self.classifier_path = "sentiment_classifier.pkl"
+        self.registry = registry or ModelRegistry()
         self._setup_nltk()
     
     def _setup_nltk(self):
@@ -35,79 +39,77 @@ class OptimizedSentimentClassifier:
             nltk.download('wordnet', quiet=True)
             nltk.download('movie_reviews', quiet=True)
         
-        # Initialize components
-        self.stop_words = set(stopwords.words('english'))
-        self.lemmatizer = WordNetLemmatizer()
+        # Initialize components (skip very short words)
+        self.preprocessor = TextPreprocessor(min_length=3)
+        self.stop_words = self.preprocessor.stop_words
+        self.lemmatizer = self.preprocessor.lemmatizer
     
     def preprocess_text_fast(self, text):
-        """Optimized text preprocessing"""
-        # Tokenize and lowercase in one step
-        tokens = word_tokenize(text.lower())
-        
-        # Filter tokens in one pass
-        filtered_tokens = []
-        for token in tokens:
-            if (token not in string.punctuation and 
-                token not in self.stop_words and 
-                len(token) > 2):  # Skip very short words
-                filtered_tokens.append(self.lemmatizer.lemmatize(token))
-        
-        return filtered_tokens
+        """Optimized text preprocessing: one filtering pass and cached lemmas"""
+        return self.preprocessor(text)
     
     def extract_features_fast(self, words):
         """Optimized feature extraction"""
         return {word: True for word in words if len(word) > 2}
     
     def train_classifier(self):
-        """Train classifier and cache it"""
-        if os.path.exists(self.classifier_path):
-            print("Loading cached classifier...")
-            with open(self.classifier_path, 'rb') as f:
-                self.classifier = pickle.load(f)
-            return
+        """Load the registry's classifier for the current corpus and preprocessing, training it if stale or missing"""
+        # Import movie_reviews here to avoid import issues
+        from nltk.corpus import movie_reviews
         
+        self.classifier = self.registry.get_or_train(
+            'optimized_sentiment',
+            self._train,
+            data_hash=hash_corpus(movie_reviews),
+            config={
+                'preprocessing': source_hash(OptimizedSentimentClassifier.preprocess_text_fast,
+                                             OptimizedSentimentClassifier.extract_features_fast,
+                                             TextPreprocessor),
+                'docs_per_category': DOCS_PER_CATEGORY,
+                'train_fraction': TRAIN_FRACTION,
+                'seed': TRAINING_SEED,
+            },
+        )
+    
+    def _train(self):
+        """Train a classifier on part of movie_reviews"""
         print("Training classifier (this may take a moment)...")
         
-        # Import movie_reviews here to avoid import issues
         from nltk.corpus import movie_reviews
         
         # Use smaller dataset for faster training
         docs = []
         for category in ['pos', 'neg']:  # Only use pos/neg categories
-            fileids = movie_reviews.fileids(category)[:500]  # Use only 500 files per category
+            fileids = movie_reviews.fileids(category)[:DOCS_PER_CATEGORY]
             for fileid in fileids:
                 words = movie_reviews.words(fileid)
                 docs.append((words, category))
         
         # Shuffle and create featuresets
-        import random
-        random.shuffle(docs)
+        random.Random(TRAINING_SEED).shuffle(docs)
         
+        # Preprocess across worker processes; same options as self.preprocessor
+        token_lists = preprocess_corpus([" ".join(words) for words, _ in docs], workers=self.workers,
+                                        skip_errors=True, min_length=self.preprocessor.min_length)
         featuresets = []
-        for words, label in docs:
-            try:
-                processed_words = self.preprocess_text_fast(" ".join(words))
-                features = self.extract_features_fast(processed_words)
-                featuresets.append((features, label))
-            except Exception as e:
+        for (words, label), processed_words in zip(docs, token_lists):
+            if processed_words is None:
                 continue  # Skip problematic entries
+            features = self.extract_features_fast(processed_words)
+            featuresets.append((features, label))
         
         # Split data
-        split_point = int(len(featuresets) * 0.8)
+        split_point = int(len(featuresets) * TRAIN_FRACTION)
         training_set = featuresets[:split_point]
         testing_set = featuresets[split_point:]
         
         # Train classifier
-        self.classifier = NaiveBayesClassifier.train(training_set)
+        classifier = NaiveBayesClassifier.train(training_set)
         
         # Test accuracy
-        accuracy = nltk.classify.accuracy(self.classifier, testing_set)
+        accuracy = nltk.classify.accuracy(classifier, testing_set)
         print(f"Classifier accuracy: {accuracy:.3f}")
-        
-        # Cache the classifier
-        with open(self.classifier_path, 'wb') as f:
-            pickle.dump(self.classifier, f)
-        print("Classifier cached for future use")
+        return classifier
     
     def classify_text(self, text):
         """Classify a single text"""